@@ -0,0 +1,126 @@
+"""Compare the lean and default Chrome profiles on real Maps pages.
+
+For every profile and URL this records the time until the results feed
+(or place title) is shown, the bytes transferred according to Chrome's
+network log and the RSS of Chrome and its child processes. Needs Chrome
+and network access. Run from the backend directory:
+
+    python benchmarks/browser_profile.py --runs 3
+    python benchmarks/browser_profile.py --url "https://www.google.com/maps/search/hotels+in+Lisbon/"
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from scraping.driver_pool import block_resources, chrome_options
+
+DEFAULT_URLS = [
+    "https://www.google.com/maps/search/hotels+in+New+York+within+5+km/",
+    "https://www.google.com/maps/search/restaurants+in+Paris+within+5+km/",
+]
+READY_SELECTOR = "div[role='feed'], h1"
+
+
+def process_tree_rss(pid):
+    """RSS in bytes of a process and its descendants, None without psutil"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+def transferred_bytes(driver):
+    """Bytes received since the performance log was last read"""
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.loadingFinished':
+            total += message['params'].get('encodedDataLength', 0)
+    return total
+
+
+def launch(profile):
+    options = chrome_options(profile)
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    driver = webdriver.Chrome(options=options)
+    if profile == 'lean':
+        block_resources(driver)
+    return driver
+
+
+def measure(profile, urls, runs):
+    driver = launch(profile)
+    loads, sizes, rss = [], [], []
+    try:
+        for _run in range(runs):
+            for url in urls:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                driver.get("about:blank")
+                transferred_bytes(driver)
+                started = time.perf_counter()
+                driver.get(url)
+                WebDriverWait(driver, 30).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+                )
+                loads.append(time.perf_counter() - started)
+                # Let late requests (tiles, photos) finish before counting bytes
+                time.sleep(2)
+                sizes.append(transferred_bytes(driver))
+                memory = process_tree_rss(driver.service.process.pid)
+                if memory is not None:
+                    rss.append(memory)
+    finally:
+        driver.quit()
+    return {
+        'profile': profile,
+        'loads': len(loads),
+        'loadSecondsMedian': round(statistics.median(loads), 3),
+        'loadSecondsMax': round(max(loads), 3),
+        'bytesMedian': int(statistics.median(sizes)),
+        'rssPeakMiB': round(max(rss) / 2 ** 20, 1) if rss else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Chrome scraping profiles")
+    parser.add_argument('--url', action='append', help="Maps URL to load, repeatable")
+    parser.add_argument('--runs', type=int, default=3, help="loads of every URL per profile")
+    options = parser.parse_args()
+    urls = options.url or DEFAULT_URLS
+
+    results = [measure(profile, urls, options.runs) for profile in ('default', 'lean')]
+    print(f"{'profile':<10}{'loads':>7}{'median s':>10}{'max s':>8}{'median KiB':>12}{'peak RSS MiB':>14}")
+    for result in results:
+        print(f"{result['profile']:<10}{result['loads']:>7}{result['loadSecondsMedian']:>10}"
+              f"{result['loadSecondsMax']:>8}{result['bytesMedian'] / 1024:>12.0f}"
+              f"{result['rssPeakMiB'] if result['rssPeakMiB'] is not None else 'n/a':>14}")
+
+    default, lean = results
+    print(f"\nlean vs default: load {lean['loadSecondsMedian'] / default['loadSecondsMedian']:.2f}x, "
+          f"bytes {lean['bytesMedian'] / max(default['bytesMedian'], 1):.2f}x")
+    if default['rssPeakMiB'] is None:
+        print("Install psutil to measure Chrome RSS")
+
+
+if __name__ == "__main__":
+    main()
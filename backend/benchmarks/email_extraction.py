@@ -0,0 +1,96 @@
+"""Micro-benchmark of email and link extraction over the saved pages in corpus/.
+
+Compares scraping.email_extraction with the regex + BeautifulSoup code
+DomainExplorer used before. Run from the backend directory:
+
+    python benchmarks/email_extraction.py [--repeat 20]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraping.email_extraction import extract_emails, extract_links
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+# The pattern and dedup DomainExplorer.get_emails used to run on every page
+LEGACY_EMAIL_PATTERN = "(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|\"(?:[\\x01-\\x08\\x0b\\x0c\\x0e-\\x1f\\x21\\x23-\\x5b\\x5d-\\x7f]|\\\\[\\x01-\\x09\\x0b\\x0c\\x0e-\\x7f])*\")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\\x01-\\x08\\x0b\\x0c\\x0e-\\x1f\\x21-\\x5a\\x53-\\x7f]|\\\\[\\x01-\\x09\\x0b\\x0c\\x0e-\\x7f])+)\\])"
+
+
+def legacy_emails(page):
+    emails = []
+    for email in re.findall(LEGACY_EMAIL_PATTERN, page):
+        if email not in emails and "/" not in email and "\\" not in email:
+            emails.append(email)
+    return emails
+
+
+def legacy_links(page, domain):
+    from bs4 import BeautifulSoup
+    links = []
+    for link in BeautifulSoup(page, 'html.parser').find_all('a'):
+        url = link.get('href')
+        if domain in str(url) and url.startswith("http"):
+            links.append(url)
+    return list(set(links))
+
+
+def page_domain(page):
+    """First absolute link's host, standing in for the crawled website"""
+    match = re.search(r'href=["\']?https?://(?:www\.)?([^/"\'?>\s]+)', page)
+    return match.group(1) if match else ""
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email and link extraction")
+    parser.add_argument('--repeat', type=int, default=20, help="timing runs per page, best is kept")
+    options = parser.parse_args()
+
+    try:
+        import bs4  # noqa: F401
+        has_bs4 = True
+    except ImportError:
+        has_bs4 = False
+        print("beautifulsoup4 is not installed, skipping the legacy link extractor\n")
+
+    print(f"{'page':<24}{'KiB':>8}{'emails old/new':>16}{'emails ms old/new':>22}"
+          f"{'speedup':>9}{'links ms old/new':>22}{'speedup':>9}")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        with open(os.path.join(CORPUS_DIR, name), encoding='utf-8') as f:
+            page = f.read()
+        domain = page_domain(page)
+
+        old_emails = legacy_emails(page)
+        new_emails = list(extract_emails(page).values())
+        timings = [
+            best_of(lambda: legacy_emails(page), options.repeat),
+            best_of(lambda: extract_emails(page), options.repeat),
+            best_of(lambda: legacy_links(page, domain), options.repeat) if has_bs4 else 0.0,
+            best_of(lambda: extract_links(page, f"https://{domain}/"), options.repeat),
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        old_ms, new_ms, old_links_ms, new_links_ms = (timing * 1000 for timing in timings)
+        print(f"{name:<24}{len(page) / 1024:>8.0f}{f'{len(old_emails)}/{len(new_emails)}':>16}"
+              f"{f'{old_ms:.2f}/{new_ms:.2f}':>22}{old_ms / new_ms:>8.1f}x"
+              f"{f'{old_links_ms:.2f}/{new_links_ms:.2f}':>22}{old_links_ms / new_links_ms:>8.1f}x")
+        if set(old_emails) != set(new_emails):
+            print(f"  old: {', '.join(old_emails)}")
+            print(f"  new: {', '.join(new_emails)}")
+
+    print(f"\nTotal emails: {totals[0] * 1000:.2f} ms -> {totals[1] * 1000:.2f} ms "
+          f"({totals[0] / totals[1]:.1f}x)")
+    if has_bs4:
+        print(f"Total links:  {totals[2] * 1000:.2f} ms -> {totals[3] * 1000:.2f} ms "
+              f"({totals[2] / totals[3]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
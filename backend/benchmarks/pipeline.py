@@ -0,0 +1,564 @@
+"""Benchmark the scraping pipeline offline and check it against a baseline.
+
+Two local stand-ins replace the network:
+
+- a Maps server rendering the saved pages in benchmarks/maps/: a search
+  feed that loads listings in batches as it is scrolled, and a place
+  panel per listing. With --browser, GoogleMapsScraper runs against it
+  in Chrome, with its maps_url (MAPS_URL in the service) pointing at
+  the server.
+- a server of synthetic business websites, one per place, each on its
+  own loopback address (127.0.x.y) so the crawler sees separate hosts.
+  Sites keep their emails on the homepage, the contact or about page, or
+  nowhere, and a few are broken or very large.
+
+Measured per phase: throughput (places/min, websites/min), latency
+percentiles of a single place or website, peak RSS, and whether the
+expected places and emails were found. Each measurement is the median
+over --runs runs and is compared to benchmarks/baseline.json; the run
+exits with status 1 when throughput or memory regressed by more than
+--tolerance or fewer places or emails were found. Latency percentiles
+of single places and websites vary too much between runs to fail on,
+they are only reported when they exceed --latency-tolerance. A phase
+with no baseline is reported as not gated.
+Run from the backend directory:
+
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --browser --runs 3
+    python benchmarks/pipeline.py --browser --save-baseline
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import unquote_plus, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from browser_profile import process_tree_rss
+from config import Config
+from scraping.email_crawler import EmailCrawler
+from scraping.email_output import EmailOutput
+from scraping.job_manager import JobManager
+from scraping.job_store import SqliteJobStore
+from scraping.metrics import JobMetrics
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+MAPS_PAGES_DIR = os.path.join(BENCHMARK_DIR, 'maps')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# Whether a measurement gets better as it goes up or down
+MEASUREMENTS = {
+    'placesPerMinute': 'higher',
+    'placeP50Seconds': 'lower',
+    'placeP95Seconds': 'lower',
+    'placeAccuracy': 'higher',
+    'websitesPerMinute': 'higher',
+    'websiteP50Seconds': 'lower',
+    'websiteP95Seconds': 'lower',
+    'emailAccuracy': 'higher',
+    'peakRssMiB': 'lower',
+}
+# Correctness may not drop at all, whatever the tolerance
+EXACT_MEASUREMENTS = ('placeAccuracy', 'emailAccuracy')
+# Reported against --latency-tolerance, but never fail the run
+ADVISORY_MEASUREMENTS = ('placeP50Seconds', 'placeP95Seconds', 'websiteP50Seconds', 'websiteP95Seconds')
+
+# Where a synthetic site keeps its emails, with the share of sites
+SITE_KINDS = [
+    ('home', 0.30),
+    ('contact', 0.35),
+    ('about', 0.10),
+    ('none', 0.15),
+    ('broken', 0.05),
+    ('large', 0.05),
+]
+SITE_PAGES = ['/', '/menu', '/gallery', '/about-us', '/contact', '/blog/opening', '/blog/season', '/blog/team']
+WORDS = (
+    "fresh local seasonal kitchen terrace garden rooms breakfast dinner wine "
+    "harbour view family friendly booking events private parking central quiet"
+).split()
+NAME_ADJECTIVES = ["Blue", "Golden", "Old", "Little", "Grand", "Royal", "Green", "Silver", "Sunny", "Corner"]
+NAME_NOUNS = ["Anchor", "Olive", "Lantern", "Fig", "Harbour", "Oak", "Lemon", "Mill", "Bridge", "Garden"]
+STREETS = ["Market", "Church", "Station", "Harbour", "Mill", "Park", "Castle", "River"]
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def build_places(count, sites_port, seed):
+    """Synthetic places with the emails their websites are expected to yield"""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _share in SITE_KINDS]
+    weights = [share for _kind, share in SITE_KINDS]
+    places = []
+    for index in range(count):
+        name = f"{rng.choice(NAME_ADJECTIVES)} {rng.choice(NAME_NOUNS)} {index + 1}"
+        # One in ten places has no website, like on Maps
+        has_website = rng.random() >= 0.1
+        kind = rng.choices(kinds, weights)[0] if has_website else None
+        website = f"http://127.0.{1 + index // 250}.{1 + index % 250}:{sites_port}/" if has_website else None
+        domain = f"{slug(name)}.example"
+        if kind in ('home', 'about'):
+            emails = [f"info@{domain}"]
+        elif kind in ('contact', 'large'):
+            emails = [f"reservations@{domain}", f"events@{domain}"]
+        else:
+            emails = []
+        places.append({
+            'index': index,
+            'name': name,
+            'address': f"{rng.randint(1, 250)} {rng.choice(STREETS)} Street, Benchtown",
+            'rating': f"{rng.randint(30, 50) / 10:.1f}",
+            'reviews': str(rng.randint(3, 4000)),
+            'phone': f"+1 555-01{index:04d}",
+            'website': website,
+            'kind': kind,
+            'emails': emails,
+        })
+    return places
+
+
+def place_path(place):
+    """Maps-style place path, with a feature ID in its data segment"""
+    return (
+        f"/maps/place/{slug(place['name'])}/data=!4m7!3m6"
+        f"!1s0x{place['index'] + 0x47e66e00:x}:0x{place['index'] * 7919 + 0x1000:x}!8m2"
+    )
+
+
+def filler(rng, size):
+    """Paragraphs of filler text of about size bytes"""
+    paragraphs = []
+    total = 0
+    while total < size:
+        paragraph = "<p>" + " ".join(rng.choice(WORDS) for _i in range(60)) + ".</p>"
+        paragraphs.append(paragraph)
+        total += len(paragraph)
+    return "\n".join(paragraphs)
+
+
+def site_page(place, path):
+    """(status, html) of a page of a place's synthetic website"""
+    kind = place['kind']
+    if kind == 'broken':
+        return 500, "<html><body><h1>Internal Server Error</h1></body></html>"
+    if path not in SITE_PAGES:
+        return 404, "<html><body><h1>Not Found</h1></body></html>"
+
+    rng = random.Random(f"{place['index']}{path}")
+    base = place['website'].rstrip('/')
+    nav = "".join(
+        f'<li><a href="{base}{page}">{page.strip("/").replace("-", " ").title() or "Home"}</a></li>'
+        for page in SITE_PAGES
+    )
+    body = filler(rng, 600 * 1024 if kind == 'large' and path == '/' else 12 * 1024)
+    emails = ""
+    holds_emails = (
+        (kind == 'home' and path == '/')
+        or (kind == 'about' and path == '/about-us')
+        or (kind in ('contact', 'large') and path == '/contact')
+    )
+    if holds_emails:
+        first, *others = place['emails']
+        emails = f'<p>Write to <a href="mailto:{first}">{first}</a></p>' + "".join(
+            f"<p>or {email}</p>" for email in others
+        )
+    return 200, (
+        f"<!DOCTYPE html><html><head><title>{place['name']}</title></head><body>"
+        f"<nav><ul>{nav}</ul></nav><main><h1>{place['name']}</h1>{body}{emails}</main>"
+        f"<footer>{place['address']} &middot; {place['phone']}</footer></body></html>"
+    )
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the Maps pages or the synthetic websites, after a fixed latency"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        status, html = self.server.render(self)
+        body = html.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, render, latency, host='127.0.0.1'):
+        super().__init__((host, 0), StandInHandler)
+        self.render = render
+        self.latency = latency
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class MapsStandIn:
+    """Renders the saved search and place pages for the synthetic places"""
+    def __init__(self, places, batch=20, scroll_delay_ms=150):
+        self.places = places
+        self.by_path = {place_path(place): place for place in places}
+        self.batch = batch
+        self.scroll_delay_ms = scroll_delay_ms
+        with open(os.path.join(MAPS_PAGES_DIR, 'search.html'), encoding='utf-8') as f:
+            self.search_page = Template(f.read())
+        with open(os.path.join(MAPS_PAGES_DIR, 'place.html'), encoding='utf-8') as f:
+            self.place_page = Template(f.read())
+
+    def __call__(self, request):
+        path = urlsplit(request.path).path
+        base = f"http://{request.headers['Host']}"
+        if path.startswith('/maps/search/'):
+            query = unquote_plus(path[len('/maps/search/'):].strip('/'))
+            listings = [
+                {'name': place['name'], 'href': base + place_path(place)}
+                for place in self.places
+            ]
+            return 200, self.search_page.substitute(
+                query=query, places=json.dumps(listings), batch=self.batch, delay=self.scroll_delay_ms
+            )
+        place = self.by_path.get(path)
+        if place is None:
+            return 404, "<html><body>Not Found</body></html>"
+        website_link = (
+            f'<a data-item-id="authority" href="{place["website"]}" aria-label="Website">'
+            f'<div class="Io6YTe fontBodyMedium">{place["website"]}</div></a>'
+            if place['website'] else ""
+        )
+        return 200, self.place_page.substitute(
+            name=place['name'], rating=place['rating'], reviews=place['reviews'],
+            address=place['address'], phone=place['phone'], website_link=website_link
+        )
+
+
+class SitesStandIn:
+    """Renders the synthetic website of the place whose loopback address was requested"""
+    def __init__(self, places):
+        self.by_host = {urlsplit(place['website']).hostname: place for place in places if place['website']}
+
+    def __call__(self, request):
+        host = request.headers['Host'].rsplit(':', 1)[0]
+        place = self.by_host.get(host)
+        if place is None:
+            return 404, "<html><body>Unknown site</body></html>"
+        return site_page(place, urlsplit(request.path).path)
+
+
+class PeakMemory:
+    """Peak RSS of this process and its children (Chrome) while running.
+
+    Samples the process tree with psutil; without it, falls back to the
+    peak RSS of this process alone.
+    """
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            rss = process_tree_rss(os.getpid())
+            if rss is None:
+                rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            self.peak = max(self.peak, rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mib(self):
+        return round(self.peak / 2 ** 20, 1)
+
+
+def histogram(metrics, name):
+    return metrics.snapshot()['histograms'].get(name) or {}
+
+
+def run_maps(places, maps_url, options):
+    """Scrape the Maps stand-in in Chrome, returns the measurements"""
+    from scraping.driver_pool import DriverPool, build_chrome_driver
+    from scraping.scraper import GoogleMapsScraper
+
+    pool = DriverPool(
+        max_size=options.workers,
+        driver_factory=lambda: build_chrome_driver(Config.BROWSER_PROFILE, Config.BROWSER_WINDOW_SIZE)
+    )
+    try:
+        # Launch every driver up front so the run measures scraping, not Chrome startup
+        warm = [pool.acquire() for _i in range(options.workers)]
+        for pooled in warm:
+            pool.release(pooled)
+
+        metrics = JobMetrics()
+        with PeakMemory() as memory, pool.lease() as driver:
+            scraper = GoogleMapsScraper(
+                driver,
+                driver_pool=pool,
+                detail_workers=options.workers,
+                scroll_timeout=Config.SCROLL_TIMEOUT,
+                scroll_max_timeout=Config.SCROLL_MAX_TIMEOUT,
+                scroll_max_stalls=Config.SCROLL_MAX_STALLS,
+                extraction_mode=Config.PLACE_EXTRACTION,
+                selector_set=Config.SELECTOR_SET,
+                metrics=metrics,
+                maps_url=maps_url
+            )
+            started = time.monotonic()
+            results = scraper.scrape("Benchtown", 5, 'hotels')
+            elapsed = time.monotonic() - started
+    finally:
+        pool.close()
+
+    expected = {place['name']: place for place in places}
+    correct = sum(
+        1 for result in results
+        if result['name'] in expected
+        and result['address'] == expected[result['name']]['address']
+        and result['website'] == expected[result['name']]['website']
+    )
+    listing = histogram(metrics, 'scraper_listing_seconds')
+    return {
+        'places': len(results),
+        'placesPerMinute': round(len(results) / elapsed * 60, 1),
+        'placeP50Seconds': listing.get('p50'),
+        'placeP95Seconds': listing.get('p95'),
+        'placeAccuracy': round(correct / len(places), 3),
+        'peakRssMiB': memory.peak_mib,
+    }
+
+
+def run_crawler(places, options):
+    """Crawl the synthetic websites into a job store, returns the measurements"""
+    with tempfile.TemporaryDirectory() as workdir:
+        job_manager = JobManager(jobs_dir=workdir, store=SqliteJobStore(os.path.join(workdir, 'jobs.db')))
+        job_id = str(uuid.uuid4())
+        job_manager.save_job(job_id, {
+            'status': 'completed',
+            'results': [
+                {'name': place['name'], 'website': place['website'], 'emails': ""}
+                for place in places
+            ],
+        })
+        websites = [place['website'] for place in places if place['website']]
+
+        metrics = JobMetrics()
+        emailsqueue = queue.Queue()
+        output = EmailOutput(
+            emailsqueue, job_id, job_manager,
+            batch_size=Config.EMAIL_FLUSH_BATCH,
+            flush_interval=Config.EMAIL_FLUSH_INTERVAL,
+            metrics=metrics
+        )
+        output.daemon = True
+        crawler = EmailCrawler(
+            concurrency=Config.EMAIL_CONCURRENCY,
+            per_host=Config.EMAIL_PER_HOST,
+            timeout=Config.EMAIL_TIMEOUT,
+            max_pages=Config.EMAIL_MAX_PAGES,
+            max_bytes=Config.EMAIL_MAX_BYTES,
+            max_body_bytes=Config.EMAIL_MAX_BODY_BYTES,
+            metrics=metrics
+        )
+        with PeakMemory() as memory:
+            started = time.monotonic()
+            output.start()
+            crawler.run(websites, lambda domain, emails: emailsqueue.put((domain, emails)))
+            emailsqueue.put(None)
+            output.join()
+            elapsed = time.monotonic() - started
+
+        found = {
+            result['website']: result.get('emails') or ""
+            for result in job_manager.get_job(job_id)['results']
+        }
+
+    correct = sum(
+        1 for place in places if place['website']
+        and sorted(filter(None, found.get(place['website'], "").split(", "))) == sorted(place['emails'])
+    )
+    website = histogram(metrics, 'crawler_domain_seconds')
+    return {
+        'websites': len(websites),
+        'websitesPerMinute': round(len(websites) / elapsed * 60, 1),
+        'websiteP50Seconds': website.get('p50'),
+        'websiteP95Seconds': website.get('p95'),
+        'emailAccuracy': round(correct / len(websites), 3),
+        'pagesFetched': crawler.pages_fetched,
+        'peakRssMiB': memory.peak_mib,
+    }
+
+
+def median_runs(runs):
+    """Median of every measurement over the runs, the maximum for peak memory"""
+    merged = {}
+    for name in runs[0]:
+        values = [run[name] for run in runs if run.get(name) is not None]
+        if not values:
+            merged[name] = None
+        elif name == 'peakRssMiB':
+            merged[name] = max(values)
+        else:
+            merged[name] = round(statistics.median(values), 3)
+    return merged
+
+
+def compare(phases, baseline, tolerance, latency_tolerance):
+    """Measurements that regressed against the baseline, as printable lines.
+
+    Returns (regressions, advisories): regressions fail the run,
+    advisories are latency percentiles that are only reported.
+    """
+    regressions, advisories = [], []
+    for phase, measured in phases.items():
+        expected = baseline['phases'][phase]
+        for name, better in MEASUREMENTS.items():
+            current, reference = measured.get(name), expected.get(name)
+            if current is None or reference is None:
+                continue
+            if name in EXACT_MEASUREMENTS:
+                allowed = 0.0
+            elif name in ADVISORY_MEASUREMENTS:
+                allowed = latency_tolerance
+            else:
+                allowed = tolerance
+            if better == 'higher':
+                regressed = current < reference * (1 - allowed)
+            else:
+                regressed = current > reference * (1 + allowed)
+            if regressed:
+                line = f"{phase} {name}: {current} vs baseline {reference}"
+                (advisories if name in ADVISORY_MEASUREMENTS else regressions).append(line)
+    return regressions, advisories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline against local stand-ins")
+    parser.add_argument('--places', type=int, default=120, help="synthetic places (and websites)")
+    parser.add_argument('--runs', type=int, default=5, help="runs per phase, measurements are medians")
+    parser.add_argument('--workers', type=int, default=Config.DETAIL_WORKERS,
+                        help="Chrome drivers extracting places")
+    parser.add_argument('--maps-latency', type=float, default=0.05, help="seconds per Maps stand-in response")
+    parser.add_argument('--site-latency', type=float, default=0.02, help="seconds per website response")
+    parser.add_argument('--seed', type=int, default=1, help="seed of the synthetic places and sites")
+    parser.add_argument('--browser', action='store_true',
+                        help="also benchmark the Chrome scraper against the Maps stand-in (needs Chrome)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative regression of throughput and peak memory")
+    parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                        help="relative regression of latency percentiles that is reported (never fails)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run's phases in the baseline, keeping the other phases")
+    options = parser.parse_args()
+
+    workload = {
+        'places': options.places,
+        'workers': options.workers,
+        'mapsLatency': options.maps_latency,
+        'siteLatency': options.site_latency,
+        'seed': options.seed,
+        'placeExtraction': Config.PLACE_EXTRACTION,
+        'emailConcurrency': Config.EMAIL_CONCURRENCY,
+        'emailPerHost': Config.EMAIL_PER_HOST,
+        'emailMaxPages': Config.EMAIL_MAX_PAGES,
+    }
+    phases = {}
+    # The sites answer on every loopback address, so listen on all interfaces
+    with StandInServer(None, options.site_latency, host='') as sites:
+        places = build_places(options.places, sites.port, options.seed)
+        sites.render = SitesStandIn(places)
+
+        if options.browser:
+            with StandInServer(MapsStandIn(places), options.maps_latency) as maps:
+                maps_url = f"http://127.0.0.1:{maps.port}/maps"
+                phases['maps'] = median_runs([run_maps(places, maps_url, options) for _i in range(options.runs)])
+
+        phases['crawler'] = median_runs([run_crawler(places, options) for _i in range(options.runs)])
+
+    for phase, measured in phases.items():
+        print(f"\n{phase}")
+        for name, value in measured.items():
+            print(f"  {name:<20}{value}")
+
+    baseline = None
+    if os.path.exists(options.baseline):
+        with open(options.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if options.save_baseline:
+        # Phases not run this time (the maps phase without --browser)
+        # keep their baseline if it was recorded with the same workload
+        saved = dict(baseline['phases']) if baseline and baseline.get('workload') == workload else {}
+        saved.update(phases)
+        with open(options.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'workload': workload, 'phases': saved, 'runs': options.runs}, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {options.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nNo baseline at {options.baseline}, run with --save-baseline to create one")
+        return 2
+    if baseline.get('workload') != workload:
+        print(f"\nThe baseline was recorded with a different workload: {baseline.get('workload')}")
+        return 2
+    gated = {phase: measured for phase, measured in phases.items() if phase in baseline['phases']}
+    if 'maps' not in phases:
+        print("\nThe maps phase is not gated, it only runs with --browser")
+    for phase in phases:
+        if phase not in gated:
+            print(f"\nThe {phase} phase is not gated, it has no baseline: record one with --save-baseline")
+
+    regressions, advisories = compare(gated, baseline, options.tolerance, options.latency_tolerance)
+    if advisories:
+        print("\nSlower latency percentiles than the baseline (advisory):")
+        for advisory in advisories:
+            print(f"  {advisory}")
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
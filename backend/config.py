@@ -3,8 +3,87 @@ import os
 class Config:
     """Application configuration"""
     JOBS_DIR = os.environ.get('JOBS_DIR', 'jobs')
+    # 'sqlite' (default) or 'json' for one file per job
+    JOB_STORE = os.environ.get('JOB_STORE', 'sqlite')
+    JOB_DB_PATH = os.environ.get('JOB_DB_PATH', 'jobs.db')
     DEBUG = os.environ.get('DEBUG', 'True') == 'True'
     PORT = int(os.environ.get('PORT', 5000))
+
+    # 'inline' runs jobs on threads in the API process, 'worker' only
+    # queues them for worker.py processes
+    EXECUTION_MODE = os.environ.get('EXECUTION_MODE', 'inline')
+    QUEUE_DB_PATH = os.environ.get('QUEUE_DB_PATH', 'queue.db')
+    WORKER_LEASE_SECONDS = int(os.environ.get('WORKER_LEASE_SECONDS', 60))
+    WORKER_HEARTBEAT_SECONDS = int(os.environ.get('WORKER_HEARTBEAT_SECONDS', 15))
+    WORKER_MAX_ATTEMPTS = int(os.environ.get('WORKER_MAX_ATTEMPTS', 3))
+
+    # Scraping jobs running at once per process; the rest wait in the queue
+    MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', 2))
+
+    # Chrome driver pool
+    DRIVER_POOL_SIZE = int(os.environ.get('DRIVER_POOL_SIZE', 4))
+    DRIVER_MAX_USES = int(os.environ.get('DRIVER_MAX_USES', 20))
+
+    # Chrome profile: 'lean' blocks images, media and fonts and uses a
+    # fixed BROWSER_WINDOW_SIZE viewport, 'default' is plain fullscreen Chrome
+    BROWSER_PROFILE = os.environ.get('BROWSER_PROFILE', 'lean')
+    BROWSER_WINDOW_SIZE = tuple(
+        int(size) for size in os.environ.get('BROWSER_WINDOW_SIZE', '1024,768').split(',')
+    )
+
+    # Place fields are read with one script call ('bulk') using the
+    # SELECTOR_SET (a bundled version number or a JSON file path, the
+    # latest bundled set by default), or one lookup per field ('fields')
+    PLACE_EXTRACTION = os.environ.get('PLACE_EXTRACTION', 'bulk')
+    SELECTOR_SET = os.environ.get('SELECTOR_SET', '')
+
+    # Base URL of the Maps searches; benchmarks point it at a local stand-in
+    MAPS_URL = os.environ.get('MAPS_URL', 'https://www.google.com/maps')
+
+    # Place detail extraction: 'urls' (parallel) or 'click' (sequential)
+    DETAIL_MODE = os.environ.get('DETAIL_MODE', 'urls')
+    DETAIL_WORKERS = int(os.environ.get('DETAIL_WORKERS', 3))
+
+    # Feed scrolling: seconds to wait for new listings, doubled on every stall
+    SCROLL_TIMEOUT = float(os.environ.get('SCROLL_TIMEOUT', 2.0))
+    SCROLL_MAX_TIMEOUT = float(os.environ.get('SCROLL_MAX_TIMEOUT', 8.0))
+    SCROLL_MAX_STALLS = int(os.environ.get('SCROLL_MAX_STALLS', 3))
+
+    # Email crawler: requests in flight in total and per host
+    EMAIL_CONCURRENCY = int(os.environ.get('EMAIL_CONCURRENCY', 20))
+    EMAIL_PER_HOST = int(os.environ.get('EMAIL_PER_HOST', 4))
+    EMAIL_TIMEOUT = float(os.environ.get('EMAIL_TIMEOUT', 5))
+    # Pages and bytes fetched per website before its crawl gives up
+    EMAIL_MAX_PAGES = int(os.environ.get('EMAIL_MAX_PAGES', 10))
+    EMAIL_MAX_BYTES = int(os.environ.get('EMAIL_MAX_BYTES', 5 * 1024 * 1024))
+    # Bytes read of a single response, the rest of the body is dropped
+    EMAIL_MAX_BODY_BYTES = int(os.environ.get('EMAIL_MAX_BODY_BYTES', 2 * 1024 * 1024))
+
+    # Emails found per domain are reused across jobs for EMAIL_CACHE_TTL seconds
+    EMAIL_CACHE_ENABLED = os.environ.get('EMAIL_CACHE_ENABLED', 'True') == 'True'
+    EMAIL_CACHE_PATH = os.environ.get('EMAIL_CACHE_PATH', 'email_cache.db')
+    EMAIL_CACHE_TTL = int(os.environ.get('EMAIL_CACHE_TTL', 7 * 24 * 3600))
+    EMAIL_CACHE_MAX_ENTRIES = int(os.environ.get('EMAIL_CACHE_MAX_ENTRIES', 50000))
+
+    # Tiled searches split the radius into tiles of TILE_SIZE_KM, at most
+    # MAX_TILES of them (tiles grow to stay under the cap)
+    TILE_SIZE_KM = float(os.environ.get('TILE_SIZE_KM', 2.0))
+    MAX_TILES = int(os.environ.get('MAX_TILES', 64))
+
+    # Running jobs save their extracted places every CHECKPOINT_INTERVAL
+    # seconds or CHECKPOINT_BATCH places; unfinished jobs are resumed on startup
+    CHECKPOINT_INTERVAL = float(os.environ.get('CHECKPOINT_INTERVAL', 30.0))
+    CHECKPOINT_BATCH = int(os.environ.get('CHECKPOINT_BATCH', 50))
+    RESUME_ORPHANED_JOBS = os.environ.get('RESUME_ORPHANED_JOBS', 'True') == 'True'
+
+    # Extracted places are cached so incremental jobs can skip fresh ones
+    PLACE_CACHE_ENABLED = os.environ.get('PLACE_CACHE_ENABLED', 'True') == 'True'
+    PLACE_CACHE_PATH = os.environ.get('PLACE_CACHE_PATH', 'place_cache.db')
+    PLACE_CACHE_TTL = int(os.environ.get('PLACE_CACHE_TTL', 7 * 24 * 3600))
+
+    # Email results are written to the job store every N domains or T seconds
+    EMAIL_FLUSH_BATCH = int(os.environ.get('EMAIL_FLUSH_BATCH', 25))
+    EMAIL_FLUSH_INTERVAL = float(os.environ.get('EMAIL_FLUSH_INTERVAL', 2.0))
     
     @classmethod
     def get_jobs_dir(cls):
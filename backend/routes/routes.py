@@ -1,6 +1,17 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from config import Config
 from scraping.job_manager import JobManager
+from scraping.job_store import RESULT_SORT_FIELDS
+from scraping.metrics import REGISTRY
 from services.scraping_service import ScrapingService
+from services.job_queue import SqliteJobQueue
+from services.progress import TERMINAL_EVENTS
+from services.result_export import (
+    EXPORT_FIELDS, EXPORT_FORMATS, ExportUnavailable, dedupe_places, export_results
+)
 import uuid
 from datetime import datetime, timezone
 from pydantic import BaseModel
@@ -11,13 +22,28 @@ class ScrapeRequest(BaseModel):
     location: str
     radius: int = 5
     type: str = "both"
+    # Higher priority jobs leave the queue first
+    priority: int = 0
+    # Reuse places extracted by earlier jobs instead of opening them again
+    incremental: bool = False
+    # Search a grid of tiles over the radius instead of a single query
+    tiled: bool = False
 
 # Initialize router
 router = APIRouter()
 
 # Initialize managers and services
-job_manager = JobManager()
-scraping_service = ScrapingService(job_manager)
+job_manager = JobManager(Config.get_jobs_dir())
+job_queue = None
+if Config.EXECUTION_MODE == 'worker':
+    job_queue = SqliteJobQueue(
+        Config.QUEUE_DB_PATH,
+        lease_seconds=Config.WORKER_LEASE_SECONDS,
+        max_attempts=Config.WORKER_MAX_ATTEMPTS
+    )
+scraping_service = ScrapingService(job_manager, job_queue=job_queue)
+if job_queue is None and Config.RESUME_ORPHANED_JOBS:
+    scraping_service.resume_orphaned_jobs()
 
 @router.post("/api/scrape")
 async def start_scraping(request: ScrapeRequest):
@@ -34,29 +60,226 @@ async def start_scraping(request: ScrapeRequest):
         'location': location,
         'radius': radius,
         'type': type_filter,
-        'status': 'pending',
+        'incremental': request.incremental,
+        'tiled': request.tiled,
+        'status': 'queued',
         'createdAt': str(datetime.now(timezone.utc)),
         'results': []
     }
     
     # Save the job and start scraping
     job_manager.save_job(job_id, job)
-    scraping_service.start_scraping_job(job_id, location, radius, type_filter)
+    scraping_service.start_scraping_job(
+        job_id, location, radius, type_filter,
+        priority=request.priority, incremental=request.incremental,
+        tiled=request.tiled
+    )
     
     return job
 
 @router.get("/api/jobs")
-async def get_jobs():
+async def get_jobs(summary: bool = False):
+    # Summaries carry resultCount/emailCount instead of the results
+    if summary:
+        return job_manager.get_job_summaries()
     jobs = job_manager.get_all_jobs()
     return list(jobs.values())
 
 @router.get("/api/jobs/{job_id}")
-async def get_job(job_id: str):
-    job = job_manager.get_job(job_id)
+async def get_job(job_id: str, include_results: bool = True):
+    job = job_manager.get_job(job_id, include_results=include_results)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
+@router.get("/api/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    type: Optional[str] = None,
+    has_website: Optional[bool] = None,
+    has_email: Optional[bool] = None,
+    min_rating: Optional[float] = None,
+    q: Optional[str] = None,
+    sort: str = "position",
+    order: str = "asc",
+    fields: Optional[str] = None
+):
+    if sort not in RESULT_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(RESULT_SORT_FIELDS)}")
+    if order not in ('asc', 'desc'):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    if not job_manager.get_job(job_id, include_results=False):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    filters = {
+        'type': type,
+        'has_website': has_website,
+        'has_email': has_email,
+        'min_rating': min_rating,
+        'q': q
+    }
+    page_data = job_manager.get_job_results(
+        job_id, filters, sort=sort, order=order, page=page, page_size=page_size
+    )
+
+    # Project results down to the requested fields
+    if fields:
+        wanted = [field.strip() for field in fields.split(',') if field.strip()]
+        page_data['results'] = [
+            {field: result.get(field) for field in wanted}
+            for result in page_data['results']
+        ]
+    return page_data
+
+def _export_response(results, export_format, fields, filename):
+    """Stream results as a file download in the requested format"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    media_type, extension = EXPORT_FORMATS[export_format]
+    try:
+        chunks = export_results(results, export_format, fields)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{extension}"'}
+    )
+
+def _export_fields(fields, default):
+    if not fields:
+        return default
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+@router.get("/api/jobs/{job_id}/export")
+async def export_job(job_id: str, format: str = "csv", fields: Optional[str] = None):
+    """Download all of a job's results, streamed from the store"""
+    if not job_manager.get_job(job_id, include_results=False):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _export_response(
+        job_manager.iter_job_results(job_id),
+        format,
+        _export_fields(fields, EXPORT_FIELDS),
+        f"job-{job_id}"
+    )
+
+@router.get("/api/export")
+async def export_jobs(
+    format: str = "csv",
+    job_ids: Optional[str] = None,
+    status: Optional[str] = "completed",
+    since: Optional[str] = None,
+    dedupe: bool = True,
+    fields: Optional[str] = None
+):
+    """Download the results of several jobs as one file.
+
+    Defaults to every completed job. With dedupe, a place found by
+    several jobs is exported once, from the most recent job.
+    """
+    if job_ids:
+        wanted = [job_id.strip() for job_id in job_ids.split(',') if job_id.strip()]
+        jobs = [job_manager.get_job(job_id, include_results=False) for job_id in wanted]
+        missing = [job_id for job_id, job in zip(wanted, jobs) if not job]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Jobs not found: {', '.join(missing)}")
+    else:
+        jobs = [
+            job for job in job_manager.get_job_summaries()
+            if (not status or job.get('status') == status)
+            and (not since or (job.get('createdAt') or '') >= since)
+        ]
+    jobs.sort(key=lambda job: job.get('createdAt') or '', reverse=True)
+
+    def results():
+        for job in jobs:
+            for result in job_manager.iter_job_results(job['id']):
+                yield dict(result, jobId=job['id'], location=job.get('location'))
+
+    rows = dedupe_places(results()) if dedupe else results()
+    return _export_response(
+        rows,
+        format,
+        _export_fields(fields, ['jobId', 'location'] + EXPORT_FIELDS),
+        "jobs-export"
+    )
+
+@router.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = job_manager.get_job(job_id, include_results=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    state = scraping_service.cancel_scraping_job(job_id)
+    if state is None:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']} and can't be cancelled")
+
+    # A running job stops at its next listing and then reports 'cancelled'
+    return {'id': job_id, 'status': 'cancelled' if state == 'queued' else 'cancelling'}
+
+@router.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of a job's progress"""
+    # Subscribe before reading the job: a job that finishes in between is
+    # then either in the stored status or delivered to this subscription
+    progress = scraping_service.progress
+    subscription, state = progress.subscribe(job_id)
+    job = job_manager.get_job(job_id, include_results=False)
+    if not job:
+        progress.unsubscribe(job_id, subscription)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    def format_event(message):
+        return f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+
+    async def event_stream():
+        try:
+            # Start with the stored job so clients don't need a separate GET
+            yield format_event({'event': 'snapshot', 'jobId': job_id, 'data': job})
+            for message in state:
+                yield format_event(message)
+                if message['event'] in TERMINAL_EVENTS:
+                    return
+            if job['status'] in ('completed', 'failed', 'cancelled') and not state:
+                # Finished before this process started or its events were
+                # already dropped, nothing will follow
+                return
+
+            queue = subscription[1]
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(message)
+                if message['event'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            progress.unsubscribe(job_id, subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@router.get("/api/scheduler")
+async def get_scheduler_stats():
+    return scraping_service.get_scheduler_stats()
+
+@router.get("/api/pool")
+async def get_pool_stats():
+    return scraping_service.get_pool_stats()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics of this process in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 def include_router(app):
     """Function to include the router in the main app"""
     app.include_router(router)
\ No newline at end of file
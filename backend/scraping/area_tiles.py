@@ -0,0 +1,72 @@
+"""Splitting a search radius into a grid of Maps viewports"""
+import math
+import re
+from collections import namedtuple
+from urllib.parse import quote_plus
+
+# "@lat,lng,zoomz" in the URL Maps shows once it has centered the map
+MAP_CENTER_PATTERN = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)")
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG = 111.320
+# Width in pixels of the Maps viewport the zoom level is fitted to
+VIEWPORT_PX = 1000
+MAPS_URL = "https://www.google.com/maps"
+
+Tile = namedtuple('Tile', 'id lat lng zoom')
+
+
+def parse_map_center(url):
+    """(lat, lng) of a Maps URL, or None if it has no "@" center"""
+    match = MAP_CENTER_PATTERN.search(url or "")
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def zoom_for_width(lat, width_km):
+    """Maps zoom level at which the viewport spans about width_km"""
+    meters_per_px = width_km * 1000 / VIEWPORT_PX
+    zoom = math.log2(156543.03 * math.cos(math.radians(lat)) / meters_per_px)
+    return max(3, min(18, int(round(zoom))))
+
+
+def tile_grid(lat, lng, radius_km, tile_km=2.0, max_tiles=64):
+    """Tiles covering the circle of radius_km around (lat, lng).
+
+    Tiles are squares of tile_km, made larger when covering the circle
+    would take more than max_tiles of them. Tile IDs are "row:col" and
+    stay the same for the same arguments, so progress can be resumed.
+    """
+    diameter = 2 * radius_km
+    per_side = max(1, math.ceil(diameter / tile_km))
+    while per_side > 1 and per_side * per_side > max_tiles:
+        per_side -= 1
+    tile_km = max(tile_km, diameter / per_side)
+    zoom = zoom_for_width(lat, tile_km)
+
+    tiles = []
+    half_span = per_side * tile_km / 2
+    half_diagonal = tile_km * math.sqrt(2) / 2
+    for row in range(per_side):
+        dy = half_span - (row + 0.5) * tile_km
+        for col in range(per_side):
+            dx = -half_span + (col + 0.5) * tile_km
+            # Corner tiles entirely outside the circle have nothing to add
+            if math.hypot(dx, dy) - half_diagonal > radius_km:
+                continue
+            tiles.append(Tile(
+                f"{row}:{col}",
+                lat + dy / KM_PER_DEGREE_LAT,
+                lng + dx / (KM_PER_DEGREE_LNG * math.cos(math.radians(lat))),
+                zoom
+            ))
+    return tiles
+
+
+def tile_search_url(query, tile, maps_url=MAPS_URL):
+    """Maps search for query restricted to the tile's viewport"""
+    return (
+        f"{maps_url}/search/{quote_plus(query)}/"
+        f"@{tile.lat:.6f},{tile.lng:.6f},{tile.zoom}z"
+    )
@@ -0,0 +1,106 @@
+"""Periodic saving of a running job's progress so it can be resumed"""
+import threading
+import time
+from scraping.place_cache import place_key
+
+
+class JobCheckpoint:
+    """Extracted places and crawled websites of a job, saved to the job store.
+
+    Places are saved as the job's results every `interval` seconds or
+    `batch` places, whichever comes first; each save only appends the
+    places added since the last one. Websites are saved as soon as
+    the email collector has written their emails. A job restarted from a
+    checkpoint skips both.
+    """
+    def __init__(self, job_id, job_manager, interval=30.0, batch=50, state=None, results=None):
+        self.job_id = job_id
+        self.job_manager = job_manager
+        self.interval = interval
+        self.batch = batch
+        state = state or {}
+        self.phase = state.get('phase', 'extraction')
+        self.crawled = set(state.get('crawled', []))
+        self.results = list(results or [])
+        # Place keys of the results (None for places without a URL); they
+        # live in the checkpoint so results keep their schema
+        self._keys = state.get('placeKeys') or [place_key(result.get('url')) for result in self.results]
+        self._places = {key: result for key, result in zip(self._keys, self.results) if key}
+        self._lock = threading.Lock()
+        # Results already in the job store; None until the first save
+        # replaced whatever results the job had
+        self._stored = len(self.results) if state else None
+        self._pending = 0
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def from_job(cls, job_id, job_manager, job, **kwargs):
+        """Checkpoint of a stored job, empty unless the job was interrupted"""
+        state = job.get('checkpoint') or {}
+        results = job.get('results', []) if state else []
+        return cls(job_id, job_manager, state=state, results=results, **kwargs)
+
+    @property
+    def resuming(self):
+        return bool(self.results) or self.phase != 'extraction'
+
+    def places_for(self, urls):
+        """Checkpointed results of the given place URLs, keyed by URL"""
+        found = {}
+        with self._lock:
+            for url in urls:
+                result = self._places.get(place_key(url))
+                if result is not None:
+                    found[url] = result
+        return found
+
+    def add_place(self, url, result):
+        with self._lock:
+            key = place_key(url)
+            self.results.append(result)
+            self._keys.append(key)
+            if key:
+                self._places[key] = result
+            self._pending += 1
+            due = (
+                self._pending >= self.batch
+                or time.monotonic() - self._saved_at >= self.interval
+            )
+        if due:
+            self.save()
+
+    def save(self, fields=None):
+        """Write the checkpoint (and any extra job fields) to the job store now"""
+        with self._lock:
+            job_fields = dict(fields or {})
+            job_fields['checkpoint'] = {
+                'phase': self.phase,
+                'places': len(self.results),
+                'crawled': sorted(self.crawled),
+                'savedAt': time.time(),
+            }
+            # Once extraction is over the results belong to the email collector
+            results = append = None
+            if self.phase == 'extraction':
+                job_fields['checkpoint']['placeKeys'] = list(self._keys)
+                if self._stored is None:
+                    results = list(self.results)
+                else:
+                    append = self.results[self._stored:]
+                self._stored = len(self.results)
+            self._pending = 0
+            self._saved_at = time.monotonic()
+            self.job_manager.update_job_fields(self.job_id, job_fields, results=results, append=append)
+
+    def start_emails(self):
+        """Mark extraction as finished, the job's results are final"""
+        self.phase = 'email'
+        self.save()
+
+    def add_crawled(self, websites):
+        with self._lock:
+            self.crawled.update(websites)
+        self.save()
+
+    def finish(self):
+        self.job_manager.update_job_fields(self.job_id, {'checkpoint': None})
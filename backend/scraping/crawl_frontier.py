@@ -0,0 +1,80 @@
+"""Per-domain crawl frontier ranking pages likely to list contact details"""
+import heapq
+from urllib.parse import urldefrag, urlsplit
+
+# Words in a link's path or label and how strongly they suggest contact info
+LINK_KEYWORDS = (
+    (('contact', 'kontakt', 'contacto', 'contatti', 'impressum', 'imprint', 'get-in-touch'), 10),
+    (('about', 'ueber-uns', 'uber-uns', 'team', 'staff', 'legal', 'mentions-legales'), 5),
+    (('info', 'location', 'find-us', 'reservation', 'booking', 'careers', 'jobs'), 2),
+)
+# Links that never hold contact info or aren't pages at all
+SKIPPED_SUFFIXES = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.zip', '.mp4', '.mp3',
+    '.doc', '.docx', '.xls', '.xlsx', '.css', '.js', '.xml', '.ics',
+)
+LOW_VALUE_WORDS = ('login', 'cart', 'checkout', 'wp-content', 'tag/', 'category/', 'page/', '?replytocom')
+
+
+def link_priority(url, label=""):
+    """Score of a link, higher is fetched first and None is never fetched"""
+    path = urlsplit(url).path.lower()
+    if path.endswith(SKIPPED_SUFFIXES):
+        return None
+    text = f"{url.lower()} {label.lower()}"
+    score = 0
+    for words, weight in LINK_KEYWORDS:
+        if any(word in text for word in words):
+            score += weight
+    if any(word in text for word in LOW_VALUE_WORDS):
+        score -= 5
+    # Shallow pages before deep ones
+    return score - path.count('/')
+
+
+class CrawlFrontier:
+    """Pages of one domain waiting to be fetched, best first.
+
+    Stops handing out pages once max_pages have been taken or max_bytes
+    have been downloaded.
+    """
+    def __init__(self, max_pages=10, max_bytes=5 * 1024 * 1024):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.pages_taken = 0
+        self.bytes_downloaded = 0
+        self._heap = []
+        self._seen = set()
+        self._seq = 0
+
+    def add(self, url, label=""):
+        url = urldefrag(url)[0]
+        if url in self._seen:
+            return
+        self._seen.add(url)
+        priority = link_priority(url, label)
+        if priority is None:
+            return
+        heapq.heappush(self._heap, (-priority, self._seq, url))
+        self._seq += 1
+
+    def exhausted(self):
+        return (
+            not self._heap
+            or self.pages_taken >= self.max_pages
+            or self.bytes_downloaded >= self.max_bytes
+        )
+
+    def take(self, count):
+        """Up to count of the best pages, within the page budget"""
+        count = min(count, self.max_pages - self.pages_taken)
+        if self.bytes_downloaded >= self.max_bytes:
+            return []
+        urls = []
+        while self._heap and len(urls) < count:
+            urls.append(heapq.heappop(self._heap)[2])
+        self.pages_taken += len(urls)
+        return urls
+
+    def downloaded(self, size):
+        self.bytes_downloaded += size
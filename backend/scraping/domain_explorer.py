@@ -1,89 +1,93 @@
-
-import re
-from threading import Thread
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import logging
+from scraping.crawl_frontier import CrawlFrontier
+from scraping.email_cache import normalize_domain
+from scraping.email_extraction import extract_anchors
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-class DomainExplorer(Thread):
-
-    """A threading class that scrapes emails from domains"""
-    def __init__(self, workerqueue, resultsqueue):
-
-        Thread.__init__(self)
-        self.work = workerqueue
-        self.results = resultsqueue
-        self.r = requests.Session()
-        self.timeout = 5
-        self.r.headers.update({"user-agent" : "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36"})
-        self.pattern = "(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|\"(?:[\\x01-\\x08\\x0b\\x0c\\x0e-\\x1f\\x21\\x23-\\x5b\\x5d-\\x7f]|\\\\[\\x01-\\x09\\x0b\\x0c\\x0e-\\x7f])*\")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\\x01-\\x08\\x0b\\x0c\\x0e-\\x1f\\x21-\\x5a\\x53-\\x7f]|\\\\[\\x01-\\x09\\x0b\\x0c\\x0e-\\x7f])+)\\])"
-
-    def run(self):
-        while True:
-            try:
-                self.domain = self.work.get()
-                self.main()
-            except Exception as e:
-                logger.error(e)
-            finally:
-                self.work.task_done()
-
-    def main(self):
-        """Main scraper function"""
-
-        self.url = self.domain
-
-        self.src = self.get_page_source()
-        self.links = self.get_page_links()
-
-        if self.url not in self.links:
-            self.links.append(self.url)
-
-        found_emails = self.get_emails()
 
-        self.results.put((self.domain, found_emails))
+class DomainExplorer:
 
+    """Scrapes emails from a single domain through an EmailCrawler"""
+    def __init__(self, domain, crawler):
+        self.domain = domain
+        self.host = normalize_domain(domain)
+        self.crawler = crawler
 
-    def get_page_source(self):
-        """A method to get the source code from a link"""
-
-        response = self.r.get(self.url, timeout=self.timeout, verify=False)
-        return response.text
-
-    def get_page_links(self):
-        """A method to scrape all the URLs from a page"""
-
-        links = []
-        self.soup = BeautifulSoup(self.src, 'html.parser')
-        if self.soup:
-
-            for link in self.soup.find_all('a'):
-                url = link.get('href')
-                if self.domain in str(url) and url.startswith("http"):
-                    links.append(link.get('href'))
-
-        return list(set(links))
+    async def main(self):
+        """Main scraper function"""
 
-    def get_emails(self):
-        """A method to scrape emails from a page"""
-        emails = []
+        # Websites crawled by an earlier job don't need fetching again
+        cache = self.crawler.cache
+        if cache is not None:
+            cached = cache.get(self.domain)
+            if cached is not None:
+                self.crawler.cache_hits += 1
+                return (self.domain, cached)
+            self.crawler.cache_misses += 1
 
-        for link in self.links:
-            try:
-                response = self.r.get(link, timeout=self.timeout, verify=False)
-                print(link)
-                emails2 = re.findall(self.pattern, response.text)
-                for email in emails2:
-                    if email not in emails and "/" not in email and "\\" not in email :
-                        emails.append(email)
-            except Exception as e:
-                logger.error(f"{link} Didn't Process because: {e}")
-                return list(set(emails))
-        print(emails)
-        
-        return ", ".join(emails)
\ No newline at end of file
+        self.url = self.domain
+        found_emails = await self.get_emails()
+
+        if cache is not None:
+            cache.put(self.domain, found_emails)
+
+        return (self.domain, found_emails)
+
+
+    async def get_page_source(self, url, emails):
+        """A method to get the source code from a link, adding its emails to emails"""
+
+        page, size = await self.crawler.fetch(url, emails)
+        self.pages_fetched += 1
+        self.frontier.downloaded(size)
+        return page
+
+    def get_page_links(self, src, url):
+        """A method to queue the domain's links of the page at url on the frontier"""
+
+        for url, label in extract_anchors(src, url, self.host):
+            self.frontier.add(url, label)
+
+    async def get_emails(self):
+        """A method to crawl the domain's best pages until emails turn up.
+
+        Pages are fetched a few at a time from the frontier, contact and
+        about pages first, until emails were found or the domain's page
+        or byte budget is spent. Failed pages are logged and skipped,
+        except for the homepage.
+        """
+        emails = {}
+        self.frontier = CrawlFrontier(self.crawler.max_pages, self.crawler.max_bytes)
+        self.frontier.add(self.url)
+        self.frontier.take(1)
+        self.pages_fetched = 0
+
+        try:
+            self.src = await self.get_page_source(self.url, emails)
+            self.get_page_links(self.src, self.url)
+
+            while not emails and not self.frontier.exhausted():
+                links = self.frontier.take(self.crawler.per_host)
+                pages = await asyncio.gather(
+                    *(self.get_page_source(link, emails) for link in links),
+                    return_exceptions=True
+                )
+                for link, page in zip(links, pages):
+                    if isinstance(page, Exception):
+                        self.crawler.pages_failed += 1
+                        self.crawler.request_failed(page)
+                        logger.error(f"{link} Didn't Process because: {page!r}")
+                        continue
+                    self.get_page_links(page, link)
+        finally:
+            self.crawler.domain_crawled(
+                self.domain, self.pages_fetched, self.frontier.bytes_downloaded
+            )
+        logger.debug(f"{self.domain}: {len(emails)} emails")
+
+        return ", ".join(emails.values())
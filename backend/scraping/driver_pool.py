@@ -0,0 +1,262 @@
+"""Pool of reusable headless Chrome drivers"""
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from scraping.metrics import DRIVER_STARTUP_SECONDS
+
+
+# Requests the scraper never needs: photos, map and street view imagery,
+# fonts and media. Blocked through CDP in the lean profile.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*googleusercontent.com/*",
+    "*/maps/vt*", "*/kh/v*", "*streetviewpixels*", "*/maps/photometa/*",
+    "*fonts.googleapis.com/*", "*fonts.gstatic.com/*",
+]
+
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-component-update",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,InterestFeedContentSuggestions",
+]
+
+
+def chrome_options(profile='lean', window_size=(1024, 768)):
+    """Chrome options of a scraping profile.
+
+    'default' is plain headless Chrome in a fullscreen window. 'lean'
+    uses a small fixed viewport and doesn't load images, media or fonts.
+    """
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument('--no-sandbox')
+    if profile == 'lean':
+        options.add_argument(f"--window-size={window_size[0]},{window_size[1]}")
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", LEAN_PREFS)
+    else:
+        options.add_argument('--start-fullscreen')
+    return options
+
+
+def block_resources(driver):
+    """Block the requests in BLOCKED_URL_PATTERNS for the driver's session"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+
+
+def visited_origins(driver):
+    """http(s) origins in the navigation history of the driver's current tab"""
+    history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+    origins = set()
+    for entry in history.get('entries', []):
+        parts = urlsplit(entry.get('url') or "")
+        if parts.scheme in ('http', 'https'):
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+    return origins
+
+
+def build_chrome_driver(profile='lean', window_size=(1024, 768)):
+    """Launch a new headless Chrome driver"""
+    driver = webdriver.Chrome(options=chrome_options(profile, window_size))
+    if profile == 'lean':
+        block_resources(driver)
+    return driver
+
+
+class PooledDriver:
+    """A Chrome driver together with its pool bookkeeping"""
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Bounded pool that leases warm Chrome drivers to scraping jobs"""
+    def __init__(self, max_size=2, max_uses=20, driver_factory=build_chrome_driver):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.driver_factory = driver_factory
+
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Stats
+        self.leases = 0
+        self.created = 0
+        self.recycled_max_uses = 0
+        self.recycled_crashed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def acquire(self, timeout=None, block=True):
+        """Lease a driver, launching one if the pool still has room.
+
+        Returns None if no driver became available within the timeout
+        or if block is False and the pool is exhausted.
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot before launching Chrome outside the lock
+                    self._size += 1
+                    pooled = None
+                    break
+                if not block:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+        if pooled is None:
+            launched = time.monotonic()
+            try:
+                pooled = PooledDriver(self.driver_factory())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            DRIVER_STARTUP_SECONDS.observe(time.monotonic() - launched)
+            with self._cond:
+                self.created += 1
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self.leases += 1
+            self.total_wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+
+        pooled.uses += 1
+        return pooled
+
+    def release(self, pooled, broken=False):
+        """Return a leased driver, resetting or recycling it"""
+        if not broken and pooled.uses < self.max_uses:
+            try:
+                self._reset(pooled.driver)
+            except WebDriverException as e:
+                print(f"Driver reset failed, recycling: {e}")
+                broken = True
+
+        if broken or pooled.uses >= self.max_uses:
+            self._quit(pooled.driver)
+            with self._cond:
+                if broken:
+                    self.recycled_crashed += 1
+                else:
+                    self.recycled_max_uses += 1
+                self._size -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._quit(pooled.driver)
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager around acquire/release.
+
+        A driver whose lease ends with a WebDriverException is treated as
+        crashed and replaced rather than returned to the pool.
+        """
+        pooled = self.acquire(timeout=timeout)
+        if pooled is None:
+            raise TimeoutError("Timed out waiting for a Chrome driver")
+        broken = False
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def _reset(self, driver):
+        """Clear cookies, site storage, extra tabs and navigation between leases"""
+        handles = driver.window_handles
+        origins = set()
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            origins.update(visited_origins(driver))
+            if handle != handles[0]:
+                driver.close()
+        # delete_all_cookies() only clears the current page's domain; CDP
+        # clears the cookies of every domain the lease visited
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in sorted(origins):
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        driver.get("about:blank")
+        # The next lease's history only holds the origins it visits
+        driver.execute_cdp_cmd('Page.resetNavigationHistory', {})
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting driver: {e}")
+
+    def stats(self):
+        """Pool size, wait time and recycle counts"""
+        with self._cond:
+            return {
+                'maxSize': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'inUse': self._size - len(self._idle),
+                'leases': self.leases,
+                'created': self.created,
+                'recycledMaxUses': self.recycled_max_uses,
+                'recycledCrashed': self.recycled_crashed,
+                'totalWaitSeconds': round(self.total_wait_time, 3),
+                'avgWaitSeconds': round(self.total_wait_time / self.leases, 3) if self.leases else 0.0,
+                'maxWaitSeconds': round(self.max_wait_time, 3),
+            }
+
+    def close(self):
+        """Quit all idle drivers and refuse new leases"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled.driver)
@@ -0,0 +1,99 @@
+"""Disk-backed cache of crawled website emails shared across jobs"""
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def normalize_domain(url):
+    """Cache key for a website: its lowercased host without "www." """
+    if "://" not in url:
+        url = "http://" + url
+    host = (urlsplit(url.strip()).hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+class EmailCache:
+    """Emails found per domain, with a TTL and least-recently-used eviction.
+
+    Entries older than ttl_seconds are treated as missing. Once the cache
+    holds more than max_entries domains, the least recently read ones are
+    evicted.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS email_cache (
+        domain TEXT PRIMARY KEY,
+        emails TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS email_cache_last_access ON email_cache (last_access);
+    """
+
+    def __init__(self, db_path, ttl_seconds=7 * 24 * 3600, max_entries=50000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self._puts_since_evict = 0
+
+    def get(self, url):
+        """Cached emails of the url's domain, or None on a miss"""
+        domain = normalize_domain(url)
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT emails, fetched_at FROM email_cache WHERE domain = ?", (domain,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM email_cache WHERE domain = ?", (domain,))
+                return None
+            self.conn.execute(
+                "UPDATE email_cache SET last_access = ? WHERE domain = ?", (now, domain)
+            )
+            return row[0]
+
+    def put(self, url, emails):
+        domain = normalize_domain(url)
+        if not domain:
+            return
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO email_cache (domain, emails, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (domain, emails, now, now)
+            )
+            # Evict in batches rather than counting rows on every write
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= 100:
+                self._evict()
+
+    def _evict(self):
+        self._puts_since_evict = 0
+        self.conn.execute(
+            "DELETE FROM email_cache WHERE fetched_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        count = self.conn.execute("SELECT COUNT(*) FROM email_cache").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM email_cache WHERE domain IN "
+                "(SELECT domain FROM email_cache ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def evict(self):
+        """Drop expired entries and trim the cache to max_entries"""
+        with self._lock, self.conn:
+            self._evict()
+
+    def size(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM email_cache").fetchone()[0]
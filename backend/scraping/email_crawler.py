@@ -0,0 +1,175 @@
+"""Asyncio email crawler that replaces the per-job DomainExplorer threads"""
+import asyncio
+import codecs
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from scraping.domain_explorer import DomainExplorer, logger
+from scraping.email_extraction import EmailScanner
+from scraping.metrics import CRAWL_BYTES, CRAWL_DOMAIN_SECONDS, CRAWL_PAGES, HTTP_ERRORS, JobMetrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36"
+
+# Responses of other content types (PDFs, images, video) are never downloaded
+SCANNED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+CHUNK_SIZE = 64 * 1024
+
+
+class EmailCrawler:
+    """Crawls websites for emails on a single event loop.
+
+    One aiohttp session (pooled keep-alive connections) is shared by all
+    domains of a crawl. `concurrency` bounds the requests in flight in
+    total and `per_host` bounds them per host. Each website is crawled
+    for at most max_pages pages or max_bytes bytes, and no more than
+    max_body_bytes are read of a single response. The crawl returns once
+    every website has been explored. Pages, bytes and failed requests are
+    counted in the job's metrics.
+    """
+    def __init__(self, concurrency=20, per_host=4, timeout=5, verify_ssl=False, cancel_event=None,
+                 cache=None, max_pages=10, max_bytes=5 * 1024 * 1024,
+                 max_body_bytes=2 * 1024 * 1024, metrics=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+        # Workers stop picking up new domains once this is set
+        self.cancel_event = cancel_event
+        # Optional EmailCache consulted by DomainExplorer before fetching
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.bytes_downloaded = 0
+        self.max_body_bytes = max_body_bytes
+        self.responses_truncated = 0
+        self.responses_skipped = 0
+        # Pages and bytes per crawled (not cached) website
+        self.domains = {}
+        self.metrics = metrics if metrics is not None else JobMetrics()
+
+        self.session = None
+        self._requests = None
+        self._hosts = {}
+
+    def run(self, websites, on_result):
+        """Crawl websites to completion from synchronous code.
+
+        on_result(domain, emails) is called once per explored website.
+        """
+        asyncio.run(self.crawl(websites, on_result))
+
+    async def crawl(self, websites, on_result):
+        """Explore every website with a fixed number of worker tasks"""
+        work = asyncio.Queue()
+        for website in dict.fromkeys(websites):
+            work.put_nowait(website)
+
+        self._requests = asyncio.Semaphore(self.concurrency)
+        self._hosts = {}
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            ssl=None if self.verify_ssl else False,
+            keepalive_timeout=30
+        )
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"user-agent": USER_AGENT}
+        ) as session:
+            self.session = session
+            workers = [
+                asyncio.create_task(self._worker(work, on_result))
+                for _i in range(min(self.concurrency, work.qsize()))
+            ]
+            print(f"Started {len(workers)} crawl workers")
+            await asyncio.gather(*workers)
+        self.session = None
+        print("Domains finished processing")
+
+    async def _worker(self, work, on_result):
+        while self.cancel_event is None or not self.cancel_event.is_set():
+            try:
+                domain = work.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.monotonic()
+            try:
+                domain, emails = await DomainExplorer(domain, self).main()
+                self.metrics.observe(CRAWL_DOMAIN_SECONDS, time.monotonic() - started)
+                on_result(domain, emails)
+            except Exception as e:
+                self.request_failed(e)
+                logger.error(f"{domain} Didn't Process because: {e!r}")
+
+    def stats(self):
+        """Counters of the last crawl"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'cacheHits': self.cache_hits,
+            'cacheMisses': self.cache_misses,
+            'cacheHitRatio': round(self.cache_hits / lookups, 3) if lookups else 0.0,
+            'pagesFetched': self.pages_fetched,
+            'pagesFailed': self.pages_failed,
+            'bytesDownloaded': self.bytes_downloaded,
+            'responsesTruncated': self.responses_truncated,
+            'responsesSkipped': self.responses_skipped,
+            'domains': self.domains,
+        }
+
+    def domain_crawled(self, domain, pages, size):
+        self.pages_fetched += pages
+        self.bytes_downloaded += size
+        self.domains[domain] = {'pagesFetched': pages, 'bytesDownloaded': size}
+        self.metrics.count(CRAWL_PAGES, pages)
+        self.metrics.count(CRAWL_BYTES, size)
+
+    def request_failed(self, error):
+        """Count a request that raised instead of returning a page"""
+        self.metrics.count(HTTP_ERRORS, reason=type(error).__name__)
+
+    async def fetch(self, url, emails=None):
+        """GET a page under the global and per-host limits.
+
+        The body is streamed and scanned for emails (added to the emails
+        dict) as it arrives. Reading stops after max_body_bytes, and
+        non-HTML responses aren't read at all. Returns the page text and
+        the bytes read.
+        """
+        host = urlsplit(url).hostname or ""
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        async with self._requests, self._hosts[host]:
+            async with self.session.get(url) as response:
+                if response.status >= 400:
+                    self.metrics.count(HTTP_ERRORS, reason=f"{response.status // 100}xx")
+                content_type = response.content_type
+                if response.headers.get('Content-Type') and content_type not in SCANNED_CONTENT_TYPES:
+                    self.responses_skipped += 1
+                    return "", 0
+
+                try:
+                    decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+                except LookupError:
+                    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                scanner = EmailScanner(emails)
+                parts = []
+                size = 0
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    chunk = chunk[:self.max_body_bytes - size]
+                    size += len(chunk)
+                    text = decoder.decode(chunk)
+                    scanner.feed(text)
+                    parts.append(text)
+                    if size >= self.max_body_bytes:
+                        self.responses_truncated += 1
+                        break
+                text = decoder.decode(b"", final=True)
+                scanner.feed(text)
+                scanner.close()
+                parts.append(text)
+                return "".join(parts), size
@@ -0,0 +1,175 @@
+"""Email and link extraction from raw HTML.
+
+Everything here works on the page text with precompiled patterns and
+never builds a DOM. Email scanning only looks at the text around each
+"@", so pages without one cost a single substring search.
+"""
+import re
+from html import unescape
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+
+# Characters allowed in the local part (before the "@"). Quoted local
+# parts are valid but never show up on business websites.
+LOCAL_PART = re.compile(r"[A-Za-z0-9!#$%&'*+=?^_`{|}~.-]{1,64}$")
+# Domain labels after the "@", the last one being an alphabetic TLD
+DOMAIN_PART = re.compile(
+    r"(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.){1,8}[A-Za-z]{2,24}(?![A-Za-z0-9-])"
+)
+# Percent-encoded addresses only appear in mailto: links
+MAILTO = re.compile(r"mailto:([^\"'<>\s?]+)", re.IGNORECASE)
+HREF = re.compile(
+    r"<a\b[^>]*?\bhref\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))",
+    re.IGNORECASE
+)
+
+# Retina image names ("logo@2x.png") look like addresses
+FILE_SUFFIXES = frozenset((
+    'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'avif', 'ico', 'bmp',
+    'css', 'js', 'json', 'woff', 'woff2', 'ttf', 'mp4', 'webm', 'pdf',
+))
+
+# Longest local part worth looking back for
+LOOKBEHIND = 64
+# Text kept back from a chunk so addresses crossing into the next one
+# are scanned whole (longer than any DOMAIN_PART match)
+HOLDBACK = 600
+
+
+def _scan(text, emails, start=0, end=None):
+    """Add every address around an "@" of text[start:end] to emails (a dict used as an ordered set)"""
+    end = len(text) if end is None else end
+    at = text.find("@", start, end)
+    while at != -1:
+        domain = DOMAIN_PART.match(text, at + 1)
+        if domain:
+            local = LOCAL_PART.search(text, max(0, at - LOOKBEHIND), at)
+            if local:
+                address = local.group().strip(".") + "@" + domain.group()
+                suffix = domain.group().rsplit(".", 1)[-1].lower()
+                if suffix not in FILE_SUFFIXES and not address.startswith("@"):
+                    emails.setdefault(address.lower(), address)
+        at = text.find("@", at + 1, end)
+
+
+def _scan_mailto(text, emails, start=0, end=None):
+    end = len(text) if end is None else end
+    for match in MAILTO.finditer(text, start):
+        if match.start() >= end:
+            break
+        if "%40" in match.group(1):
+            _scan(unquote(match.group(1)), emails)
+
+
+def extract_emails(text, emails=None):
+    """Email addresses found in text, in order of first appearance.
+
+    Addresses are deduplicated case-insensitively. Pass an existing dict
+    as emails to accumulate the addresses of several pages.
+    """
+    if emails is None:
+        emails = {}
+    if not text:
+        return emails
+    if "@" in text:
+        _scan(text, emails)
+    if "%40" in text:
+        _scan_mailto(text, emails)
+    return emails
+
+
+class EmailScanner:
+    """Scans a page for email addresses chunk by chunk as it downloads.
+
+    Addresses are added to emails like extract_emails does. The end of
+    every chunk is held back until the next one arrives, so an address
+    split between two chunks is still found whole.
+    """
+    def __init__(self, emails=None):
+        self.emails = {} if emails is None else emails
+        self._carry = ""
+        # Offset in _carry up to which "@"s have been scanned
+        self._scanned = 0
+
+    def feed(self, text):
+        buffer = self._carry + text
+        end = len(buffer) - HOLDBACK
+        if end <= self._scanned:
+            self._carry = buffer
+            return
+        _scan(buffer, self.emails, self._scanned, end)
+        _scan_mailto(buffer, self.emails, self._scanned, end)
+        keep = max(0, end - LOOKBEHIND)
+        self._carry = buffer[keep:]
+        self._scanned = end - keep
+
+    def close(self):
+        """Scan the held back text once the page is complete"""
+        _scan(self._carry, self.emails, self._scanned)
+        _scan_mailto(self._carry, self.emails, self._scanned)
+        self._carry = ""
+        self._scanned = 0
+        return self.emails
+
+
+def site_host(hostname):
+    """Host of a website as compared between its pages: lowercased, without "www." """
+    host = (hostname or "").lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def _resolve_href(href, page_url, host, origin):
+    """Absolute URL of href without its fragment, None unless it is an http(s) link into host"""
+    if "&" in href:
+        href = unescape(href)
+    href = href.strip()
+    absolute = href[:8].lower().startswith(("http://", "https://"))
+    # Most off-site links are absolute and can be told apart without parsing
+    if absolute and host not in href.lower():
+        return None
+    # Root-relative paths stay on the page's site and need no joining
+    if href[:1] == "/" and href[1:2] != "/" and "/." not in href and "\\" not in href:
+        return origin + href.split("#", 1)[0]
+    try:
+        if absolute and "/." not in href:
+            url = href.split("#", 1)[0]
+        else:
+            url = urldefrag(urljoin(page_url, href)).url
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or site_host(parts.hostname) != host:
+            return None
+    except ValueError:
+        # Malformed hrefs (bad IPv6 hosts, ports) aren't worth following
+        return None
+    return url
+
+
+def extract_anchors(html, page_url, host=None):
+    """(url, label) of html's <a> tags that link to the same site, first occurrence only.
+
+    Hrefs are resolved against page_url, and kept when their host is
+    host (page_url's own host by default), with or without "www.". The
+    label is the text right after the opening tag, enough to tell a
+    "Contact us" link from the rest.
+    """
+    page = urlsplit(page_url)
+    host = site_host(host or page.hostname)
+    origin = f"{page.scheme}://{page.netloc}"
+    anchors = {}
+    # Resolved URL (None when off-site) of every href seen, pages repeat theirs a lot
+    resolved = {}
+    for match in HREF.finditer(html):
+        href = match.group(1) or match.group(2) or match.group(3) or ""
+        if href in resolved:
+            url = resolved[href]
+        else:
+            url = resolved[href] = _resolve_href(href, page_url, host, origin)
+        if url is not None and url not in anchors:
+            start = html.find(">", match.end()) + 1
+            end = html.find("<", start, start + 200) if start else -1
+            anchors[url] = html[start:end].strip() if end != -1 else ""
+    return list(anchors.items())
+
+
+def extract_links(html, page_url, host=None):
+    """Absolute links of html's <a> tags that point into the same site"""
+    return [url for url, _label in extract_anchors(html, page_url, host)]
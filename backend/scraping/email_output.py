@@ -1,26 +1,83 @@
 """Email Collector class"""
 from threading import Thread
-import json
+import queue
+import time
+from scraping.metrics import FLUSH_BYTES, JobMetrics
 
 class EmailOutput(Thread):
-    """Email Collector Class"""
-    def __init__(self, results, json_data, job_file):
+    """Email Collector Class
+
+    Domain results are coalesced and written to the job store in batches:
+    after batch_size updates or flush_interval seconds, whichever comes
+    first, plus a final flush when the crawl is drained. on_flush(websites)
+    is called with the websites of every flush once they are stored.
+    Flushes are timed as the 'flush' span of the job's metrics.
+    """
+    def __init__(self, results, job_id, job_manager, batch_size=25, flush_interval=2.0, on_event=None,
+                 on_flush=None, metrics=None):
         Thread.__init__(self)
         self.work = results
-        self.json_data = json_data
-        self.job_file = job_file
+        self.job_id = job_id
+        self.job_manager = job_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_event = on_event
+        self.on_flush = on_flush
+        self.metrics = metrics if metrics is not None else JobMetrics()
+
+        self.pending = {}
+        self.last_flush = time.monotonic()
+        self.updates = 0
+        self.flushes = 0
+        self.payload_bytes = 0
 
     def run(self):
         while True:
-            domain, emaillist = self.work.get()
-            print(domain)
-            for website in self.json_data['results']:
-                if website["website"] == domain:  # This will include websites that are explicitly null
-                    website["emails"] = emaillist
-
-            print(self.job_file)
-            # Write the updated JSON back to the file
-            with open(self.job_file, 'w') as file:
-                json.dump(self.json_data, file, indent=4)
-            
-            self.work.task_done()
\ No newline at end of file
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - self.last_flush))
+            try:
+                item = self.work.get(timeout=timeout)
+            except queue.Empty:
+                if self.pending:
+                    self.flush()
+                else:
+                    self.last_flush = time.monotonic()
+                continue
+
+            if item is None:
+                # The crawl is drained
+                if self.pending:
+                    self.flush()
+                self.work.task_done()
+                break
+
+            domain, emaillist = item
+            self.pending[domain] = emaillist
+            self.updates += 1
+            self.work.task_done()
+            if self.on_event is not None:
+                self.on_event('emails', {'website': domain, 'emails': emaillist})
+                self.on_event('counts', {'domainsCrawled': self.updates})
+
+            if (len(self.pending) >= self.batch_size
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self):
+        """Write the pending emails to the job store"""
+        with self.metrics.span('flush'):
+            payload_bytes = self.job_manager.update_result_emails(self.job_id, self.pending)
+        self.metrics.count(FLUSH_BYTES, payload_bytes)
+        self.payload_bytes += payload_bytes
+        self.flushes += 1
+        if self.on_flush is not None:
+            self.on_flush(list(self.pending))
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    def stats(self):
+        """Flush counts and the payload bytes of the flushed emails"""
+        return {
+            'updates': self.updates,
+            'flushes': self.flushes,
+            'payloadBytes': self.payload_bytes,
+        }
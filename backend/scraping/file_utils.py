@@ -0,0 +1,26 @@
+"""Helpers for writing job files"""
+import os
+import json
+import tempfile
+
+
+def atomic_write_json(file_path, data, indent=2):
+    """Write JSON to a temp file in the same directory and rename it over file_path.
+
+    Readers see either the old or the new file, never a partial one.
+    Returns the number of bytes written.
+    """
+    payload = json.dumps(data, indent=indent).encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(payload)
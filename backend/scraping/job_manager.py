@@ -1,65 +1,84 @@
 import os
-import json
+from config import Config
+from scraping.job_store import create_job_store
 
 class JobManager:
-    def __init__(self, jobs_dir='jobs'):
+    def __init__(self, jobs_dir='jobs', store=None):
         self.jobs_dir = jobs_dir
         
         # Create jobs directory if it doesn't exist
         if not os.path.exists(self.jobs_dir):
             os.makedirs(self.jobs_dir)
-            
-        # Load existing jobs
-        self.jobs = self._load_jobs()
-    
-    def _load_jobs(self):
-        """Load all jobs from the jobs directory"""
-        jobs_data = {}
-        if os.path.exists(self.jobs_dir):
-            for filename in os.listdir(self.jobs_dir):
-                if filename.endswith('.json'):
-                    job_id = filename[:-5]  # Remove .json extension
-                    file_path = os.path.join(self.jobs_dir, filename)
-                    try:
-                        with open(file_path, 'r') as f:
-                            job_data = json.load(f)
-                            jobs_data[job_id] = job_data
-                    except json.JSONDecodeError:
-                        print(f"Error reading job file: {file_path}")
-        return jobs_data
+
+        # Per-job JSON files are imported into the SQLite store on first use
+        self.store = store if store is not None else create_job_store(
+            Config.JOB_STORE, self.jobs_dir, Config.JOB_DB_PATH
+        )
     
     def save_job(self, job_id, job_data):
-        """Save a job to file and update in-memory cache"""
-        file_path = os.path.join(self.jobs_dir, f"{job_id}.json")
-        with open(file_path, 'w') as f:
-            json.dump(job_data, f, indent=2)
-        self.jobs[job_id] = job_data
+        """Save a job to the store"""
+        job_data['id'] = job_id
+        self.store.save_job(job_data)
         
-    def get_job(self, job_id):
-        """Get a job by ID directly from file to ensure latest data"""
-        file_path = os.path.join(self.jobs_dir, f"{job_id}.json")
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return None
-        return None
+    def get_job(self, job_id, include_results=True):
+        """Get a job by ID, optionally without its results"""
+        return self.store.get_job(job_id, include_results=include_results)
         
     def update_job_status(self, job_id, status, results=None, completion_time=None):
         """Update a job's status and optionally its results"""
-        job = self.get_job(job_id)
-        if job:
-            job['status'] = status
-            if results is not None:
-                job['results'] = results
-            if completion_time is not None:
-                job['completedAt'] = completion_time
-            self.save_job(job_id, job)
-            return True
-        return False
+        fields = {'status': status}
+        if completion_time is not None:
+            fields['completedAt'] = completion_time
+        return self.store.update_job(job_id, fields, results=results)
+
+    def update_job_fields(self, job_id, fields, results=None, append=None):
+        """Set extra fields (stats, progress) and optionally the results of a job.
+
+        results replaces all of the job's results, append adds results
+        after the stored ones.
+        """
+        return self.store.update_job(job_id, fields, results=results, append=append)
+
+    def update_result_emails(self, job_id, emails_by_website):
+        """Store crawled emails on the job's results, returns their payload bytes"""
+        return self.store.update_emails(job_id, emails_by_website)
         
+    def get_job_results(self, job_id, filters=None, sort='position', order='asc', page=1, page_size=50):
+        """Get one page of a job's filtered and sorted results"""
+        total, results = self.store.query_results(
+            job_id, filters or {}, sort=sort, order=order,
+            offset=(page - 1) * page_size, limit=page_size
+        )
+        return {
+            'jobId': job_id,
+            'page': page,
+            'pageSize': page_size,
+            'total': total,
+            'totalPages': (total + page_size - 1) // page_size,
+            'results': results
+        }
+
+    def iter_job_results(self, job_id):
+        """Iterate over a job's results without loading them all at once"""
+        return self.store.iter_results(job_id)
+
     def get_all_jobs(self):
-        """Get all jobs (refreshes from disk first)"""
-        self.jobs = self._load_jobs()
-        return self.jobs
\ No newline at end of file
+        """Get all jobs, keyed by ID, including their results"""
+        return {job['id']: job for job in self.store.list_jobs()}
+
+    def get_job_summaries(self):
+        """Get all jobs without their results"""
+        return self.store.list_summaries()
+
+    def find_orphaned_jobs(self):
+        """Jobs left unfinished by a process that stopped.
+
+        These are queued and running jobs, plus completed jobs whose email
+        crawl was interrupted. Call this before starting new jobs.
+        """
+        return [
+            job for job in self.store.list_summaries()
+            if job.get('status') in ('queued', 'running')
+            or (job.get('status') == 'completed'
+                and (job.get('checkpoint') or {}).get('phase') == 'email')
+        ]
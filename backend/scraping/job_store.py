@@ -0,0 +1,481 @@
+"""Job store backends used by JobManager"""
+import os
+import re
+import json
+import sqlite3
+import threading
+from scraping.file_utils import atomic_write_json
+
+# Job fields kept in their own columns by the SQLite store; anything else
+# is stored in the job's `extra` JSON blob
+SUMMARY_FIELDS = ('id', 'location', 'radius', 'type', 'status', 'createdAt', 'completedAt')
+
+
+def parse_rating(value):
+    """Turn a Maps rating like "4,5" into a float"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"\d+(?:[.,]\d+)?", str(value or ""))
+    return float(match.group(0).replace(",", ".")) if match else 0.0
+
+
+def parse_reviews(value):
+    """Turn a Maps review count like "1.200" or "(1,200)" into an int"""
+    if isinstance(value, int):
+        return value
+    digits = re.sub(r"\D", "", str(value or ""))
+    return int(digits) if digits else 0
+
+
+# Result fields the results endpoint can sort on
+RESULT_SORT_FIELDS = ('position', 'name', 'address', 'rating', 'reviews', 'type', 'phone')
+
+# Result fields searched by the free-text filter
+RESULT_SEARCH_FIELDS = ('name', 'address', 'type', 'phone', 'website', 'emails')
+
+
+def filter_results(results, filters):
+    """Apply the results endpoint filters to a list of result dicts"""
+    filtered = []
+    query = (filters.get('q') or '').lower()
+    for result in results:
+        if filters.get('type') and result.get('type') != filters['type']:
+            continue
+        if filters.get('has_website') is not None and bool(result.get('website')) != filters['has_website']:
+            continue
+        if filters.get('has_email') is not None and bool(result.get('emails')) != filters['has_email']:
+            continue
+        if filters.get('min_rating') is not None and parse_rating(result.get('rating')) < filters['min_rating']:
+            continue
+        if query and not any(query in str(result.get(field) or '').lower() for field in RESULT_SEARCH_FIELDS):
+            continue
+        filtered.append(result)
+    return filtered
+
+
+def sort_results(results, sort='position', order='asc'):
+    """Sort result dicts the way SqliteJobStore sorts rows"""
+    reverse = order == 'desc'
+    if sort == 'position':
+        return list(reversed(results)) if reverse else list(results)
+    if sort == 'rating':
+        key = lambda result: parse_rating(result.get('rating'))
+    elif sort == 'reviews':
+        key = lambda result: parse_reviews(result.get('reviews'))
+    else:
+        key = lambda result: str(result.get(sort) or '')
+    return sorted(results, key=key, reverse=reverse)
+
+
+def summarize_job(job):
+    """Job fields without results, plus result and email counts"""
+    results = job.get('results') or []
+    summary = {key: value for key, value in job.items() if key != 'results'}
+    summary['resultCount'] = len(results)
+    summary['emailCount'] = sum(1 for result in results if result.get('emails'))
+    return summary
+
+
+def payload_bytes(emails_by_website):
+    """UTF-8 size of the emails of an update_emails call.
+
+    Both stores report this figure, whatever they write around it.
+    """
+    return sum(len(str(emails).encode('utf-8')) for emails in emails_by_website.values())
+
+
+class JsonJobStore:
+    """One JSON file per job, as written by earlier versions.
+
+    Summaries are cached per file and only re-parsed when the file's
+    mtime or size changes.
+    """
+    def __init__(self, jobs_dir):
+        self.jobs_dir = jobs_dir
+        self._summaries = {}
+        self._lock = threading.RLock()
+
+        if not os.path.exists(self.jobs_dir):
+            os.makedirs(self.jobs_dir)
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _read(self, job_id):
+        file_path = self._path(job_id)
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error reading job file: {file_path}")
+        return None
+
+    def save_job(self, job):
+        with self._lock:
+            atomic_write_json(self._path(job['id']), job)
+
+    def get_job(self, job_id, include_results=True):
+        job = self._read(job_id)
+        if job is not None and not include_results:
+            return summarize_job(job)
+        return job
+
+    def update_job(self, job_id, fields, results=None, append=None):
+        with self._lock:
+            job = self._read(job_id)
+            if job is None:
+                return False
+            job.update(fields)
+            if results is not None:
+                job['results'] = results
+            if append:
+                job['results'] = job.get('results', []) + list(append)
+            atomic_write_json(self._path(job_id), job)
+            return True
+
+    def update_emails(self, job_id, emails_by_website):
+        """Set the emails of every result whose website was crawled.
+
+        Returns the payload_bytes of the emails.
+        """
+        with self._lock:
+            job = self._read(job_id)
+            if job is None:
+                return 0
+            for result in job.get('results', []):
+                website = result.get('website')
+                if website in emails_by_website:
+                    result['emails'] = emails_by_website[website]
+            atomic_write_json(self._path(job_id), job)
+        return payload_bytes(emails_by_website)
+
+    def query_results(self, job_id, filters, sort='position', order='asc', offset=0, limit=50):
+        """Filter, sort and page a job's results, returns (total, results)"""
+        job = self._read(job_id)
+        if job is None:
+            return 0, []
+        results = sort_results(filter_results(job.get('results', []), filters), sort, order)
+        return len(results), results[offset:offset + limit]
+
+    def iter_results(self, job_id, batch_size=500):
+        """A job's results in position order"""
+        job = self._read(job_id)
+        if job is not None:
+            yield from job.get('results', [])
+
+    def list_job_ids(self):
+        return [
+            filename[:-5] for filename in os.listdir(self.jobs_dir)
+            if filename.endswith('.json') and not filename.startswith('.')
+        ]
+
+    def list_jobs(self):
+        jobs = []
+        for job_id in self.list_job_ids():
+            job = self._read(job_id)
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+    def list_summaries(self):
+        summaries = []
+        seen = set()
+        for job_id in self.list_job_ids():
+            seen.add(job_id)
+            try:
+                stat = os.stat(self._path(job_id))
+            except FileNotFoundError:
+                continue
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._summaries.get(job_id)
+            if cached is None or cached[0] != key:
+                job = self._read(job_id)
+                if job is None:
+                    continue
+                cached = (key, summarize_job(job))
+                self._summaries[job_id] = cached
+            summaries.append(cached[1])
+        for job_id in set(self._summaries) - seen:
+            del self._summaries[job_id]
+        return summaries
+
+
+class SqliteJobStore:
+    """Jobs in a SQLite database, with results in their own table.
+
+    The jobs table carries the summary columns and counts, so listing
+    jobs never touches the results.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        location TEXT,
+        radius INTEGER,
+        type TEXT,
+        status TEXT,
+        created_at TEXT,
+        completed_at TEXT,
+        result_count INTEGER NOT NULL DEFAULT 0,
+        email_count INTEGER NOT NULL DEFAULT 0,
+        extra TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at);
+    CREATE TABLE IF NOT EXISTS results (
+        job_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        name TEXT,
+        type TEXT,
+        rating REAL,
+        reviews INTEGER,
+        website TEXT,
+        emails TEXT,
+        data TEXT NOT NULL,
+        PRIMARY KEY (job_id, position)
+    );
+    CREATE INDEX IF NOT EXISTS results_website ON results (job_id, website);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _job_row(self, job):
+        extra = {key: value for key, value in job.items()
+                 if key not in SUMMARY_FIELDS and key != 'results'}
+        return (
+            job['id'], job.get('location'), job.get('radius'), job.get('type'),
+            job.get('status'), job.get('createdAt'), job.get('completedAt'),
+            json.dumps(extra)
+        )
+
+    def _row_to_job(self, row):
+        job = {
+            'id': row['id'],
+            'location': row['location'],
+            'radius': row['radius'],
+            'type': row['type'],
+            'status': row['status'],
+            'createdAt': row['created_at'],
+        }
+        if row['completed_at'] is not None:
+            job['completedAt'] = row['completed_at']
+        job.update(json.loads(row['extra']))
+        return job
+
+    def _replace_results(self, job_id, results):
+        self.conn.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+        self._insert_results(job_id, results)
+        self._refresh_counts(job_id)
+
+    def _append_results(self, job_id, results):
+        """Add results after the job's last one, without touching the stored ones"""
+        start = self.conn.execute(
+            "SELECT COALESCE(MAX(position), -1) + 1 FROM results WHERE job_id = ?", (job_id,)
+        ).fetchone()[0]
+        self._insert_results(job_id, results, start)
+        self.conn.execute(
+            "UPDATE jobs SET result_count = result_count + ?, email_count = email_count + ? WHERE id = ?",
+            (len(results), sum(1 for result in results if result.get('emails')), job_id)
+        )
+
+    def _insert_results(self, job_id, results, start=0):
+        self.conn.executemany(
+            "INSERT INTO results (job_id, position, name, type, rating, reviews, website, emails, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (job_id, position, result.get('name'), result.get('type'),
+                 parse_rating(result.get('rating')), parse_reviews(result.get('reviews')),
+                 result.get('website'), result.get('emails') or "", json.dumps(result))
+                for position, result in enumerate(results, start)
+            ]
+        )
+
+    def _refresh_counts(self, job_id):
+        self.conn.execute(
+            "UPDATE jobs SET "
+            "result_count = (SELECT COUNT(*) FROM results WHERE job_id = ?), "
+            "email_count = (SELECT COUNT(*) FROM results WHERE job_id = ? AND emails != '') "
+            "WHERE id = ?",
+            (job_id, job_id, job_id)
+        )
+
+    def save_job(self, job):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, location, radius, type, status, created_at, completed_at, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._job_row(job)
+            )
+            self._replace_results(job['id'], job.get('results') or [])
+
+    def get_job(self, job_id, include_results=True):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._row_to_job(row)
+            if include_results:
+                job['results'] = self.get_results(job_id)
+            else:
+                job['resultCount'] = row['result_count']
+                job['emailCount'] = row['email_count']
+            return job
+
+    def get_results(self, job_id):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM results WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def update_job(self, job_id, fields, results=None, append=None):
+        with self._lock, self.conn:
+            job = self.get_job(job_id, include_results=False)
+            if job is None:
+                return False
+            job.pop('resultCount', None)
+            job.pop('emailCount', None)
+            job.update(fields)
+            self.conn.execute(
+                "UPDATE jobs SET location = ?, radius = ?, type = ?, status = ?, "
+                "created_at = ?, completed_at = ?, extra = ? WHERE id = ?",
+                self._job_row(job)[1:] + (job_id,)
+            )
+            if results is not None:
+                self._replace_results(job_id, results)
+            if append:
+                self._append_results(job_id, list(append))
+            return True
+
+    def update_emails(self, job_id, emails_by_website):
+        """Set the emails of every result whose website was crawled.
+
+        Returns the payload_bytes of the emails.
+        """
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE results SET emails = ?, data = json_set(data, '$.emails', ?) "
+                "WHERE job_id = ? AND website = ?",
+                [(emails, emails, job_id, website)
+                 for website, emails in emails_by_website.items()]
+            )
+            self._refresh_counts(job_id)
+        return payload_bytes(emails_by_website)
+
+    def query_results(self, job_id, filters, sort='position', order='asc', offset=0, limit=50):
+        """Filter, sort and page a job's results, returns (total, results)"""
+        clauses = ["job_id = ?"]
+        params = [job_id]
+        if filters.get('type'):
+            clauses.append("type = ?")
+            params.append(filters['type'])
+        if filters.get('has_website') is not None:
+            clauses.append("COALESCE(website, '') != ''" if filters['has_website'] else "COALESCE(website, '') = ''")
+        if filters.get('has_email') is not None:
+            clauses.append("COALESCE(emails, '') != ''" if filters['has_email'] else "COALESCE(emails, '') = ''")
+        if filters.get('min_rating') is not None:
+            clauses.append("rating >= ?")
+            params.append(filters['min_rating'])
+        if filters.get('q'):
+            searchable = " || ' ' || ".join(
+                f"COALESCE(json_extract(data, '$.{field}'), '')" for field in RESULT_SEARCH_FIELDS
+            )
+            # % and _ in the search text are matched literally
+            q = filters['q'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append(f"({searchable}) LIKE ? ESCAPE '\\'")
+            params.append(f"%{q}%")
+        where = " AND ".join(clauses)
+
+        if sort not in RESULT_SORT_FIELDS:
+            raise ValueError(f"Cannot sort results by {sort}")
+        if sort in ('position', 'name', 'type', 'rating', 'reviews'):
+            sort_column = sort
+        else:
+            sort_column = f"json_extract(data, '$.{sort}')"
+        direction = "DESC" if order == 'desc' else "ASC"
+
+        with self._lock:
+            total = self.conn.execute(
+                f"SELECT COUNT(*) FROM results WHERE {where}", params
+            ).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT data FROM results WHERE {where} "
+                f"ORDER BY {sort_column} {direction}, position ASC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return total, [json.loads(row['data']) for row in rows]
+
+    def iter_results(self, job_id, batch_size=500):
+        """A job's results in position order, read batch_size rows at a time"""
+        position = -1
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT position, data FROM results WHERE job_id = ? AND position > ? "
+                    "ORDER BY position LIMIT ?",
+                    (job_id, position, batch_size)
+                ).fetchall()
+            for row in rows:
+                yield json.loads(row['data'])
+            if len(rows) < batch_size:
+                return
+            position = rows[-1]['position']
+
+    def list_job_ids(self):
+        with self._lock:
+            return [row['id'] for row in self.conn.execute("SELECT id FROM jobs")]
+
+    def list_jobs(self):
+        return [self.get_job(job_id) for job_id in self.list_job_ids()]
+
+    def list_summaries(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY created_at DESC").fetchall()
+        summaries = []
+        for row in rows:
+            summary = self._row_to_job(row)
+            summary['resultCount'] = row['result_count']
+            summary['emailCount'] = row['email_count']
+            summaries.append(summary)
+        return summaries
+
+
+def migrate_json_jobs(jobs_dir, store):
+    """Import per-job JSON files that the store doesn't have yet.
+
+    The files are left in place. Returns the number of imported jobs.
+    """
+    if not os.path.exists(jobs_dir):
+        return 0
+    known = set(store.list_job_ids())
+    source = JsonJobStore(jobs_dir)
+    imported = 0
+    for job_id in source.list_job_ids():
+        if job_id in known:
+            continue
+        job = source.get_job(job_id)
+        if job is None:
+            continue
+        job.setdefault('id', job_id)
+        store.save_job(job)
+        imported += 1
+    if imported:
+        print(f"Migrated {imported} job files from {jobs_dir}")
+    return imported
+
+
+def create_job_store(backend, jobs_dir, db_path):
+    """Build the configured job store backend"""
+    if backend == 'json':
+        return JsonJobStore(jobs_dir)
+    if backend == 'sqlite':
+        store = SqliteJobStore(db_path)
+        migrate_json_jobs(jobs_dir, store)
+        return store
+    raise ValueError(f"Unknown job store backend: {backend}")
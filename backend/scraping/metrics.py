@@ -0,0 +1,225 @@
+"""Counters, histograms and timing spans of the scraping pipeline.
+
+Metrics are recorded in the process-wide REGISTRY, which the /metrics
+route renders in the Prometheus text format, and in the JobMetrics of
+the job they belong to, which is stored on the job record.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in values]
+
+
+class Histogram:
+    """Observations counted into cumulative buckets per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: counts per bucket (the last one is +Inf) and the sum
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, list(counts), total) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback whenever metrics are rendered"""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self):
+        try:
+            return [f"{self.name} {self.read()}"]
+        except Exception as e:
+            print(f"Reading gauge {self.name} failed: {e}")
+            return []
+
+
+class MetricsRegistry:
+    """Named metrics of the process, rendered in the Prometheus text format"""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def gauge(self, name, help_text, read):
+        """Register (or replace) a gauge read from read() at render time"""
+        with self._lock:
+            self._metrics[name] = Gauge(name, help_text, read)
+            return self._metrics[name]
+
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PHASE_SECONDS = REGISTRY.histogram(
+    'scraper_phase_seconds', "Duration of job phases (driver, scroll, extraction, email_crawl, flush)"
+)
+LISTING_SECONDS = REGISTRY.histogram(
+    'scraper_listing_seconds', "Time to open and extract a single place",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+)
+LISTINGS = REGISTRY.counter('scraper_listings_total', "Places extracted, by extraction path")
+SELECTOR_FAILURES = REGISTRY.counter(
+    'scraper_selector_failures_total', "Place fields that could not be read, by field"
+)
+DRIVER_STARTUP_SECONDS = REGISTRY.histogram(
+    'driver_startup_seconds', "Time to launch a Chrome driver",
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+)
+CRAWL_DOMAIN_SECONDS = REGISTRY.histogram(
+    'crawler_domain_seconds', "Time to crawl a single website for emails",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+)
+CRAWL_PAGES = REGISTRY.counter('crawler_pages_total', "Pages fetched by the email crawler")
+CRAWL_BYTES = REGISTRY.counter('crawler_bytes_total', "Bytes downloaded by the email crawler")
+HTTP_ERRORS = REGISTRY.counter(
+    'crawler_http_errors_total', "Failed email crawler requests, by status class or exception"
+)
+FLUSH_BYTES = REGISTRY.counter(
+    'job_store_flush_payload_bytes_total', "UTF-8 bytes of the emails written by email result flushes"
+)
+JOBS = REGISTRY.counter('scraper_jobs_total', "Finished scraping jobs, by final status")
+
+
+class JobMetrics:
+    """Metrics of one job, recorded in REGISTRY and summarized for the job record"""
+    def __init__(self):
+        self._spans = {}
+        self._counters = {}
+        self._observations = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase):
+        """Time a phase of the job"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_span(phase, time.monotonic() - started)
+
+    def record_span(self, phase, seconds):
+        PHASE_SECONDS.observe(seconds, phase=phase)
+        with self._lock:
+            span = self._spans.setdefault(phase, {'count': 0, 'seconds': 0.0, 'maxSeconds': 0.0})
+            span['count'] += 1
+            span['seconds'] += seconds
+            span['maxSeconds'] = max(span['maxSeconds'], seconds)
+
+    def count(self, counter, amount=1, **labels):
+        counter.inc(amount, **labels)
+        key = counter.name + _format_labels(_label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, histogram, value, **labels):
+        histogram.observe(value, **labels)
+        key = histogram.name + _format_labels(_label_key(labels))
+        with self._lock:
+            self._observations.setdefault(key, []).append(value)
+
+    def snapshot(self):
+        """JSON-friendly summary of the job's spans, counters and histograms"""
+        with self._lock:
+            spans = {
+                phase: {
+                    'count': span['count'],
+                    'seconds': round(span['seconds'], 3),
+                    'maxSeconds': round(span['maxSeconds'], 3),
+                }
+                for phase, span in self._spans.items()
+            }
+            counters = dict(self._counters)
+            histograms = {}
+            for key, values in self._observations.items():
+                ordered = sorted(values)
+                histograms[key] = {
+                    'count': len(ordered),
+                    'avg': round(sum(ordered) / len(ordered), 3),
+                    'p50': round(ordered[len(ordered) // 2], 3),
+                    'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                    'max': round(ordered[-1], 3),
+                }
+        return {'spans': spans, 'counters': counters, 'histograms': histograms}
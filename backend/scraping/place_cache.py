@@ -0,0 +1,104 @@
+"""Disk-backed cache of extracted place details shared across jobs"""
+import re
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+# Feature ID ("!1s0x...:0x...") and place ID ("!19sChIJ...") embedded in
+# the data segment of Maps place URLs
+FEATURE_ID_PATTERN = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", re.IGNORECASE)
+PLACE_ID_PATTERN = re.compile(r"!19s([A-Za-z0-9_-]+)")
+
+
+def place_key(url):
+    """Stable key of a Maps place URL.
+
+    Prefers the place or feature ID from the URL's data segment and falls
+    back to the /maps/place/<name> path without the viewport and query.
+    """
+    if not url:
+        return None
+    decoded = unquote(url)
+    match = PLACE_ID_PATTERN.search(decoded)
+    if match:
+        return match.group(1)
+    match = FEATURE_ID_PATTERN.search(decoded)
+    if match:
+        return match.group(1).lower()
+    path = urlsplit(decoded).path.split("/data=")[0]
+    path = re.sub(r"/@[^/]*", "", path)
+    return path.rstrip("/") or None
+
+
+def place_identity(result):
+    """Name and address key of an extracted place, for results without a URL"""
+    name = re.sub(r"\W+", " ", (result.get('name') or "").lower()).strip()
+    address = re.sub(r"\W+", " ", (result.get('address') or "").lower()).strip()
+    return name, address
+
+
+class PlaceCache:
+    """Place details keyed by place_key, considered fresh for ttl_seconds"""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS place_cache (
+        place_key TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        data TEXT NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, db_path, ttl_seconds=7 * 24 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.purge_expired()
+
+    def get_many(self, urls):
+        """Fresh cached details of the given place URLs, keyed by URL"""
+        keys = {}
+        for url in urls:
+            key = place_key(url)
+            if key:
+                keys.setdefault(key, []).append(url)
+        if not keys:
+            return {}
+
+        cutoff = time.time() - self.ttl_seconds
+        found = {}
+        key_list = list(keys)
+        with self._lock:
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT place_key, data FROM place_cache "
+                    f"WHERE fetched_at >= ? AND place_key IN ({', '.join('?' * len(chunk))})",
+                    [cutoff] + chunk
+                ).fetchall()
+                for key, data in rows:
+                    for url in keys[key]:
+                        found[url] = json.loads(data)
+        return found
+
+    def put(self, url, result):
+        key = place_key(url)
+        if not key:
+            return
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO place_cache (place_key, url, data, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, url, json.dumps(result), time.time())
+            )
+
+    def purge_expired(self):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM place_cache WHERE fetched_at < ?", (time.time() - self.ttl_seconds,)
+            )
@@ -0,0 +1,113 @@
+"""Place detail extraction in a single script call, driven by selector sets.
+
+A selector set is a JSON file listing, per field, a CSS selector or an
+XPath and what to read from the element ("text", "href" or any
+attribute name). The bundled sets live in scraping/selectors/ as
+maps-v<version>.json; the highest version is used unless another set
+(a version number or a path to a JSON file) is configured, so selectors
+can be updated when Maps changes its markup without a code change.
+"""
+import json
+import os
+import re
+from selenium.webdriver.common.by import By
+
+SELECTORS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'selectors')
+SELECTOR_FILE_PATTERN = re.compile(r"^maps-v(\d+)\.json$")
+
+# Reads every field of a selector set, null for fields that are missing
+EXTRACT_SCRIPT = """
+var fields = arguments[0];
+var values = {};
+Object.keys(fields).forEach(function (name) {
+    var field = fields[name];
+    var element = null;
+    try {
+        if (field.xpath) {
+            element = document.evaluate(
+                field.xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+        } else {
+            element = document.querySelector(field.css);
+        }
+    } catch (e) {
+        element = null;
+    }
+    if (!element) {
+        values[name] = null;
+    } else if (field.read === 'text') {
+        values[name] = element.innerText;
+    } else if (field.read === 'href') {
+        values[name] = element.href || element.getAttribute('href');
+    } else {
+        values[name] = element.getAttribute(field.read);
+    }
+});
+return values;
+"""
+
+
+class SelectorSetError(Exception):
+    """A selector set is missing or malformed"""
+
+
+def bundled_selector_sets():
+    """Versions of the bundled selector sets, keyed by version number"""
+    sets = {}
+    for filename in os.listdir(SELECTORS_DIR):
+        match = SELECTOR_FILE_PATTERN.match(filename)
+        if match:
+            sets[int(match.group(1))] = os.path.join(SELECTORS_DIR, filename)
+    return sets
+
+
+def load_selector_set(selector_set=None):
+    """Load a selector set by version number or path, the latest bundled one by default"""
+    bundled = bundled_selector_sets()
+    if not selector_set:
+        if not bundled:
+            raise SelectorSetError(f"No selector sets in {SELECTORS_DIR}")
+        path = bundled[max(bundled)]
+    elif str(selector_set).isdigit():
+        if int(selector_set) not in bundled:
+            raise SelectorSetError(f"No bundled selector set version {selector_set}")
+        path = bundled[int(selector_set)]
+    else:
+        path = selector_set
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SelectorSetError(f"Cannot load selector set {path}: {e}")
+    fields = data.get('fields') or {}
+    if 'name' not in fields:
+        raise SelectorSetError(f"Selector set {path} has no name field")
+    for name, field in fields.items():
+        if not (field.get('css') or field.get('xpath')) or not field.get('read'):
+            raise SelectorSetError(f"Selector set {path}: field {name} needs css or xpath, and read")
+    return data
+
+
+class PlaceExtractor:
+    """Reads all fields of the open place panel with one execute_script call"""
+    def __init__(self, selector_set=None):
+        self.selectors = load_selector_set(selector_set)
+        self.version = self.selectors.get('version')
+        self.fields = self.selectors['fields']
+        # Element that shows the place panel has loaded: the set's "ready"
+        # CSS selector, or else the name field's own selector
+        name = self.fields['name']
+        if self.selectors.get('ready'):
+            self.ready_locator = (By.CSS_SELECTOR, self.selectors['ready'])
+        elif name.get('xpath'):
+            self.ready_locator = (By.XPATH, name['xpath'])
+        else:
+            self.ready_locator = (By.CSS_SELECTOR, name['css'])
+
+    def read(self, driver):
+        """Raw field values of the place shown by the driver, None when unusable"""
+        values = driver.execute_script(EXTRACT_SCRIPT, self.fields)
+        if not isinstance(values, dict) or not (values.get('name') or "").strip():
+            return None
+        return values
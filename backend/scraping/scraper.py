@@ -1,32 +1,130 @@
-from selenium import webdriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from scraping.domain_explorer import DomainExplorer
+from scraping.area_tiles import MAPS_URL, parse_map_center, tile_grid, tile_search_url
+from scraping.driver_pool import build_chrome_driver
+from scraping.metrics import LISTING_SECONDS, LISTINGS, SELECTOR_FAILURES, JobMetrics
+from scraping.place_cache import place_identity, place_key
+from scraping.place_extractor import PlaceExtractor
+from scraping.scroll_engine import FeedScroller
+from scraping.email_crawler import EmailCrawler
 from scraping.email_output import EmailOutput
 import time
-import json
 import re
 import unicodedata
 import queue
+import threading
+
+class JobCancelled(Exception):
+    """Raised between listings once a job's cancel event is set"""
+
 
 class GoogleMapsScraper:
-    def __init__(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--start-fullscreen')
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
+    def __init__(self, driver=None, driver_pool=None, detail_mode='urls', detail_workers=1,
+                 scroll_timeout=2.0, scroll_max_timeout=8.0, scroll_max_stalls=3,
+                 email_concurrency=20, email_per_host=4, email_timeout=5,
+                 email_max_pages=10, email_max_bytes=5 * 1024 * 1024,
+                 email_max_body_bytes=2 * 1024 * 1024,
+                 email_flush_batch=25, email_flush_interval=2.0, on_event=None,
+                 cancel_event=None, email_cache=None, place_cache=None, incremental=False,
+                 tiled=False, tile_size_km=2.0, max_tiles=64, done_tiles=None,
+                 resume_results=None, on_tile_done=None, checkpoint=None,
+                 extraction_mode='bulk', selector_set=None, metrics=None, maps_url=MAPS_URL):
+        # A driver leased from a DriverPool is owned by the pool, not by us.
+        # Without one, Chrome is only launched once the driver is needed,
+        # so an email crawl alone never starts it.
+        self.owns_driver = driver is None
+        self._driver = driver
+        self._wait = None
+        self.maps_url = maps_url.rstrip('/')
+
+        # 'urls' collects place hrefs first and extracts them in parallel,
+        # 'click' clicks through the feed listing by listing
+        self.detail_mode = detail_mode
+        self.driver_pool = driver_pool
+        self.detail_workers = max(1, detail_workers)
+
+        self.scroll_timeout = scroll_timeout
+        self.scroll_max_timeout = scroll_max_timeout
+        self.scroll_max_stalls = scroll_max_stalls
+        self.scroll_stats = []
+
+        self.email_concurrency = email_concurrency
+        self.email_per_host = email_per_host
+        self.email_timeout = email_timeout
+        self.email_max_pages = email_max_pages
+        self.email_max_bytes = email_max_bytes
+        self.email_max_body_bytes = email_max_body_bytes
+        self.email_flush_batch = email_flush_batch
+        self.email_flush_interval = email_flush_interval
+        self.email_output_stats = None
+        self.email_cache = email_cache
+        self.crawl_stats = None
+
+        # Extracted places are always written to the place cache; in
+        # incremental mode fresh cached places are reused instead of
+        # being opened again
+        self.place_cache = place_cache
+        self.incremental = incremental
+        self.places_reused = 0
+        self.places_extracted = 0
+
+        # 'bulk' reads a place's fields with one script call using a
+        # selector set, falling back to one lookup per field when that
+        # fails; 'fields' always uses the per-field lookups
+        self.place_extractor = PlaceExtractor(selector_set) if extraction_mode == 'bulk' else None
+        self.bulk_extractions = 0
+        self.field_extractions = 0
+
+        # JobMetrics the phases, listings and selector failures are recorded in
+        self.metrics = metrics if metrics is not None else JobMetrics()
+
+        # JobCheckpoint of the job: extracted places are saved to it and
+        # places it already holds (from an interrupted run) are skipped
+        self.checkpoint = checkpoint
+        self.places_resumed = 0
+
+        # on_event(event, data) receives progress events for streaming
+        self.on_event = on_event
+        self.result_count = 0
+        self._count_lock = threading.Lock()
+
+        # Set by the scheduler to stop the job between listings
+        self.cancel_event = cancel_event
+
+        # Tiled searches split the radius into a grid of map viewports,
+        # each searched on its own, to get past the per-search result cap.
+        # Tiles in done_tiles (with their results in resume_results) are
+        # skipped; on_tile_done(done_tiles, total, results) is called after
+        # every finished tile.
+        self.tiled = tiled
+        self.tile_size_km = tile_size_km
+        self.max_tiles = max_tiles
+        self.done_tiles = list(done_tiles or [])
+        self.resume_results = list(resume_results or [])
+        self.on_tile_done = on_tile_done
         
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = build_chrome_driver()
+        return self._driver
+
+    @property
+    def wait(self):
+        if self._wait is None:
+            self._wait = WebDriverWait(self.driver, 10)
+        return self._wait
+
     def scrape(self, location, radius, type_filter):
+        if self.tiled:
+            return self.scrape_tiles(location, radius, type_filter)
+
         results = []
         
         # Handle different types of searches
@@ -36,105 +134,94 @@ class GoogleMapsScraper:
         else:
             results.extend(self._scrape_type(location, radius, type_filter))
 
+        # Keep checkpointed places the feed didn't show again this time
+        if self.checkpoint is not None:
+            found = {place_identity(result) for result in results}
+            results.extend(
+                result for result in self.checkpoint.results
+                if place_identity(result) not in found
+            )
+
         return results
         
-    def scrape_website_emails(self, job_file):
-        # Read the JSON file
-        with open(job_file, 'r') as file:
-            json_data = json.load(file)
-
-       # Extract all website fields
-        websites = []
-        for result in json_data['results']:
-            website = result.get('website')
-            if website is not None:  # This will include websites that are explicitly null
-                websites.append(website)
-
-        # Filter out None values if you want only actual websites
-        actual_websites = [website for website in websites if website]
-                
-        self.perform_email_scraping(websites, json_data, job_file)
+    def scrape_website_emails(self, job_id, job_manager):
+        job = job_manager.get_job(job_id)
 
-    def perform_email_scraping(self, websites, json_data, job_file):
-        # Define two queues to work with. Set maxsize for the main queue
-        domainqueue = queue.Queue(maxsize=5000)
-        emailsqueue = queue.Queue()
+        # Extract all website fields, skipping results without one and
+        # websites crawled before the job was interrupted
+        crawled = self.checkpoint.crawled if self.checkpoint is not None else set()
+        websites = [
+            result.get('website') for result in job['results']
+            if result.get('website') and result.get('website') not in crawled
+        ]
+
+        self.perform_email_scraping(websites, job_id, job_manager)
 
-        # Start our threads
-        for _i in range(20):
-            t = DomainExplorer(domainqueue, emailsqueue)
-            t.daemon = True
-            t.start()
+    def perform_email_scraping(self, websites, job_id, job_manager):
+        self._emit('phase', {'phase': 'email', 'websites': len(set(websites))})
 
-        print(f"Started {20} Threads")
+        # Results are handed from the crawler's event loop to the collector thread
+        emailsqueue = queue.Queue()
 
         # Start our collector thread
-        results_thread = EmailOutput(emailsqueue, json_data, job_file)
+        results_thread = EmailOutput(
+            emailsqueue,
+            job_id,
+            job_manager,
+            batch_size=self.email_flush_batch,
+            flush_interval=self.email_flush_interval,
+            on_event=self.on_event,
+            on_flush=self.checkpoint.add_crawled if self.checkpoint is not None else None,
+            metrics=self.metrics
+        )
         results_thread.daemon = True
         results_thread.start()
 
-        # Add domains to the queue from a context manager to save memory
-        
-        for domain in websites:
-            domainqueue.put(domain)
+        crawler = EmailCrawler(
+            concurrency=self.email_concurrency,
+            per_host=self.email_per_host,
+            timeout=self.email_timeout,
+            cancel_event=self.cancel_event,
+            cache=self.email_cache,
+            max_pages=self.email_max_pages,
+            max_bytes=self.email_max_bytes,
+            max_body_bytes=self.email_max_body_bytes,
+            metrics=self.metrics
+        )
+        with self.metrics.span('email_crawl'):
+            crawler.run(
+                websites,
+                lambda domain, emails: emailsqueue.put((domain, emails))
+            )
 
-        # Gracefully join our queues so that our threads can exit
-        domainqueue.join()
-        print("Domains finished processing")
-        
-        emailsqueue.join()
-        print("Collector finished processing")
+        # Tell the collector no more results are coming and wait for it
+        emailsqueue.put(None)
+        results_thread.join()
+        self.crawl_stats = crawler.stats()
+        self.email_output_stats = results_thread.stats()
+        self.check_cancelled()
 
     def scrape_google_maps_urls(self):
-        # Google maps and results are successfully loaded
-        # Initialize the output list
-        items = []
-
-        while True:
-            try:
-                # Find all the businesses in the search results
-                businesses = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CLASS_NAME, 'hfpxzc')))
-            except Exception as e:
-                # If no businesses are found, break the loop
-                break
-
-            time.sleep(3)
-
-            # Store the URLs of the businesses
-            items.extend(businesses)
-            
-            print(f"Loaded URL number: {str(len(businesses))}")
-            
-            # Scroll down to load more businesses
-            self.driver.execute_script("arguments[0].scrollIntoView();", businesses[-1])
-            time.sleep(3)
-            
-            #break
-
-            try:
-                # Check if new businesses are loaded
-                new_businesses = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CLASS_NAME, 'hfpxzc')))
-                if len(new_businesses) == len(businesses):
-                    # If no new businesses are loaded, break the loop
-                    break
-            except Exception as e:
-                # If an exception occurs, break the loop
-                print(f"An error occurred: {e}")
-                print(f"An error occurred: {e.__traceback__.tb_lineno}")
-                break
-
-        print(f"Final scrolled URL number: {str(len(businesses))}")
-
+        """Scroll the results feed and return the loaded listing elements"""
+        scroller = FeedScroller(
+            self.driver,
+            initial_timeout=self.scroll_timeout,
+            max_timeout=self.scroll_max_timeout,
+            max_stalls=self.scroll_max_stalls
+        )
+        with self.metrics.span('scroll'):
+            businesses = scroller.scroll()
+        self.scroll_stats.append(scroller.stats())
         return businesses
     
     def _scrape_type(self, location, radius, type_filter):
          # Construct Google Maps search URL
         search_query = f"{type_filter} in {location} within { radius } km"
-        url = f"https://www.google.com/maps/search/{search_query.replace(' ', '+')}/"
+        url = f"{self.maps_url}/search/{search_query.replace(' ', '+')}/"
         
+        self.check_cancelled()
         print(f"Starting scrape for: {url}")
+        self._emit('phase', {'phase': 'scroll', 'type': type_filter})
         self.driver.get(url)
         
         # Wait for results to load
@@ -142,81 +229,196 @@ class GoogleMapsScraper:
         wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']")))
         
         # Extract place data - Updated with the new CSS selector
-        results = []
         place_elements = []
         try:
             place_elements = self.scrape_google_maps_urls()
-            print(len(place_elements))
         except Exception as e:
             print(f"An error occurred: {e}")
             print(f"An error occurred: {e.__traceback__.tb_lineno}")
-    
-        # Process each business one by one
-        for item in place_elements:
+
+        self._emit('phase', {'phase': 'extraction', 'type': type_filter, 'places': len(place_elements)})
+
+        with self.metrics.span('extraction'):
+            if self.detail_mode == 'click':
+                return self._scrape_by_click(place_elements, type_filter)
+
+            # Phase one: collect the place URLs from the feed
+            place_urls = self.collect_place_urls(place_elements)
+            print(f"Collected place URLs: {len(place_urls)}")
+
+            # Phase two: extract the details of every place concurrently
+            return self.extract_place_details(place_urls, type_filter)
+
+    def locate(self, location):
+        """Center (lat, lng) Maps shows for a location, or None"""
+        self.driver.get(f"{self.maps_url}/search/{location.replace(' ', '+')}/")
+        try:
+            WebDriverWait(self.driver, 10).until(lambda d: parse_map_center(d.current_url))
+        except TimeoutException:
+            return None
+        return parse_map_center(self.driver.current_url)
+
+    def scrape_tiles(self, location, radius, type_filter):
+        """Search every tile of a grid over the radius and merge the results.
+
+        Tiles are spread over the job's driver and free pooled drivers.
+        Places are deduplicated across tiles by place URL and by name and
+        address.
+        """
+        self.check_cancelled()
+        center = self.locate(location)
+        if center is None:
+            print(f"Could not find the map center of {location}, searching without tiles")
+            self.tiled = False
+            return self.scrape(location, radius, type_filter)
+
+        types = ['hotels', 'restaurants'] if type_filter == 'both' else [type_filter]
+        tiles = tile_grid(center[0], center[1], radius, self.tile_size_km, self.max_tiles)
+        total = len(tiles) * len(types)
+        work = queue.Queue()
+        for tile_type in types:
+            for tile in tiles:
+                if f"{tile_type}:{tile.id}" not in self.done_tiles:
+                    work.put((tile_type, tile))
+        print(f"Searching {work.qsize()} of {total} tiles around {center}")
+        self._emit('phase', {'phase': 'scroll', 'type': type_filter, 'tiles': total})
+        self._emit('counts', {'tilesDone': len(self.done_tiles), 'tilesTotal': total})
+
+        results = list(self.resume_results)
+        seen_urls = set()
+        seen_places = {place_identity(result) for result in results}
+        lock = threading.Lock()
+
+        def new_place_urls(hrefs, claimed):
+            """Claim the places no other tile has claimed yet"""
+            urls = []
+            with lock:
+                for href in hrefs:
+                    key = place_key(href)
+                    if key and key not in seen_urls:
+                        seen_urls.add(key)
+                        claimed.append(key)
+                        urls.append(href)
+            return urls
+
+        def search_tile(driver, wait, item):
+            tile_type, tile = item
+            claimed = []
+            try:
+                tile_results = self._scrape_tile(
+                    driver, wait, tile_type, tile,
+                    lambda hrefs: new_place_urls(hrefs, claimed)
+                )
+            except WebDriverException:
+                # Hand the tile's places back to whichever driver searches it again
+                with lock:
+                    seen_urls.difference_update(claimed)
+                raise
+            if self.cancelled():
+                # A partly extracted tile is searched again on resume
+                return
+
+            tile_id = f"{tile_type}:{tile.id}"
+            with lock:
+                for result in tile_results:
+                    identity = place_identity(result)
+                    if identity not in seen_places:
+                        seen_places.add(identity)
+                        results.append(result)
+                self.done_tiles.append(tile_id)
+                done = len(self.done_tiles)
+                if self.on_tile_done is not None:
+                    self.on_tile_done(list(self.done_tiles), total, list(results))
+            self._emit('tile', {'tile': tile_id, 'places': len(tile_results)})
+            self._emit('counts', {'tilesDone': done, 'tilesTotal': total})
+
+        self._run_on_drivers(work, search_tile, "searching tile")
+
+        self.check_cancelled()
+
+        return results
+
+    def _scrape_tile(self, driver, wait, type_filter, tile, new_place_urls):
+        """Scroll one tile's results and extract the places no other tile had"""
+        url = tile_search_url(type_filter, tile, self.maps_url)
+        print(f"Starting tile scrape for: {url}")
+        driver.get(url)
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']")))
+        except TimeoutException:
+            # Maps opens the place itself when a tile has a single result
+            if "/maps/place/" not in driver.current_url:
+                return []
+            return self._scrape_tile_place(driver, wait, type_filter, new_place_urls)
+
+        scroller = FeedScroller(
+            driver,
+            initial_timeout=self.scroll_timeout,
+            max_timeout=self.scroll_max_timeout,
+            max_stalls=self.scroll_max_stalls
+        )
+        with self.metrics.span('scroll'):
+            place_elements = scroller.scroll()
+        self.scroll_stats.append(scroller.stats())
+        hrefs = self._place_hrefs(place_elements, driver)
+        place_urls = new_place_urls(href for href in hrefs if href)
+
+        cached = self._cached_places(place_urls)
+        results = []
+        with self.metrics.span('extraction'):
+            for place_url in place_urls:
+                if self.cancelled():
+                    break
+                if place_url in cached:
+                    results.append(self._reuse_place(place_url, cached[place_url], type_filter))
+                    continue
+                try:
+                    results.append(self.extract_place(driver, wait, place_url, type_filter))
+                    self._place_extracted(place_url, results[-1])
+                except WebDriverException:
+                    if not self._driver_alive(driver):
+                        raise
+                except Exception as e:
+                    print(f"Error extracting item details: {e}")
+        return results
+
+    def _scrape_tile_place(self, driver, wait, type_filter, new_place_urls):
+        """Extract the place a tile search opened, unless another tile had it"""
+        place_urls = new_place_urls([driver.current_url])
+        if not place_urls:
+            return []
+        place_url = place_urls[0]
+        cached = self._cached_places(place_urls)
+        if place_url in cached:
+            return [self._reuse_place(place_url, cached[place_url], type_filter)]
+        started = time.monotonic()
+        with self.metrics.span('extraction'):
+            result = self._extract_details(driver, wait, type_filter)
+        self.metrics.observe(LISTING_SECONDS, time.monotonic() - started)
+        self._place_extracted(place_url, result)
+        return [result]
+
+    def _scrape_by_click(self, place_elements, type_filter):
+        """Extract details by clicking every listing in the feed one by one"""
+        results = []
+        track = self.place_cache is not None or self.checkpoint is not None
+        hrefs = self._place_hrefs(place_elements) if track else []
+        cached = self._cached_places(hrefs)
+        for position, item in enumerate(place_elements):
+            self.check_cancelled()
+            url = hrefs[position] if hrefs else None
+            if url in cached:
+                results.append(self._reuse_place(url, cached[url], type_filter))
+                continue
             try:
                 # Click on item to load details
+                started = time.monotonic()
                 item.click()
                 time.sleep(3)
-                
-                # Extract information
-                name = self.wait.until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "h1.lfPIob")
-                    )
-                ).text
 
-                try:
-                    rating = self.driver.find_element(
-                        By.CSS_SELECTOR, 
-                        "div.fontDisplayLarge"
-                    ).text.split()[0]
-                except:
-                    rating = 0
-                    
-                try:
-                    reviews = self.driver.find_element(
-                        By.XPATH, 
-                        "//div[@class='HHrUdb']/span"
-                    ).text.split()[0]
-                except:
-                    reviews = 0
-                    
-                try:
-                    address = self.driver.find_element(
-                        By.CSS_SELECTOR,
-                        "[data-item-id*='address']"
-                    ).text
-                    address = self.clean_text(address)
-                except:
-                    address = ""
-                    
-                try:
-                    website = self.driver.find_element(
-                        By.CSS_SELECTOR,
-                        "a[data-item-id='authority']"
-                    ).get_attribute('href')
-                except:
-                    website = None
-                    
-                try:
-                    phone = self.driver.find_element(
-                        By.CSS_SELECTOR,
-                        "[data-item-id*='phone']"
-                    ).text
-                    phone = self.clean_text(phone)
-                except:
-                    phone = None
-                    
-                results.append({
-                    'name': name,
-                    'address': address,
-                    'rating': rating,
-                    'reviews': reviews,
-                    'type': type_filter,
-                    'phone': phone,
-                    'website': website,
-                    'emails': ""
-                })
+                results.append(self._extract_details(self.driver, self.wait, type_filter))
+                self.metrics.observe(LISTING_SECONDS, time.monotonic() - started)
+                self._place_extracted(url, results[-1])
                 print(f"Results number: {str(len(results))}")
                 
             except Exception as e:
@@ -225,6 +427,294 @@ class GoogleMapsScraper:
                 continue
 
         return results
+
+    def _place_hrefs(self, place_elements, driver=None):
+        """Read the place hrefs of the feed anchors in a single round trip"""
+        if not place_elements:
+            return []
+        return (driver or self.driver).execute_script(
+            "return arguments[0].map(function (a) { return a.href; });",
+            place_elements
+        )
+
+    def collect_place_urls(self, place_elements):
+        """Place URLs of the feed in feed order, without duplicates"""
+        hrefs = self._place_hrefs(place_elements)
+        return list(dict.fromkeys(href for href in hrefs if href))
+
+    def _cached_places(self, place_urls):
+        """Places that don't need extracting: checkpointed or (incremental) cached ones"""
+        place_urls = [url for url in place_urls if url]
+        known = {}
+        if self.checkpoint is not None:
+            known.update(self.checkpoint.places_for(place_urls))
+            if known:
+                print(f"Places resumed from checkpoint: {len(known)}")
+        if self.place_cache is not None and self.incremental:
+            cached = self.place_cache.get_many(url for url in place_urls if url not in known)
+            print(f"Places reused from cache: {len(cached)}")
+            known.update(cached)
+        return known
+
+    def _reuse_place(self, url, cached, type_filter):
+        resumed = self.checkpoint is not None and bool(self.checkpoint.places_for([url]))
+        result = dict(cached, type=type_filter, emails="")
+        # Places stored by older versions carry their Maps URL
+        result.pop('url', None)
+        with self._count_lock:
+            if resumed:
+                self.places_resumed += 1
+            else:
+                self.places_reused += 1
+        if self.checkpoint is not None and not resumed:
+            self.checkpoint.add_place(url, result)
+        self._result_extracted(result)
+        return result
+
+    def _place_extracted(self, url, result):
+        if self.place_cache is not None and url:
+            self.place_cache.put(url, result)
+        if self.checkpoint is not None:
+            self.checkpoint.add_place(url, result)
+        with self._count_lock:
+            self.places_extracted += 1
+        self._result_extracted(result)
+
+    def extract_place_details(self, place_urls, type_filter):
+        """Open place URLs across the job's driver and extra pooled drivers"""
+        cached = self._cached_places(place_urls)
+        extracted = {}
+        work = queue.Queue()
+        for index, url in enumerate(place_urls):
+            if url in cached:
+                extracted[index] = self._reuse_place(url, cached[url], type_filter)
+            else:
+                work.put((index, url))
+
+        def extract(driver, wait, item):
+            index, url = item
+            extracted[index] = self.extract_place(driver, wait, url, type_filter)
+            self._place_extracted(url, extracted[index])
+            print(f"Results number: {str(len(extracted))}")
+
+        self._run_on_drivers(work, extract, "extracting item details")
+
+        self.check_cancelled()
+
+        return [extracted[index] for index in sorted(extracted)]
+
+    def _run_on_drivers(self, work, handle, action):
+        """Call handle(driver, wait, item) for every item of the work queue.
+
+        Items are spread over the job's driver and extra pooled drivers.
+        Extra drivers are only taken if the pool has one free right now,
+        so a busy pool degrades to a single worker instead of blocking.
+        The item of a driver that died is handed back to the remaining
+        drivers and the dead driver takes no more work.
+        """
+        leased = []
+        if self.driver_pool is not None:
+            for _i in range(min(self.detail_workers, work.qsize()) - 1):
+                pooled = self.driver_pool.acquire(block=False)
+                if pooled is None:
+                    break
+                leased.append(pooled)
+        print(f"Running on {len(leased) + 1} drivers: {action}")
+
+        broken = set()
+
+        def worker(driver, pooled=None):
+            wait = WebDriverWait(driver, 10)
+            while not self.cancelled():
+                try:
+                    item = work.get(timeout=0.1)
+                except queue.Empty:
+                    # Items still being handled may be handed back by a
+                    # driver that dies, so only stop once all are done
+                    if work.unfinished_tasks == 0:
+                        return
+                    continue
+                try:
+                    handle(driver, wait, item)
+                except WebDriverException as e:
+                    print(f"Error {action}: {e}")
+                    if not self._driver_alive(driver):
+                        # Hand the item back to the remaining drivers; a
+                        # dead pooled driver is retired, the job's own
+                        # driver just stops taking work
+                        work.put(item)
+                        if pooled is not None:
+                            broken.add(id(pooled))
+                        return
+                except Exception as e:
+                    print(f"Error {action}: {e}")
+                finally:
+                    work.task_done()
+
+        threads = [threading.Thread(target=worker, args=(self.driver,))]
+        threads.extend(
+            threading.Thread(target=worker, args=(pooled.driver, pooled))
+            for pooled in leased
+        )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for pooled in leased:
+            self.driver_pool.release(pooled, broken=id(pooled) in broken)
+
+    def extract_place(self, driver, wait, url, type_filter):
+        """Navigate to a place URL and extract its details"""
+        started = time.monotonic()
+        driver.get(url)
+        result = self._extract_details(driver, wait, type_filter)
+        self.metrics.observe(LISTING_SECONDS, time.monotonic() - started)
+        return result
+
+    def _extract_details(self, driver, wait, type_filter):
+        """Extract the details of the place currently shown by the driver"""
+        if self.place_extractor is not None:
+            try:
+                wait.until(EC.presence_of_element_located(self.place_extractor.ready_locator))
+                values = self.place_extractor.read(driver)
+            except TimeoutException:
+                # A stale selector set; the per-field selectors may still match
+                print("Place panel not ready for bulk extraction, reading fields one by one")
+                values = None
+            except WebDriverException as e:
+                if not self._driver_alive(driver):
+                    raise
+                print(f"Bulk extraction failed, reading fields one by one: {e}")
+                values = None
+            if values is not None:
+                with self._count_lock:
+                    self.bulk_extractions += 1
+                self.metrics.count(LISTINGS, mode='bulk')
+                for field, value in values.items():
+                    if value is None:
+                        self.metrics.count(SELECTOR_FAILURES, field=field)
+                return self._place_from_values(values, type_filter)
+            self.metrics.count(SELECTOR_FAILURES, field='bulk')
+
+        with self._count_lock:
+            self.field_extractions += 1
+        self.metrics.count(LISTINGS, mode='fields')
+        return self._extract_details_by_field(driver, wait, type_filter)
+
+    def _place_from_values(self, values, type_filter):
+        """Build a result from the raw values of a bulk extraction"""
+        def text(field):
+            return (values.get(field) or "").strip()
+
+        def first_word(field):
+            words = text(field).split()
+            return words[0] if words else 0
+
+        return {
+            'name': text('name'),
+            'address': self.clean_text(text('address')),
+            'rating': first_word('rating'),
+            'reviews': first_word('reviews'),
+            'type': type_filter,
+            'phone': self.clean_text(text('phone')) if text('phone') else None,
+            'website': values.get('website') or None,
+            'emails': ""
+        }
+
+    def _extract_details_by_field(self, driver, wait, type_filter):
+        """Extract the details of the shown place with one lookup per field"""
+        name = wait.until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "h1.lfPIob")
+            )
+        ).text
+
+        try:
+            rating = driver.find_element(
+                By.CSS_SELECTOR, 
+                "div.fontDisplayLarge"
+            ).text.split()[0]
+        except (WebDriverException, IndexError):
+            rating = 0
+            self.metrics.count(SELECTOR_FAILURES, field='rating')
+            
+        try:
+            reviews = driver.find_element(
+                By.XPATH, 
+                "//div[@class='HHrUdb']/span"
+            ).text.split()[0]
+        except (WebDriverException, IndexError):
+            reviews = 0
+            self.metrics.count(SELECTOR_FAILURES, field='reviews')
+            
+        try:
+            address = driver.find_element(
+                By.CSS_SELECTOR,
+                "[data-item-id*='address']"
+            ).text
+            address = self.clean_text(address)
+        except (WebDriverException, IndexError):
+            address = ""
+            self.metrics.count(SELECTOR_FAILURES, field='address')
+            
+        try:
+            website = driver.find_element(
+                By.CSS_SELECTOR,
+                "a[data-item-id='authority']"
+            ).get_attribute('href')
+        except (WebDriverException, IndexError):
+            website = None
+            self.metrics.count(SELECTOR_FAILURES, field='website')
+            
+        try:
+            phone = driver.find_element(
+                By.CSS_SELECTOR,
+                "[data-item-id*='phone']"
+            ).text
+            phone = self.clean_text(phone)
+        except (WebDriverException, IndexError):
+            phone = None
+            self.metrics.count(SELECTOR_FAILURES, field='phone')
+            
+        return {
+            'name': name,
+            'address': address,
+            'rating': rating,
+            'reviews': reviews,
+            'type': type_filter,
+            'phone': phone,
+            'website': website,
+            'emails': ""
+        }
+
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled()
+
+    def _result_extracted(self, result):
+        with self._count_lock:
+            self.result_count += 1
+            count = self.result_count
+        self._emit('result', {'result': result})
+        self._emit('counts', {'results': count})
+
+    def _emit(self, event, data):
+        if self.on_event is not None:
+            try:
+                self.on_event(event, data)
+            except Exception as e:
+                print(f"Progress event failed: {e}")
+
+    def _driver_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
        
     def clean_text(self, text):
         # Normalize Unicode characters
@@ -251,4 +741,5 @@ class GoogleMapsScraper:
             return None
 
     def close(self):
-        self.driver.quit()
\ No newline at end of file
+        if self.owns_driver and self._driver is not None:
+            self._driver.quit()
\ No newline at end of file
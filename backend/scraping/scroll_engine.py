@@ -0,0 +1,105 @@
+"""Adaptive scrolling of the Google Maps results feed"""
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# Counts the feed anchors and checks for the "You've reached the end of
+# the list." marker in one round trip
+FEED_STATE_SCRIPT = """
+return [
+    document.getElementsByClassName(arguments[0]).length,
+    document.querySelector(arguments[1]) !== null
+];
+"""
+
+
+class FeedScroller:
+    """Scrolls the results feed, waiting on the feed to grow instead of sleeping.
+
+    After each scroll we wait until the number of listings changes or the
+    end-of-list marker shows up. A wait that times out is retried with a
+    doubled timeout, up to max_stalls times in a row.
+    """
+    def __init__(self, driver, item_class='hfpxzc', end_selector='span.HlvSq',
+                 initial_timeout=2.0, max_timeout=8.0, max_stalls=3, poll_frequency=0.1):
+        self.driver = driver
+        self.item_class = item_class
+        self.end_selector = end_selector
+        self.initial_timeout = initial_timeout
+        self.max_timeout = max_timeout
+        self.max_stalls = max_stalls
+        self.poll_frequency = poll_frequency
+
+        self.latencies = []
+        self.stalls = 0
+        self.reached_end = False
+
+    def scroll(self):
+        """Scroll until the feed is exhausted and return the listing elements"""
+        try:
+            businesses = WebDriverWait(self.driver, 10).until(
+                EC.presence_of_all_elements_located((By.CLASS_NAME, self.item_class)))
+        except TimeoutException:
+            # If no businesses are found there is nothing to scroll
+            return []
+
+        timeout = self.initial_timeout
+        stalls = 0
+
+        while True:
+            count = len(businesses)
+            print(f"Loaded URL number: {str(count)}")
+
+            # Scroll down to load more businesses
+            self.driver.execute_script("arguments[0].scrollIntoView();", businesses[-1])
+            started = time.monotonic()
+
+            try:
+                new_count, at_end = WebDriverWait(
+                    self.driver, timeout, poll_frequency=self.poll_frequency
+                ).until(lambda driver: self._feed_changed(driver, count))
+            except TimeoutException:
+                stalls += 1
+                self.stalls += 1
+                if stalls > self.max_stalls:
+                    break
+                # Back off: the feed may just be slow to answer
+                timeout = min(timeout * 2, self.max_timeout)
+                continue
+
+            self.latencies.append(time.monotonic() - started)
+            timeout = self.initial_timeout
+            stalls = 0
+
+            if new_count != count:
+                businesses = self.driver.find_elements(By.CLASS_NAME, self.item_class)
+            if at_end or not businesses:
+                self.reached_end = True
+                break
+
+        print(f"Final scrolled URL number: {str(len(businesses))}")
+        print(f"Scroll stats: {self.stats()}")
+
+        return businesses
+
+    def _feed_changed(self, driver, count):
+        new_count, at_end = driver.execute_script(
+            FEED_STATE_SCRIPT, self.item_class, self.end_selector)
+        if new_count != count or at_end:
+            return new_count, at_end
+        return False
+
+    def stats(self):
+        """Per-scroll latency summary used to tune the timeouts"""
+        latencies = sorted(self.latencies)
+        return {
+            'scrolls': len(latencies),
+            'stalls': self.stalls,
+            'reachedEnd': self.reached_end,
+            'avgLatency': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p95Latency': round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else 0.0,
+            'maxLatency': round(latencies[-1], 3) if latencies else 0.0,
+            'latencies': [round(latency, 3) for latency in self.latencies],
+        }
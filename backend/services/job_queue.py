@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import threading
+import time
+
+class SqliteJobQueue:
+    """Job queue shared by the API and worker processes through SQLite.
+
+    Workers lease a job for lease_seconds and keep the lease alive with
+    heartbeats. A job whose lease expired (its worker died) is handed to
+    the next worker that asks, up to max_attempts times.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS job_queue (
+        job_id TEXT PRIMARY KEY,
+        args TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        state TEXT NOT NULL,
+        worker_id TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        enqueued_at REAL NOT NULL,
+        leased_at REAL,
+        lease_expires REAL,
+        finished_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS job_queue_next ON job_queue (state, priority, enqueued_at);
+    """
+
+    def __init__(self, db_path, lease_seconds=60, max_attempts=3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def enqueue(self, job_id, args=(), priority=0):
+        """Queue a job, returns its position in the queue"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO job_queue (job_id, args, priority, state, enqueued_at) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, json.dumps(list(args)), priority, now)
+            )
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM job_queue WHERE state = 'queued' AND "
+                "(priority > ? OR (priority = ? AND enqueued_at < ?))",
+                (priority, priority, now)
+            ).fetchone()[0]
+
+    def lease(self, worker_id):
+        """Lease the next job, re-leasing jobs whose worker stopped heartbeating.
+
+        Returns (job_id, args, attempt) or None if nothing is runnable.
+        Jobs that ran out of attempts are left for expired_jobs().
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT job_id, args, attempts FROM job_queue "
+                    "WHERE (state = 'queued' OR (state = 'leased' AND lease_expires < ?)) "
+                    "AND attempts < ? AND cancel_requested = 0 "
+                    "ORDER BY priority DESC, enqueued_at ASC LIMIT 1",
+                    (now, self.max_attempts)
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    "UPDATE job_queue SET state = 'leased', worker_id = ?, attempts = attempts + 1, "
+                    "leased_at = ?, lease_expires = ? WHERE job_id = ?",
+                    (worker_id, now, now + self.lease_seconds, row['job_id'])
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return row['job_id'], json.loads(row['args']), row['attempts'] + 1
+
+    def expired_jobs(self):
+        """Leased jobs whose lease ran out on their last allowed attempt"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT job_id FROM job_queue WHERE state = 'leased' "
+                "AND lease_expires < ? AND attempts >= ?",
+                (time.time(), self.max_attempts)
+            ).fetchall()
+        return [row['job_id'] for row in rows]
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend a lease.
+
+        Returns 'ok', 'cancel' when the job should stop, or 'lost' when
+        another worker has taken the job over.
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE job_queue SET lease_expires = ? "
+                "WHERE job_id = ? AND worker_id = ? AND state = 'leased'",
+                (time.time() + self.lease_seconds, job_id, worker_id)
+            )
+            if cursor.rowcount == 0:
+                return 'lost'
+            row = self.conn.execute(
+                "SELECT cancel_requested FROM job_queue WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return 'cancel' if row['cancel_requested'] else 'ok'
+
+    def finish(self, job_id, worker_id=None, state='done'):
+        with self._lock:
+            if worker_id is None:
+                self.conn.execute(
+                    "UPDATE job_queue SET state = ?, finished_at = ? WHERE job_id = ?",
+                    (state, time.time(), job_id)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE job_queue SET state = ?, finished_at = ? WHERE job_id = ? AND worker_id = ?",
+                    (state, time.time(), job_id, worker_id)
+                )
+
+    def cancel(self, job_id):
+        """Cancel a queued job or ask the worker running it to stop.
+
+        Returns 'queued' or 'running' for the state the job was cancelled
+        in, or None if the job isn't waiting or running.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT state FROM job_queue WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['state'] == 'queued':
+                self.conn.execute(
+                    "UPDATE job_queue SET state = 'cancelled', finished_at = ? WHERE job_id = ?",
+                    (time.time(), job_id)
+                )
+                return 'queued'
+            if row['state'] == 'leased':
+                self.conn.execute(
+                    "UPDATE job_queue SET cancel_requested = 1 WHERE job_id = ?", (job_id,)
+                )
+                return 'running'
+        return None
+
+    def stats(self):
+        """Queue depth, leased jobs and queue wait times"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self.conn.execute(
+                "SELECT state, COUNT(*) FROM job_queue GROUP BY state"
+            ).fetchall())
+            waits = self.conn.execute(
+                "SELECT AVG(leased_at - enqueued_at), MAX(leased_at - enqueued_at) "
+                "FROM job_queue WHERE leased_at IS NOT NULL"
+            ).fetchone()
+            oldest = self.conn.execute(
+                "SELECT MIN(enqueued_at) FROM job_queue WHERE state = 'queued'"
+            ).fetchone()[0]
+            workers = self.conn.execute(
+                "SELECT COUNT(DISTINCT worker_id) FROM job_queue "
+                "WHERE state = 'leased' AND lease_expires >= ?", (now,)
+            ).fetchone()[0]
+        return {
+            'queueDepth': counts.get('queued', 0),
+            'running': counts.get('leased', 0),
+            'activeWorkers': workers,
+            'finished': counts.get('done', 0),
+            'cancelled': counts.get('cancelled', 0),
+            'failed': counts.get('failed', 0),
+            'avgWaitSeconds': round(waits[0] or 0.0, 3),
+            'maxWaitSeconds': round(waits[1] or 0.0, 3),
+            'oldestQueuedSeconds': round(now - oldest, 3) if oldest else 0.0,
+        }
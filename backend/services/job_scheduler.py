@@ -0,0 +1,117 @@
+import heapq
+import itertools
+import threading
+import time
+
+class JobScheduler:
+    """Runs queued jobs on a fixed number of worker threads.
+
+    Jobs with a higher priority run first, jobs with equal priority run in
+    submission order. run_job(job_id, cancel_event, *args) is called on a
+    worker thread and should stop early once cancel_event is set.
+    """
+    def __init__(self, run_job, max_concurrent=2):
+        self.run_job = run_job
+        self.max_concurrent = max(1, max_concurrent)
+
+        self._queue = []
+        self._seq = itertools.count()
+        self._queued = {}
+        self._running = {}
+        self._cond = threading.Condition()
+        self._workers = []
+
+        # Stats
+        self.submitted = 0
+        self.finished = 0
+        self.cancelled = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.started = 0
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.max_concurrent:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, job_id, args=(), priority=0):
+        """Queue a job, returns its position in the queue.
+
+        Raises ValueError if the job is already queued or running.
+        """
+        with self._cond:
+            if job_id in self._queued or job_id in self._running:
+                raise ValueError(f"Job {job_id} is already scheduled")
+            self._ensure_workers()
+            entry = [-priority, next(self._seq), job_id, args, time.monotonic()]
+            heapq.heappush(self._queue, entry)
+            self._queued[job_id] = entry
+            self.submitted += 1
+            self._cond.notify()
+            return sum(
+                1 for queued in self._queue
+                if queued[2] is not None and queued[:2] < entry[:2]
+            )
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job.
+
+        Returns 'queued' or 'running' for the state the job was cancelled
+        in, or None if the scheduler doesn't know the job.
+        """
+        with self._cond:
+            entry = self._queued.pop(job_id, None)
+            if entry is not None:
+                # Tombstone the heap entry; workers skip it
+                entry[2] = None
+                self.cancelled += 1
+                return 'queued'
+            cancel_event = self._running.get(job_id)
+            if cancel_event is not None:
+                cancel_event.set()
+                return 'running'
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                _priority, _seq, job_id, args, enqueued_at = heapq.heappop(self._queue)
+                if job_id is None:
+                    continue
+                self._queued.pop(job_id, None)
+                cancel_event = threading.Event()
+                self._running[job_id] = cancel_event
+                waited = time.monotonic() - enqueued_at
+                self.started += 1
+                self.total_wait_time += waited
+                self.max_wait_time = max(self.max_wait_time, waited)
+
+            try:
+                self.run_job(job_id, cancel_event, *args)
+            except Exception as e:
+                print(f"Scheduled job {job_id} failed: {e}")
+            finally:
+                with self._cond:
+                    del self._running[job_id]
+                    self.finished += 1
+                    if cancel_event.is_set():
+                        self.cancelled += 1
+
+    def stats(self):
+        """Queue depth, running jobs and queue wait times"""
+        with self._cond:
+            return {
+                'maxConcurrent': self.max_concurrent,
+                'running': len(self._running),
+                'queueDepth': len(self._queued),
+                'queued': [entry[2] for entry in sorted(self._queue) if entry[2] is not None],
+                'submitted': self.submitted,
+                'started': self.started,
+                'finished': self.finished,
+                'cancelled': self.cancelled,
+                'avgWaitSeconds': round(self.total_wait_time / self.started, 3) if self.started else 0.0,
+                'maxWaitSeconds': round(self.max_wait_time, 3),
+            }
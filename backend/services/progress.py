@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+# Job statuses after which no more events are published
+TERMINAL_EVENTS = ('done', 'failed', 'cancelled')
+
+class ProgressBroker:
+    """Fans job progress events out to subscribed clients.
+
+    Scraping threads call publish(); each subscriber gets an asyncio.Queue
+    bound to the event loop it subscribed from, and events are handed over
+    with call_soon_threadsafe so publishers never block on slow clients.
+    The latest phase and counts of each job are kept so new subscribers
+    start from the current state, until the job has finished and its last
+    subscriber has left.
+    """
+    def __init__(self, max_queue_size=1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def publish(self, job_id, event, data=None):
+        """Publish an event for a job from any thread"""
+        message = {
+            'event': event,
+            'jobId': job_id,
+            'time': str(datetime.now(timezone.utc)),
+            'data': data or {}
+        }
+        with self._lock:
+            if event == 'counts':
+                # Counters arrive piecemeal, subscribers get the merged totals
+                previous = self._state.get(job_id, {}).get('counts')
+                if previous is not None:
+                    message['data'] = {**previous['data'], **message['data']}
+            if event in ('phase', 'counts', 'status') + TERMINAL_EVENTS:
+                self._state.setdefault(job_id, {})[event] = message
+            subscribers = list(self._subscribers.get(job_id, ()))
+            if event in TERMINAL_EVENTS:
+                if subscribers:
+                    # Keep only the terminal event for subscribers still connecting
+                    self._state[job_id] = {event: message}
+                else:
+                    # Nobody is listening; late clients read the stored job instead
+                    self._state.pop(job_id, None)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                # The subscriber's loop is gone
+                self.unsubscribe(job_id, (loop, queue))
+
+    def _deliver(self, queue, message):
+        if queue.qsize() >= self.max_queue_size and message['event'] == 'result':
+            # Drop result records for clients that can't keep up; the
+            # counts and phase events still get through
+            return
+        queue.put_nowait(message)
+
+    def subscribe(self, job_id):
+        """Subscribe from a coroutine, returns (subscription, current state)"""
+        subscription = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(subscription)
+            state = list(self._state.get(job_id, {}).values())
+        return subscription, state
+
+    def unsubscribe(self, job_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[job_id]
+                    state = self._state.get(job_id, {})
+                    if any(event in state for event in TERMINAL_EVENTS):
+                        del self._state[job_id]
+
+    def subscriber_count(self, job_id=None):
+        with self._lock:
+            if job_id is not None:
+                return len(self._subscribers.get(job_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
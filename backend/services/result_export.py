@@ -0,0 +1,129 @@
+"""Streaming exports of job results as CSV, JSON Lines or Parquet"""
+import csv
+import io
+import json
+from scraping.place_cache import place_identity
+
+EXPORT_FIELDS = ['name', 'address', 'rating', 'reviews', 'type', 'phone', 'website', 'emails']
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+# Rows written per CSV/JSONL chunk and per Parquet row group
+BATCH_SIZE = 1000
+
+
+class ExportUnavailable(Exception):
+    """The requested export format needs a package that isn't installed"""
+
+
+def dedupe_places(results):
+    """Drop results describing a place that was already seen, keeping the first"""
+    seen = set()
+    for result in results:
+        key = place_identity(result)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield result
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(results, fields=EXPORT_FIELDS):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    for batch in _batches(results):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_jsonl(results, fields=EXPORT_FIELDS):
+    for batch in _batches(results):
+        yield "".join(
+            json.dumps({field: result.get(field) for field in fields}, ensure_ascii=False) + "\n"
+            for result in batch
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last take()"""
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(results, fields=EXPORT_FIELDS):
+    """Parquet file written one row group per batch, needs pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export needs pyarrow (pip install pyarrow)")
+
+    # Ratings and review counts are stored as scraped text, keep them as such
+    schema = pa.schema([(field, pa.string()) for field in fields])
+    return _parquet_chunks(results, fields, schema, pa, pq)
+
+
+def _parquet_chunks(results, fields, schema, pa, pq):
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batches(results):
+            columns = {
+                field: [None if result.get(field) is None else str(result.get(field)) for result in batch]
+                for field in fields
+            }
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+    'parquet': stream_parquet,
+}
+
+
+def export_results(results, export_format, fields=EXPORT_FIELDS):
+    """Chunks of the results encoded as export_format.
+
+    Raises ExportUnavailable before anything is streamed if the format's
+    dependency is missing.
+    """
+    return STREAMERS[export_format](results, fields)
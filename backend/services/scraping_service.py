@@ -1,47 +1,264 @@
-import threading
+import time
 from datetime import datetime, timezone
-from scraping.scraper import GoogleMapsScraper
+from config import Config
+from scraping.checkpoint import JobCheckpoint
+from scraping.driver_pool import DriverPool, build_chrome_driver
+from scraping.email_cache import EmailCache
+from scraping.metrics import JOBS, REGISTRY, JobMetrics
+from scraping.place_cache import PlaceCache
+from scraping.scraper import GoogleMapsScraper, JobCancelled
+from services.job_scheduler import JobScheduler
+from services.progress import ProgressBroker
 
 class ScrapingService:
-    def __init__(self, job_manager):
+    def __init__(self, job_manager, driver_pool=None, progress=None, job_queue=None, email_cache=None,
+                 place_cache=None):
         self.job_manager = job_manager
-        
-    def start_scraping_job(self, job_id, location, radius, type_filter):
-        """Start a new scraping job in a background thread"""
-        thread = threading.Thread(
-            target=self._run_scraping_job,
-            args=(job_id, location, radius, type_filter)
+        # With a job queue, jobs are run by worker processes (see worker.py)
+        self.job_queue = job_queue
+        self.progress = progress or ProgressBroker()
+        self.driver_pool = driver_pool or DriverPool(
+            max_size=Config.DRIVER_POOL_SIZE,
+            max_uses=Config.DRIVER_MAX_USES,
+            driver_factory=lambda: build_chrome_driver(
+                Config.BROWSER_PROFILE, Config.BROWSER_WINDOW_SIZE
+            )
+        )
+        self.email_cache = email_cache
+        if self.email_cache is None and Config.EMAIL_CACHE_ENABLED:
+            self.email_cache = EmailCache(
+                Config.EMAIL_CACHE_PATH,
+                ttl_seconds=Config.EMAIL_CACHE_TTL,
+                max_entries=Config.EMAIL_CACHE_MAX_ENTRIES
+            )
+        self.place_cache = place_cache
+        if self.place_cache is None and Config.PLACE_CACHE_ENABLED:
+            self.place_cache = PlaceCache(
+                Config.PLACE_CACHE_PATH,
+                ttl_seconds=Config.PLACE_CACHE_TTL
+            )
+        self.scheduler = JobScheduler(
+            self.run_scraping_job,
+            max_concurrent=Config.MAX_CONCURRENT_JOBS
         )
-        thread.daemon = True  # Make thread exit when main thread exits
-        thread.start()
+        REGISTRY.gauge('driver_pool_in_use', "Chrome drivers leased from the pool",
+                       lambda: self.driver_pool.stats()['inUse'])
+        REGISTRY.gauge('driver_pool_size', "Chrome drivers launched by the pool",
+                       lambda: self.driver_pool.stats()['size'])
+        REGISTRY.gauge('scheduler_jobs_running', "Jobs running in this process",
+                       lambda: self.scheduler.stats()['running'])
+        REGISTRY.gauge('scheduler_queue_depth', "Jobs waiting for a free slot in this process",
+                       lambda: self.scheduler.stats()['queueDepth'])
         
-    def _run_scraping_job(self, job_id, location, radius, type_filter):
-        """Run the actual scraping process"""
-        scraper = GoogleMapsScraper()
-        try:
-            # Update job status to running
-            self.job_manager.update_job_status(job_id, 'running')
-            
-            # Run the scraping
-            results = scraper.scrape(location, radius, type_filter)
-            
-            # Update job with results
-            completion_time = str(datetime.now(timezone.utc))
-            self.job_manager.update_job_status(
-                job_id, 
-                'completed', 
-                results=results, 
-                completion_time=completion_time
+    def start_scraping_job(self, job_id, location, radius, type_filter, priority=0,
+                           incremental=False, tiled=False, keep_status=False):
+        """Queue a new scraping job, returns its position in the queue.
+
+        With keep_status the job keeps its current status while it waits,
+        for completed jobs whose email crawl is resumed.
+        """
+        if not keep_status:
+            self.job_manager.update_job_status(job_id, 'queued')
+        if self.job_queue is not None:
+            position = self.job_queue.enqueue(
+                job_id,
+                args=(location, radius, type_filter, incremental, tiled),
+                priority=priority
+            )
+        else:
+            position = self.scheduler.submit(
+                job_id,
+                args=(location, radius, type_filter, incremental, tiled),
+                priority=priority
             )
-            
-            # Get the job file path and scrape emails
-            job_file = f"{self.job_manager.jobs_dir}/{job_id}.json"
-            scraper.scrape_website_emails(job_file)
+        if not keep_status:
+            self.progress.publish(job_id, 'status', {'status': 'queued', 'position': position})
+        return position
+
+    def cancel_scraping_job(self, job_id):
+        """Cancel a queued job, or stop a running one between listings"""
+        if self.job_queue is not None:
+            state = self.job_queue.cancel(job_id)
+        else:
+            state = self.scheduler.cancel(job_id)
+        if state == 'queued':
+            self.job_manager.update_job_status(job_id, 'cancelled')
+            self.progress.publish(job_id, 'cancelled', {'status': 'cancelled'})
+        return state
+        
+    def run_scraping_job(self, job_id, cancel_event, location, radius, type_filter,
+                         incremental=False, tiled=False, lease_lost=None):
+        """Run the actual scraping process on a driver leased from the pool.
+
+        lease_lost is set (together with cancel_event) by a worker whose
+        queue lease on the job expired: the job now belongs to another
+        worker, so this run stops without writing its final status.
+        """
+        # A job that was interrupted (its process or worker died) picks up
+        # from its checkpoint: extracted places, finished tiles and crawled
+        # websites are skipped
+        job = self.job_manager.get_job(job_id)
+        checkpoint = JobCheckpoint.from_job(
+            job_id, self.job_manager, job,
+            interval=Config.CHECKPOINT_INTERVAL,
+            batch=Config.CHECKPOINT_BATCH
+        )
+        if checkpoint.resuming:
+            print(f"Resuming job {job_id} in the {checkpoint.phase} phase "
+                  f"with {len(checkpoint.results)} places")
+        done_tiles = (job.get('tiles') or {}).get('done', []) if checkpoint.resuming else []
+
+        def tile_done(done, total, results):
+            checkpoint.save({'tiles': {'done': done, 'total': total}})
+
+        # Phase timings and counters, stored on the job when it ends
+        metrics = JobMetrics()
+        status = 'failed'
+
+        scraper_options = dict(
+            driver_pool=self.driver_pool,
+            detail_mode=Config.DETAIL_MODE,
+            detail_workers=Config.DETAIL_WORKERS,
+            scroll_timeout=Config.SCROLL_TIMEOUT,
+            scroll_max_timeout=Config.SCROLL_MAX_TIMEOUT,
+            scroll_max_stalls=Config.SCROLL_MAX_STALLS,
+            email_concurrency=Config.EMAIL_CONCURRENCY,
+            email_per_host=Config.EMAIL_PER_HOST,
+            email_timeout=Config.EMAIL_TIMEOUT,
+            email_max_pages=Config.EMAIL_MAX_PAGES,
+            email_max_bytes=Config.EMAIL_MAX_BYTES,
+            email_max_body_bytes=Config.EMAIL_MAX_BODY_BYTES,
+            email_flush_batch=Config.EMAIL_FLUSH_BATCH,
+            email_flush_interval=Config.EMAIL_FLUSH_INTERVAL,
+            on_event=lambda event, data: self.progress.publish(job_id, event, data),
+            cancel_event=cancel_event,
+            email_cache=self.email_cache,
+            place_cache=self.place_cache,
+            incremental=incremental,
+            tiled=tiled,
+            tile_size_km=Config.TILE_SIZE_KM,
+            max_tiles=Config.MAX_TILES,
+            done_tiles=done_tiles,
+            resume_results=checkpoint.results,
+            on_tile_done=tile_done,
+            checkpoint=checkpoint,
+            extraction_mode=Config.PLACE_EXTRACTION,
+            selector_set=Config.SELECTOR_SET,
+            metrics=metrics,
+            maps_url=Config.MAPS_URL
+        )
+
+        # Once the places are final the job is 'completed'; cancelling or
+        # failing its email crawl afterwards doesn't change that status
+        places_final = checkpoint.phase != 'extraction'
+        try:
+            if not places_final:
+                leased_at = time.monotonic()
+                # The driver goes back to the pool when this block ends,
+                # before the email crawl, which doesn't need Chrome
+                with self.driver_pool.lease() as driver:
+                    # Waiting for a free driver plus launching Chrome if needed
+                    metrics.record_span('driver_startup', time.monotonic() - leased_at)
+                    scraper = GoogleMapsScraper(driver, **scraper_options)
+
+                    # Update job status to running
+                    self.job_manager.update_job_status(job_id, 'running')
+                    self.progress.publish(job_id, 'status', {'status': 'running'})
+
+                    # Run the scraping
+                    results = scraper.scrape(location, radius, type_filter)
+
+                    # Update job with results
+                    completion_time = str(datetime.now(timezone.utc))
+                    self.job_manager.update_job_status(
+                        job_id,
+                        'completed',
+                        results=results,
+                        completion_time=completion_time
+                    )
+                    places_final = True
+                    self.job_manager.update_job_fields(job_id, {'scrapeStats': {
+                        'placesReused': scraper.places_reused,
+                        'placesResumed': scraper.places_resumed,
+                        'placesExtracted': scraper.places_extracted,
+                        'bulkExtractions': scraper.bulk_extractions,
+                        'fieldExtractions': scraper.field_extractions,
+                    }})
+                    checkpoint.start_emails()
+                    self.progress.publish(job_id, 'status', {'status': 'completed', 'results': len(results)})
+            else:
+                # Only the email crawl is left, which doesn't need a driver
+                scraper = GoogleMapsScraper(**scraper_options)
+
+            scraper.scrape_website_emails(job_id, self.job_manager)
+            self.job_manager.update_job_fields(job_id, {'crawlStats': scraper.crawl_stats})
+            checkpoint.finish()
+            status = 'completed'
+            self.progress.publish(job_id, 'done', {'status': 'completed'})
+
+        except JobCancelled:
+            if lease_lost is not None and lease_lost.is_set():
+                status = None
+                print(f"Stopped job {job_id}, its lease was handed to another worker")
+            elif places_final:
+                # The email crawl stops with the emails found so far
+                status = 'cancelled'
+                checkpoint.finish()
+                self.progress.publish(job_id, 'cancelled', {'status': 'completed'})
+                print(f"Email crawl cancelled: {job_id}")
+            else:
+                status = 'cancelled'
+                self.job_manager.update_job_status(job_id, 'cancelled')
+                self.progress.publish(job_id, 'cancelled', {'status': 'cancelled'})
+                print(f"Scraping cancelled: {job_id}")
 
         except Exception as e:
-            # Update job status to failed
-            self.job_manager.update_job_status(job_id, 'failed')
             print(f"Scraping failed: {e}")
             print(f"An error occurred: {e.__traceback__.tb_lineno}")
+            if lease_lost is not None and lease_lost.is_set():
+                status = None
+            elif places_final:
+                # The checkpoint stays, so the email crawl is resumed on restart
+                self.progress.publish(job_id, 'failed', {'status': 'completed', 'error': str(e)})
+            else:
+                # Update job status to failed
+                self.job_manager.update_job_status(job_id, 'failed')
+                self.progress.publish(job_id, 'failed', {'status': 'failed', 'error': str(e)})
+
         finally:
-            scraper.close()
\ No newline at end of file
+            # A run that lost its lease leaves the job to its new worker
+            if status is not None:
+                metrics.count(JOBS, status=status)
+                try:
+                    self.job_manager.update_job_fields(job_id, {'metrics': metrics.snapshot()})
+                except Exception as e:
+                    print(f"Saving metrics of job {job_id} failed: {e}")
+
+    def resume_orphaned_jobs(self):
+        """Queue the jobs an earlier process left unfinished again.
+
+        Only used when jobs run in this process; in worker mode the job
+        queue hands jobs of dead workers to other workers.
+        """
+        resumed = []
+        for job in self.job_manager.find_orphaned_jobs():
+            print(f"Resuming orphaned job {job['id']} ({job['status']})")
+            self.start_scraping_job(
+                job['id'], job['location'], job['radius'], job['type'],
+                incremental=job.get('incremental', False),
+                tiled=job.get('tiled', False),
+                # Its places are final, only the email crawl is left
+                keep_status=job['status'] == 'completed'
+            )
+            resumed.append(job['id'])
+        return resumed
+
+    def get_scheduler_stats(self):
+        """Queue depth, running jobs and queue wait times"""
+        if self.job_queue is not None:
+            return self.job_queue.stats()
+        return self.scheduler.stats()
+
+    def get_pool_stats(self):
+        """Driver pool size, wait time and recycle counts"""
+        return self.driver_pool.stats()
@@ -0,0 +1,186 @@
+"""Resuming interrupted jobs from their checkpoint"""
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from config import Config
+from scraping.checkpoint import JobCheckpoint
+from scraping.job_manager import JobManager
+from scraping.job_store import SqliteJobStore
+from scraping.place_cache import place_key
+from services import scraping_service
+from scraping.scraper import JobCancelled
+from services.scraping_service import ScrapingService
+
+
+def place(index, website=None):
+    return {
+        'name': f"Place {index}",
+        'address': f"{index} Main Street",
+        'type': 'hotels',
+        'website': website,
+        'emails': "",
+    }
+
+
+def place_url(index):
+    return f"https://www.google.com/maps/place/place-{index}/"
+
+
+class FakePool:
+    """Driver pool that counts leases instead of launching Chrome"""
+    def __init__(self):
+        self.leases = 0
+
+    @contextmanager
+    def lease(self, timeout=None):
+        self.leases += 1
+        yield object()
+
+    def acquire(self, timeout=None, block=True):
+        return None
+
+    def stats(self):
+        return {'inUse': 0, 'size': 0}
+
+
+class FakeScraper:
+    """Stands in for GoogleMapsScraper, extracting the places it is given"""
+    places = []
+    crawled = []
+
+    def __init__(self, driver=None, checkpoint=None, **options):
+        self.driver = driver
+        self.checkpoint = checkpoint
+        self.places_reused = self.places_extracted = 0
+        self.places_resumed = self.bulk_extractions = self.field_extractions = 0
+        self.crawl_stats = {}
+
+    def scrape(self, location, radius, type_filter):
+        urls = [place_url(index) for index in range(len(self.places))]
+        resumed = self.checkpoint.places_for(urls)
+        results = []
+        for url, result in zip(urls, self.places):
+            if url in resumed:
+                self.places_resumed += 1
+                results.append(resumed[url])
+            else:
+                self.places_extracted += 1
+                self.checkpoint.add_place(url, dict(result))
+                results.append(result)
+        return results
+
+    def scrape_website_emails(self, job_id, job_manager):
+        websites = [
+            result['website'] for result in job_manager.get_job(job_id)['results']
+            if result.get('website') and result['website'] not in self.checkpoint.crawled
+        ]
+        FakeScraper.crawled.extend(websites)
+        emails = {website: f"info@{website}" for website in websites}
+        job_manager.update_result_emails(job_id, emails)
+        self.checkpoint.add_crawled(list(emails))
+
+
+@pytest.fixture
+def job_manager(tmp_path):
+    return JobManager(jobs_dir=str(tmp_path / 'jobs'), store=SqliteJobStore(str(tmp_path / 'jobs.db')))
+
+
+@pytest.fixture
+def service(job_manager, monkeypatch):
+    monkeypatch.setattr(Config, 'EMAIL_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'PLACE_CACHE_ENABLED', False)
+    monkeypatch.setattr(scraping_service, 'GoogleMapsScraper', FakeScraper)
+    FakeScraper.places = [place(index, f"site{index}.example") for index in range(5)]
+    FakeScraper.crawled = []
+    return ScrapingService(job_manager, driver_pool=FakePool())
+
+
+def save_job(job_manager, job_id, **fields):
+    job = {'location': "Lisbon", 'radius': 5, 'type': 'hotels', 'status': 'running', 'results': []}
+    job.update(fields)
+    job_manager.save_job(job_id, job)
+
+
+def run(service, job_id):
+    service.run_scraping_job(job_id, threading.Event(), "Lisbon", 5, 'hotels')
+
+
+def test_checkpoint_appends_places_added_since_last_save(job_manager):
+    save_job(job_manager, 'job', results=[place(99)])
+    checkpoint = JobCheckpoint('job', job_manager, interval=3600, batch=2)
+
+    for index in range(5):
+        checkpoint.add_place(place_url(index), place(index))
+    checkpoint.save()
+
+    job = job_manager.get_job('job')
+    # The first save replaced the stale result, later saves appended
+    assert [result['name'] for result in job['results']] == [f"Place {index}" for index in range(5)]
+    assert job_manager.get_job('job', include_results=False)['resultCount'] == 5
+    # Place URLs stay in the checkpoint, results keep their fields
+    assert not any('url' in result for result in job['results'])
+    resumed = JobCheckpoint.from_job('job', job_manager, job)
+    assert resumed.places_for([place_url(3)]) == {place_url(3): job['results'][3]}
+
+
+def test_resume_from_extraction_phase_skips_extracted_places(service, job_manager):
+    extracted = FakeScraper.places[:2]
+    save_job(job_manager, 'job', results=extracted,
+             checkpoint={'phase': 'extraction', 'places': 2, 'crawled': [],
+                         'placeKeys': [place_key(place_url(index)) for index in range(2)]})
+
+    run(service, 'job')
+
+    job = job_manager.get_job('job')
+    assert job['status'] == 'completed'
+    assert job['checkpoint'] is None
+    assert job['scrapeStats']['placesResumed'] == 2
+    assert job['scrapeStats']['placesExtracted'] == 3
+    assert [result['name'] for result in job['results']] == [result['name'] for result in FakeScraper.places]
+    assert all(result['emails'] for result in job['results'])
+    assert not any('url' in result for result in job['results'])
+    assert service.driver_pool.leases == 1
+    assert job_manager.find_orphaned_jobs() == []
+
+
+def test_resume_from_email_phase_only_crawls_remaining_websites(service, job_manager):
+    save_job(job_manager, 'job', status='completed', results=FakeScraper.places,
+             checkpoint={'phase': 'email', 'places': 5, 'crawled': ["site0.example", "site1.example"]})
+    submitted = []
+    service.scheduler.submit = lambda job_id, args=(), priority=0: submitted.append((job_id, args)) or 0
+
+    service.resume_orphaned_jobs()
+
+    # The job stays completed while its email crawl waits to be resumed
+    assert job_manager.get_job('job', include_results=False)['status'] == 'completed'
+    assert [job_id for job_id, _args in submitted] == ['job']
+
+    service.run_scraping_job('job', threading.Event(), *submitted[0][1])
+
+    job = job_manager.get_job('job')
+    assert job['status'] == 'completed'
+    assert job['checkpoint'] is None
+    assert FakeScraper.crawled == ["site2.example", "site3.example", "site4.example"]
+    assert service.driver_pool.leases == 0
+    assert job_manager.find_orphaned_jobs() == []
+
+
+def test_cancelled_email_crawl_keeps_the_job_completed(service, job_manager, monkeypatch):
+    def cancel(self, job_id, job_manager):
+        raise JobCancelled()
+
+    monkeypatch.setattr(FakeScraper, 'scrape_website_emails', cancel)
+    events = []
+    service.progress.publish = lambda job_id, event, data: events.append((event, data['status']))
+    save_job(job_manager, 'job', status='queued')
+
+    run(service, 'job')
+
+    job = job_manager.get_job('job')
+    assert job['status'] == 'completed'
+    assert len(job['results']) == 5
+    assert job['checkpoint'] is None
+    assert events[-1] == ('cancelled', 'completed')
+    assert job_manager.find_orphaned_jobs() == []
@@ -0,0 +1,55 @@
+"""Ordering and budgets of a domain's crawl frontier"""
+from scraping.crawl_frontier import CrawlFrontier, link_priority
+
+
+def test_contact_pages_are_taken_first():
+    frontier = CrawlFrontier(max_pages=20)
+    for url, label in [
+        ("https://example.com/menu", "Menu"),
+        ("https://example.com/shop/cart", "Cart"),
+        ("https://example.com/blog/2020/opening", "We opened!"),
+        ("https://example.com/our-story", "About us"),
+        ("https://example.com/gallery", "Gallery"),
+        ("https://example.com/contact", "Contact"),
+        ("https://example.com/find-us", "Directions"),
+    ]:
+        frontier.add(url, label)
+
+    assert frontier.take(20) == [
+        "https://example.com/contact",
+        "https://example.com/our-story",
+        "https://example.com/find-us",
+        # Equal scores keep the order they were found in
+        "https://example.com/menu",
+        "https://example.com/gallery",
+        "https://example.com/blog/2020/opening",
+        "https://example.com/shop/cart",
+    ]
+
+
+def test_files_and_repeated_pages_are_not_queued():
+    frontier = CrawlFrontier()
+    frontier.add("https://example.com/menu.pdf", "Menu")
+    frontier.add("https://example.com/contact#form", "Contact")
+    frontier.add("https://example.com/contact", "Contact")
+
+    assert link_priority("https://example.com/logo.PNG") is None
+    assert frontier.take(10) == ["https://example.com/contact"]
+    assert frontier.exhausted()
+
+
+def test_pages_stop_at_the_page_and_byte_budgets():
+    frontier = CrawlFrontier(max_pages=3, max_bytes=1000)
+    for index in range(10):
+        frontier.add(f"https://example.com/page-{index}")
+
+    assert len(frontier.take(2)) == 2
+    assert len(frontier.take(2)) == 1
+    assert frontier.exhausted() and frontier.take(2) == []
+
+    frontier = CrawlFrontier(max_pages=10, max_bytes=1000)
+    for index in range(10):
+        frontier.add(f"https://example.com/page-{index}")
+    frontier.take(1)
+    frontier.downloaded(1000)
+    assert frontier.exhausted() and frontier.take(2) == []
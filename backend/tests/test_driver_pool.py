@@ -0,0 +1,135 @@
+"""Leasing, resetting and recycling pooled Chrome drivers"""
+import threading
+import time
+
+import pytest
+
+from scraping.driver_pool import (
+    BLOCKED_URL_PATTERNS, LEAN_PREFS, DriverPool, block_resources, chrome_options,
+)
+
+
+class FakeDriver:
+    """Records the CDP commands and tab switches of a pool reset"""
+    def __init__(self, history=None):
+        self.window_handles = ['main']
+        self.history = history or {}
+        self.current = 'main'
+        self.commands = []
+        self.closed = []
+        self.quit_calls = 0
+
+    @property
+    def switch_to(self):
+        driver = self
+
+        class SwitchTo:
+            def window(self, handle):
+                driver.current = handle
+        return SwitchTo()
+
+    def close(self):
+        self.closed.append(self.current)
+        self.window_handles.remove(self.current)
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        if command == 'Page.getNavigationHistory':
+            return {'entries': [{'url': url} for url in self.history.get(self.current, [])]}
+        return {}
+
+    def get(self, url):
+        self.commands.append(('get', url))
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def test_reset_clears_storage_of_every_visited_origin():
+    driver = FakeDriver({
+        'main': ["about:blank", "https://www.google.com/maps/search/hotels/", "https://consent.google.com/ml"],
+        'popup': ["https://www.google.com/maps/place/x/"],
+    })
+    driver.window_handles = ['main', 'popup']
+    pool = DriverPool(max_size=1, driver_factory=lambda: driver)
+
+    pool.release(pool.acquire())
+
+    assert driver.closed == ['popup']
+    cleared = [params['origin'] for command, params in driver.commands if command == 'Storage.clearDataForOrigin']
+    assert cleared == ["https://consent.google.com", "https://www.google.com"]
+    assert ('Network.clearBrowserCookies', {}) in driver.commands
+    assert driver.commands[-2:] == [('get', "about:blank"), ('Page.resetNavigationHistory', {})]
+
+
+def counting_pool(**kwargs):
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+    return DriverPool(driver_factory=factory, **kwargs), drivers
+
+
+def test_driver_is_recycled_after_max_uses():
+    pool, drivers = counting_pool(max_size=1, max_uses=3)
+
+    for _lease in range(4):
+        pool.release(pool.acquire())
+
+    assert len(drivers) == 2
+    assert [driver.quit_calls for driver in drivers] == [1, 0]
+    stats = pool.stats()
+    assert (stats['leases'], stats['created'], stats['recycledMaxUses'], stats['size']) == (4, 2, 1, 1)
+
+
+def test_crashed_driver_is_replaced():
+    pool, drivers = counting_pool(max_size=1)
+
+    pool.release(pool.acquire(), broken=True)
+    pooled = pool.acquire()
+
+    assert pooled.driver is drivers[1]
+    assert drivers[0].quit_calls == 1
+    assert pool.stats()['recycledCrashed'] == 1
+
+
+def test_blocked_acquire_times_out():
+    pool, _drivers = counting_pool(max_size=1)
+    leased = pool.acquire()
+
+    started = time.monotonic()
+    assert pool.acquire(timeout=0.1) is None
+    assert time.monotonic() - started >= 0.1
+    assert pool.acquire(block=False) is None
+    with pytest.raises(TimeoutError):
+        with pool.lease(timeout=0.05):
+            pass
+
+    # A release hands the driver to the next waiter
+    threading.Timer(0.05, pool.release, (leased,)).start()
+    assert pool.acquire(timeout=5) is leased
+
+
+def test_lean_profile_uses_a_small_viewport_without_images():
+    lean = chrome_options('lean', window_size=(800, 600))
+    default = chrome_options('default')
+
+    assert "--window-size=800,600" in lean.arguments
+    assert "--blink-settings=imagesEnabled=false" in lean.arguments
+    assert lean.experimental_options['prefs'] == LEAN_PREFS
+    assert "--start-fullscreen" in default.arguments
+    assert 'prefs' not in default.experimental_options
+    assert "--headless=new" in lean.arguments and "--headless=new" in default.arguments
+
+
+def test_blocked_resources_are_set_through_cdp():
+    driver = FakeDriver()
+
+    block_resources(driver)
+
+    assert driver.commands == [
+        ('Network.enable', {}),
+        ('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS}),
+    ]
+    assert "*.woff2" in BLOCKED_URL_PATTERNS and "*/maps/vt*" in BLOCKED_URL_PATTERNS
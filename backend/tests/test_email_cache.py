@@ -0,0 +1,67 @@
+"""Caching crawled website emails across jobs"""
+import pytest
+
+from scraping import email_cache
+from scraping.email_cache import EmailCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(email_cache.time, 'time', clock.time)
+    return clock
+
+
+def test_websites_of_a_domain_share_an_entry(tmp_path, clock):
+    cache = EmailCache(str(tmp_path / "emails.db"))
+    cache.put("https://www.Example.com/contact", "info@example.com")
+
+    assert cache.get("http://example.com/") == "info@example.com"
+    assert cache.get("https://other.example/") is None
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = EmailCache(str(tmp_path / "emails.db"), ttl_seconds=60)
+    cache.put("https://example.com/", "info@example.com")
+
+    clock.now += 60
+    assert cache.get("https://example.com/") == "info@example.com"
+    clock.now += 1
+    assert cache.get("https://example.com/") is None
+    assert cache.size() == 0
+
+
+def test_least_recently_read_entries_are_evicted(tmp_path, clock):
+    cache = EmailCache(str(tmp_path / "emails.db"), max_entries=2)
+    for domain in ("a.example", "b.example", "c.example"):
+        cache.put(f"https://{domain}/", f"info@{domain}")
+        clock.now += 1
+    cache.get("https://a.example/")
+
+    cache.evict()
+
+    assert cache.size() == 2
+    assert cache.get("https://b.example/") is None
+    assert cache.get("https://a.example/") == "info@a.example"
+    assert cache.get("https://c.example/") == "info@c.example"
+
+
+def test_eviction_runs_every_hundred_writes(tmp_path, clock):
+    cache = EmailCache(str(tmp_path / "emails.db"), max_entries=10)
+    for index in range(99):
+        cache.put(f"https://site-{index}.example/", "")
+        clock.now += 1
+    assert cache.size() == 99
+
+    cache.put("https://site-99.example/", "")
+
+    assert cache.size() == 10
+    assert cache.get("https://site-99.example/") == ""
@@ -0,0 +1,100 @@
+"""Crawling websites for emails against a local aiohttp server"""
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from scraping.email_crawler import EmailCrawler
+
+
+class Site:
+    """Local web server; /<site>/ links to six slow pages without emails"""
+    def __init__(self):
+        self.in_flight = defaultdict(int)
+        self.max_in_flight = defaultdict(int)
+        self.max_total = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/big/', self.big)
+        app.router.add_get('/pdf/', self.pdf)
+        app.router.add_get('/{site}/', self.home)
+        app.router.add_get('/{site}/page-{page}', self.page)
+        return app
+
+    async def home(self, request):
+        links = "".join(f'<a href="page-{page}">Page {page}</a>' for page in range(6))
+        return web.Response(text=f"<html>{links}</html>", content_type='text/html')
+
+    async def page(self, request):
+        host = request.host.split(":")[0]
+        self.in_flight[host] += 1
+        self.max_in_flight[host] = max(self.max_in_flight[host], self.in_flight[host])
+        self.max_total = max(self.max_total, sum(self.in_flight.values()))
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.in_flight[host] -= 1
+        return web.Response(text="<html>Nothing here</html>", content_type='text/html')
+
+    async def big(self, request):
+        body = "info@first.example " + "x" * 5000 + " late@second.example"
+        return web.Response(text=body, content_type='text/html')
+
+    async def pdf(self, request):
+        return web.Response(body=b"%PDF-1.4 sales@pdf.example", content_type='application/pdf')
+
+
+def crawl(site, paths, hosts=("127.0.0.1",), **kwargs):
+    """Crawl paths on a fresh local server, returns the crawler and emails by host and path"""
+    async def scenario():
+        runner = web.AppRunner(site.app())
+        await runner.setup()
+        server = web.TCPSite(runner, "127.0.0.1", 0)
+        await server.start()
+        port = runner.addresses[0][1]
+        try:
+            crawler = EmailCrawler(**kwargs)
+            results = {}
+            websites = [f"http://{host}:{port}{path}" for host in hosts for path in paths]
+
+            def on_result(domain, emails):
+                parts = urlsplit(domain)
+                results[parts.hostname + parts.path] = emails
+            await crawler.crawl(websites, on_result)
+            return crawler, results
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_requests_are_bounded_per_host():
+    site = Site()
+
+    crawler, results = crawl(site, ["/a/", "/b/"], hosts=("127.0.0.1", "localhost"), per_host=2, concurrency=10)
+
+    assert results == {
+        "127.0.0.1/a/": "", "127.0.0.1/b/": "", "localhost/a/": "", "localhost/b/": "",
+    }
+    # Both websites of a host share its two request slots
+    assert dict(site.max_in_flight) == {"127.0.0.1": 2, "localhost": 2}
+    assert site.max_total > 2
+    assert crawler.stats()['pagesFetched'] == 4 * 7
+
+
+def test_responses_are_cut_at_max_body_bytes():
+    crawler, results = crawl(Site(), ["/big/"], max_body_bytes=1000)
+
+    assert results == {"127.0.0.1/big/": "info@first.example"}
+    stats = crawler.stats()
+    assert (stats['responsesTruncated'], stats['bytesDownloaded']) == (1, 1000)
+
+
+def test_non_html_responses_are_not_read():
+    crawler, results = crawl(Site(), ["/pdf/"])
+
+    assert results == {"127.0.0.1/pdf/": ""}
+    stats = crawler.stats()
+    assert (stats['responsesSkipped'], stats['bytesDownloaded']) == (1, 0)
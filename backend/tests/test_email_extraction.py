@@ -0,0 +1,69 @@
+"""Email and link extraction from raw HTML"""
+from scraping.email_extraction import HOLDBACK, EmailScanner, extract_anchors, extract_emails
+
+
+def test_relative_links_resolve_against_the_page():
+    html = (
+        '<a href="/contact">Contact us</a>'
+        '<a href="about.html">About</a>'
+        '<a href="//www.example.com/menu#top">Menu</a>'
+        '<a href="https://example.com/contact#form">Form</a>'
+    )
+
+    anchors = extract_anchors(html, "https://example.com/pages/", "example.com")
+
+    assert anchors == [
+        ("https://example.com/contact", "Contact us"),
+        ("https://example.com/pages/about.html", "About"),
+        ("https://www.example.com/menu", "Menu"),
+    ]
+
+
+def test_links_to_other_hosts_are_dropped():
+    html = (
+        '<a href="https://example.com.evil.net/contact">Contact</a>'
+        '<a href="https://notexample.com/">Other</a>'
+        '<a href="https://shop.example.com/">Shop</a>'
+        '<a href="mailto:info@example.com">Mail</a>'
+        '<a href="javascript:void(0)">Menu</a>'
+        '<a href="https://example.com/team">Team</a>'
+    )
+
+    anchors = extract_anchors(html, "https://www.example.com/")
+
+    assert anchors == [("https://example.com/team", "Team")]
+
+
+def test_emails_are_deduplicated_case_insensitively():
+    emails = extract_emails('Write to <a href="mailto:Info@Example.com">us</a> or info@example.com')
+
+    assert list(emails.values()) == ["Info@Example.com"]
+
+
+def test_scanner_finds_addresses_split_across_chunks():
+    page = (
+        "<p>" + "x " * HOLDBACK + "Sales: sales@shop.example.com</p>"
+        + "y " * HOLDBACK + '<a href="mailto:info%40shop.example.com">Mail</a>'
+        + "z " * 10 + "Support@Shop.example.com"
+    )
+
+    for size in (1, 7, 100, HOLDBACK + 1, len(page)):
+        scanner = EmailScanner()
+        for start in range(0, len(page), size):
+            scanner.feed(page[start:start + size])
+        scanner.close()
+
+        assert scanner.emails == extract_emails(page)
+        assert set(scanner.emails.values()) == {
+            "sales@shop.example.com", "info@shop.example.com", "Support@Shop.example.com",
+        }, size
+
+
+def test_scanner_reports_each_address_once():
+    emails = {}
+    scanner = EmailScanner(emails)
+    scanner.feed("a@example.com " * 500)
+    scanner.feed("b@example.com")
+    scanner.close()
+
+    assert list(emails.values()) == ["a@example.com", "b@example.com"]
@@ -0,0 +1,66 @@
+"""Batching crawled emails into job store writes"""
+import queue
+import threading
+
+from scraping.email_output import EmailOutput
+from scraping.job_store import payload_bytes
+
+
+class FakeJobManager:
+    """Records every flushed batch"""
+    def __init__(self):
+        self.batches = []
+        self.flushed = threading.Event()
+
+    def update_result_emails(self, job_id, emails_by_website):
+        self.batches.append(dict(emails_by_website))
+        self.flushed.set()
+        return payload_bytes(emails_by_website)
+
+
+def start_output(**kwargs):
+    results = queue.Queue()
+    job_manager = FakeJobManager()
+    output = EmailOutput(results, 'job', job_manager, **kwargs)
+    output.start()
+    return output, results, job_manager
+
+
+def test_emails_are_flushed_in_batches():
+    output, results, job_manager = start_output(batch_size=3, flush_interval=60)
+
+    for index in range(7):
+        results.put((f"https://site-{index}.example/", f"info@site-{index}.example"))
+    results.put(None)
+    output.join(5)
+
+    assert [len(batch) for batch in job_manager.batches] == [3, 3, 1]
+    assert output.stats() == {
+        'updates': 7,
+        'flushes': 3,
+        'payloadBytes': sum(payload_bytes(batch) for batch in job_manager.batches),
+    }
+
+
+def test_updates_of_a_website_are_coalesced():
+    output, results, job_manager = start_output(batch_size=3, flush_interval=60)
+
+    results.put(("https://site.example/", ""))
+    results.put(("https://site.example/", "info@site.example"))
+    results.put(None)
+    output.join(5)
+
+    assert job_manager.batches == [{"https://site.example/": "info@site.example"}]
+
+
+def test_a_partial_batch_is_flushed_after_the_interval():
+    output, results, job_manager = start_output(batch_size=100, flush_interval=0.05)
+
+    results.put(("https://site.example/", "info@site.example"))
+
+    # Flushed by the interval while the crawl is still running
+    assert job_manager.flushed.wait(5)
+    assert job_manager.batches == [{"https://site.example/": "info@site.example"}]
+    results.put(None)
+    output.join(5)
+    assert output.flushes == 1
@@ -0,0 +1,87 @@
+"""Running queued jobs in priority order on a bounded number of threads"""
+import threading
+
+import pytest
+
+from services.job_scheduler import JobScheduler
+
+
+class Jobs:
+    """run_job that records the order jobs ran in; 'blocker' waits for release"""
+    def __init__(self):
+        self.ran = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Semaphore(0)
+
+    def __call__(self, job_id, cancel_event, *args):
+        if job_id == 'blocker':
+            self.started.set()
+            self.release.wait(5)
+        self.ran.append(job_id)
+        self.finished.release()
+
+
+@pytest.fixture
+def jobs():
+    return Jobs()
+
+
+def start_blocked(jobs):
+    scheduler = JobScheduler(jobs, max_concurrent=1)
+    scheduler.submit('blocker')
+    assert jobs.started.wait(5)
+    return scheduler
+
+
+def wait_for(jobs, count):
+    for _i in range(count):
+        assert jobs.finished.acquire(timeout=5)
+
+
+def test_higher_priority_jobs_run_first(jobs):
+    scheduler = start_blocked(jobs)
+
+    positions = [
+        scheduler.submit('low', priority=0),
+        scheduler.submit('high', priority=5),
+        scheduler.submit('low-2', priority=0),
+        scheduler.submit('mid', priority=2),
+    ]
+    jobs.release.set()
+    wait_for(jobs, 5)
+
+    assert positions == [0, 0, 2, 1]
+    assert jobs.ran == ['blocker', 'high', 'mid', 'low', 'low-2']
+
+
+def test_cancelled_queued_job_never_runs(jobs):
+    scheduler = start_blocked(jobs)
+    scheduler.submit('cancelled')
+    scheduler.submit('kept')
+
+    assert scheduler.cancel('cancelled') == 'queued'
+    assert scheduler.cancel('blocker') == 'running'
+    assert scheduler.cancel('unknown') is None
+    jobs.release.set()
+    wait_for(jobs, 2)
+
+    assert jobs.ran == ['blocker', 'kept']
+    assert scheduler.stats()['queueDepth'] == 0
+
+
+def test_duplicate_submit_is_rejected(jobs):
+    scheduler = start_blocked(jobs)
+    scheduler.submit('job')
+
+    with pytest.raises(ValueError):
+        scheduler.submit('job')
+    with pytest.raises(ValueError):
+        scheduler.submit('blocker')
+    jobs.release.set()
+    wait_for(jobs, 2)
+
+    # The worker survived and keeps running new jobs
+    scheduler.submit('later')
+    wait_for(jobs, 1)
+    assert jobs.ran == ['blocker', 'job', 'later']
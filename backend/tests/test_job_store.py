@@ -0,0 +1,44 @@
+"""Writing and querying job results in the job stores"""
+import pytest
+
+from scraping.job_store import JsonJobStore, SqliteJobStore
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return SqliteJobStore(str(tmp_path / 'jobs.db'))
+    return JsonJobStore(str(tmp_path / 'jobs'))
+
+
+def save(store, results):
+    store.save_job({
+        'id': 'job', 'location': 'Lisbon', 'radius': 5, 'type': 'hotels',
+        'status': 'completed', 'results': results,
+    })
+
+
+def test_update_emails_reports_payload_bytes(store):
+    save(store, [{'name': "Café", 'website': 'https://cafe.example/', 'emails': ""}])
+
+    reported = store.update_emails('job', {'https://cafe.example/': "olá@café.example"})
+
+    # The same figure from both stores: the encoded emails
+    assert reported == len("olá@café.example".encode('utf-8'))
+    assert store.get_job('job')['results'][0]['emails'] == "olá@café.example"
+
+
+@pytest.mark.parametrize('q, names', [
+    ("100%", ["100% Vegan"]),
+    ("a_b", ["a_b Bar"]),
+    ("\\", ["Back\\slash"]),
+    ("vegan", ["100% Vegan", "1000 Vegan"]),
+])
+def test_query_results_matches_wildcards_literally(store, q, names):
+    save(store, [{'name': name, 'type': 'restaurants'}
+                 for name in ["100% Vegan", "1000 Vegan", "a_b Bar", "axb Bar", "Back\\slash"]])
+
+    total, results = store.query_results('job', {'q': q})
+
+    assert total == len(names)
+    assert [result['name'] for result in results] == names
@@ -0,0 +1,59 @@
+"""Prometheus rendering and per-job summaries of pipeline metrics"""
+from scraping.metrics import JobMetrics, MetricsRegistry
+
+
+def test_registry_renders_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    errors = registry.counter('crawler_http_errors_total', "Failed requests")
+    seconds = registry.histogram('phase_seconds', "Phase durations", buckets=(1.0, 5.0))
+    registry.gauge('queue_depth', "Queued jobs", lambda: 3)
+    errors.inc(reason='5xx')
+    errors.inc(2, reason='Timeout"Error')
+    seconds.observe(1.0, phase='scroll')
+    seconds.observe(7.5, phase='scroll')
+
+    assert registry.render() == "\n".join([
+        '# HELP crawler_http_errors_total Failed requests',
+        '# TYPE crawler_http_errors_total counter',
+        'crawler_http_errors_total{reason="5xx"} 1',
+        'crawler_http_errors_total{reason="Timeout\\"Error"} 2',
+        '# HELP phase_seconds Phase durations',
+        '# TYPE phase_seconds histogram',
+        'phase_seconds_bucket{phase="scroll",le="1.0"} 1',
+        'phase_seconds_bucket{phase="scroll",le="5.0"} 1',
+        'phase_seconds_bucket{phase="scroll",le="+Inf"} 2',
+        'phase_seconds_sum{phase="scroll"} 8.5',
+        'phase_seconds_count{phase="scroll"} 2',
+        '# HELP queue_depth Queued jobs',
+        '# TYPE queue_depth gauge',
+        'queue_depth 3',
+    ]) + "\n"
+
+
+def test_failing_gauge_is_left_out():
+    registry = MetricsRegistry()
+    registry.gauge('pool_size', "Drivers", lambda: 1 / 0)
+
+    assert registry.render() == "# HELP pool_size Drivers\n# TYPE pool_size gauge\n"
+
+
+def test_job_metrics_summarize_the_job():
+    registry = MetricsRegistry()
+    pages = registry.counter('pages_total', "Pages")
+    seconds = registry.histogram('domain_seconds', "Domain durations")
+    metrics = JobMetrics()
+    metrics.count(pages, 3)
+    metrics.count(pages, 2)
+    for value in (1.0, 2.0, 3.0, 4.0):
+        metrics.observe(seconds, value)
+    metrics.record_span('flush', 0.5)
+    metrics.record_span('flush', 1.5)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot['counters'] == {'pages_total': 5}
+    assert snapshot['histograms'] == {
+        'domain_seconds': {'count': 4, 'avg': 2.5, 'p50': 3.0, 'p95': 4.0, 'max': 4.0},
+    }
+    assert snapshot['spans'] == {'flush': {'count': 2, 'seconds': 2.0, 'maxSeconds': 1.5}}
+    assert 'pages_total 5' in registry.render()
@@ -0,0 +1,50 @@
+"""Reusing extracted place details across jobs"""
+from scraping import place_cache
+from scraping.place_cache import PlaceCache, place_key
+from scraping.scraper import GoogleMapsScraper
+
+PLACE = "https://www.google.com/maps/place/Hotel+One/@52.37,4.89,17z/data=!4m7!3m6!1s0x47c609c3db87e4bb:0x1b1b1b1b1b1b1b1b!8m2"
+
+
+def test_urls_of_the_same_place_share_a_key():
+    moved = PLACE.replace("@52.37,4.89,17z", "@52.40,4.80,14z") + "?entry=ttu"
+
+    assert place_key(PLACE) == place_key(moved) == "0x47c609c3db87e4bb:0x1b1b1b1b1b1b1b1b"
+    assert place_key("https://www.google.com/maps/place/Hotel+One/@52.37,4.89,17z") == "/maps/place/Hotel+One"
+
+
+def test_cached_places_are_found_by_any_of_their_urls(tmp_path):
+    cache = PlaceCache(str(tmp_path / "places.db"))
+    cache.put(PLACE, {'name': "Hotel One", 'rating': "4.5"})
+    moved = PLACE.replace("@52.37,4.89,17z", "@52.40,4.80,14z")
+    unknown = "https://www.google.com/maps/place/Hotel+Two/"
+
+    found = cache.get_many([PLACE, moved, unknown])
+
+    assert found == {PLACE: {'name': "Hotel One", 'rating': "4.5"}, moved: {'name': "Hotel One", 'rating': "4.5"}}
+
+
+def test_stale_places_are_missed(tmp_path, monkeypatch):
+    cache = PlaceCache(str(tmp_path / "places.db"), ttl_seconds=60)
+    cache.put(PLACE, {'name': "Hotel One"})
+    now = place_cache.time.time()
+    monkeypatch.setattr(place_cache.time, 'time', lambda: now + 61)
+
+    assert cache.get_many([PLACE]) == {}
+
+
+def test_incremental_scrape_reuses_cached_places(tmp_path):
+    cache = PlaceCache(str(tmp_path / "places.db"))
+    cache.put(PLACE, {'name': "Hotel One", 'type': 'hotels', 'emails': "old@example.com"})
+    other = "https://www.google.com/maps/place/Hotel+Two/"
+    scraper = GoogleMapsScraper(object(), place_cache=cache, incremental=True, extraction_mode='fields')
+    opened = []
+    scraper.extract_place = lambda driver, wait, url, type_filter: opened.append(url) or {'name': "Hotel Two"}
+
+    results = scraper.extract_place_details([PLACE, other], 'lodging')
+
+    assert opened == [other]
+    assert results == [{'name': "Hotel One", 'type': 'lodging', 'emails': ""}, {'name': "Hotel Two"}]
+    assert (scraper.places_reused, scraper.places_extracted) == (1, 1)
+    # The freshly extracted place is cached for the next job
+    assert cache.get_many([other]) == {other: {'name': "Hotel Two"}}
@@ -0,0 +1,119 @@
+"""Extracting place details across the job's driver and pooled drivers"""
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from scraping.driver_pool import PooledDriver
+from scraping.scraper import GoogleMapsScraper
+
+
+class FakeDriver:
+    """Driver that can be made to crash; a crashed driver fails every call"""
+    def __init__(self, name):
+        self.name = name
+        self.dead = False
+
+    @property
+    def current_url(self):
+        if self.dead:
+            raise WebDriverException("chrome not reachable")
+        return "about:blank"
+
+    def execute_script(self, script, elements):
+        # The feed anchors are their hrefs here
+        return list(elements)
+
+
+class FakePool:
+    """Hands out the given drivers without blocking"""
+    def __init__(self, drivers):
+        self.free = [PooledDriver(driver) for driver in drivers]
+        self.released = []
+
+    def acquire(self, timeout=None, block=True):
+        return self.free.pop(0) if self.free else None
+
+    def release(self, pooled, broken=False):
+        self.released.append((pooled.driver.name, broken))
+
+
+def extracting_scraper(driver, pool, crashing=None):
+    """Scraper whose extract_place records which driver opened which URL"""
+    scraper = GoogleMapsScraper(driver, driver_pool=pool, detail_workers=3, extraction_mode='fields')
+    opened = []
+    lock = threading.Lock()
+    crashed = threading.Event()
+
+    def extract_place(driver, wait, url, type_filter):
+        if driver.dead or driver.name == crashing:
+            driver.dead = True
+            crashed.set()
+            raise WebDriverException("chrome not reachable")
+        if crashing and driver.name != crashing:
+            # Leave the crashing driver a place to crash on
+            crashed.wait(5)
+        with lock:
+            opened.append((driver.name, url))
+        return {'name': url, 'type': type_filter}
+
+    scraper.extract_place = extract_place
+    return scraper, opened
+
+
+def test_places_are_returned_in_feed_order():
+    pool = FakePool([FakeDriver('pooled-1'), FakeDriver('pooled-2')])
+    scraper, opened = extracting_scraper(FakeDriver('job'), pool)
+    urls = [f"https://maps.example/place/{index}" for index in range(20)]
+
+    results = scraper.extract_place_details(urls, 'hotels')
+
+    assert [result['name'] for result in results] == urls
+    assert sorted(url for _driver, url in opened) == sorted(urls)
+    assert sorted(pool.released) == [('pooled-1', False), ('pooled-2', False)]
+
+
+def test_place_of_a_crashed_pooled_driver_is_handed_back():
+    pool = FakePool([FakeDriver('pooled-1')])
+    urls = [f"https://maps.example/place/{index}" for index in range(10)]
+    scraper, opened = extracting_scraper(FakeDriver('job'), pool, crashing='pooled-1')
+
+    results = scraper.extract_place_details(urls, 'hotels')
+
+    assert [result['name'] for result in results] == urls
+    assert {driver for driver, _url in opened} == {'job'}
+    assert pool.released == [('pooled-1', True)]
+
+
+def test_crashed_job_driver_stops_taking_places():
+    pool = FakePool([FakeDriver('pooled-1')])
+    urls = [f"https://maps.example/place/{index}" for index in range(10)]
+    scraper, opened = extracting_scraper(FakeDriver('job'), pool, crashing='job')
+    attempts = []
+    extract_place = scraper.extract_place
+    scraper.extract_place = lambda driver, *args: attempts.append(driver.name) or extract_place(driver, *args)
+
+    results = scraper.extract_place_details(urls, 'hotels')
+
+    assert [result['name'] for result in results] == urls
+    assert attempts.count('job') == 1
+    assert pool.released == [('pooled-1', False)]
+
+
+def test_place_urls_are_collected_once_in_feed_order():
+    scraper = GoogleMapsScraper(FakeDriver('job'))
+    feed = ["https://maps.example/place/b", None, "https://maps.example/place/a", "https://maps.example/place/b"]
+
+    assert scraper.collect_place_urls(feed) == ["https://maps.example/place/b", "https://maps.example/place/a"]
+    assert scraper.collect_place_urls([]) == []
+
+
+def test_busy_pool_leaves_extraction_to_the_job_driver():
+    pool = FakePool([])
+    scraper, opened = extracting_scraper(FakeDriver('job'), pool)
+    urls = [f"https://maps.example/place/{index}" for index in range(5)]
+
+    results = scraper.extract_place_details(urls, 'hotels')
+
+    assert [result['name'] for result in results] == urls
+    assert [url for driver, url in opened if driver == 'job'] == urls
+    assert pool.released == []
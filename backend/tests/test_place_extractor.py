@@ -0,0 +1,56 @@
+"""Loading selector sets for bulk place extraction"""
+import json
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from scraping.place_extractor import PlaceExtractor
+from scraping.scraper import GoogleMapsScraper
+
+
+def selector_set(tmp_path, fields, ready=None):
+    data = {'version': 99, 'fields': fields}
+    if ready:
+        data['ready'] = ready
+    path = tmp_path / 'maps-custom.json'
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.mark.parametrize('fields, ready, locator', [
+    ({'name': {'css': "h1", 'read': 'text'}}, "div.panel", (By.CSS_SELECTOR, "div.panel")),
+    ({'name': {'css': "h1", 'read': 'text'}}, None, (By.CSS_SELECTOR, "h1")),
+    ({'name': {'xpath': "//h1", 'read': 'text'}}, None, (By.XPATH, "//h1")),
+])
+def test_ready_locator(tmp_path, fields, ready, locator):
+    extractor = PlaceExtractor(selector_set(tmp_path, fields, ready))
+
+    assert extractor.ready_locator == locator
+
+
+def test_bundled_set_waits_for_its_ready_selector():
+    extractor = PlaceExtractor()
+
+    assert extractor.ready_locator == (By.CSS_SELECTOR, extractor.selectors['ready'])
+
+
+class StaleSetWait:
+    """Wait whose ready locator never appears"""
+    def until(self, condition):
+        raise TimeoutException()
+
+
+class LiveDriver:
+    current_url = "https://www.google.com/maps/place/hotel/"
+
+
+def test_stale_selector_set_falls_back_to_field_extraction():
+    scraper = GoogleMapsScraper(LiveDriver())
+    scraper._extract_details_by_field = lambda driver, wait, type_filter: {'name': "Hotel", 'type': type_filter}
+
+    result = scraper._extract_details(scraper.driver, StaleSetWait(), 'hotels')
+
+    assert result == {'name': "Hotel", 'type': 'hotels'}
+    assert scraper.field_extractions == 1
+    assert scraper.bulk_extractions == 0
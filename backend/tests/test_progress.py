@@ -0,0 +1,91 @@
+"""Fanning job progress events out to subscribers"""
+import asyncio
+
+from services.progress import ProgressBroker
+
+
+async def next_event(subscription):
+    message = await asyncio.wait_for(subscription[1].get(), timeout=1)
+    return message['event']
+
+
+def test_finished_job_state_is_dropped_when_the_last_subscriber_leaves():
+    async def scenario():
+        broker = ProgressBroker()
+        broker.publish('job', 'phase', {'phase': 'scroll'})
+        subscription, state = broker.subscribe('job')
+        assert [message['event'] for message in state] == ['phase']
+
+        broker.publish('job', 'done', {'status': 'completed'})
+        assert await next_event(subscription) == 'done'
+        # A client connecting before the stream closes still sees the end
+        late, state = broker.subscribe('job')
+        assert [message['event'] for message in state] == ['done']
+
+        broker.unsubscribe('job', subscription)
+        broker.unsubscribe('job', late)
+        assert broker.subscribe('job')[1] == []
+
+    asyncio.run(scenario())
+
+
+def test_finished_job_without_subscribers_keeps_no_state():
+    async def scenario():
+        broker = ProgressBroker()
+        broker.publish('job', 'counts', {'places': 3})
+        broker.publish('job', 'cancelled', {'status': 'cancelled'})
+
+        assert broker.subscribe('job')[1] == []
+
+    asyncio.run(scenario())
+
+
+def test_running_job_state_survives_subscribers_leaving():
+    async def scenario():
+        broker = ProgressBroker()
+        subscription, _state = broker.subscribe('job')
+        broker.publish('job', 'counts', {'places': 3})
+        broker.publish('job', 'counts', {'emails': 1})
+        broker.unsubscribe('job', subscription)
+
+        _subscription, state = broker.subscribe('job')
+        assert [message['data'] for message in state] == [{'places': 3, 'emails': 1}]
+
+    asyncio.run(scenario())
+
+
+def test_events_fan_out_to_every_subscriber_of_the_job():
+    async def scenario():
+        broker = ProgressBroker()
+        first, _state = broker.subscribe('job')
+        second, _state = broker.subscribe('job')
+        other, _state = broker.subscribe('other-job')
+
+        # Scraping threads publish off the event loop
+        await asyncio.to_thread(broker.publish, 'job', 'phase', {'phase': 'scroll'})
+        await asyncio.to_thread(broker.publish, 'job', 'result', {'name': "Place"})
+
+        for subscription in (first, second):
+            assert [await next_event(subscription), await next_event(subscription)] == ['phase', 'result']
+        assert other[1].empty()
+        assert broker.subscriber_count('job') == 2
+        assert broker.subscriber_count() == 3
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscribers_drop_results_but_not_progress():
+    async def scenario():
+        broker = ProgressBroker(max_queue_size=2)
+        subscription, _state = broker.subscribe('job')
+        for index in range(5):
+            broker.publish('job', 'result', {'name': f"Place {index}"})
+        broker.publish('job', 'counts', {'places': 5})
+        await asyncio.sleep(0)
+
+        events = []
+        while not subscription[1].empty():
+            events.append(subscription[1].get_nowait()['event'])
+        assert events == ['result', 'result', 'counts']
+
+    asyncio.run(scenario())
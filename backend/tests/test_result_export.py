@@ -0,0 +1,62 @@
+"""Streaming exports of job results"""
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+
+from services.result_export import BATCH_SIZE, EXPORT_FIELDS, dedupe_places, export_results
+
+
+def results(count):
+    return [
+        {'name': f"Place {index}", 'address': f"{index} Main Street", 'rating': "4.5",
+         'reviews': str(index), 'type': 'hotels', 'phone': None,
+         'website': f"https://place-{index}.example/", 'emails': "", 'url': "internal"}
+        for index in range(count)
+    ]
+
+
+def test_csv_is_streamed_in_batches():
+    chunks = list(export_results(iter(results(2 * BATCH_SIZE + 5)), 'csv'))
+
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(rows) == 2 * BATCH_SIZE + 5
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert rows[-1]['name'] == f"Place {2 * BATCH_SIZE + 4}"
+
+
+def test_jsonl_projects_fields():
+    chunks = list(export_results(iter(results(3)), 'jsonl', ['name', 'website']))
+
+    lines = "".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'name': f"Place {index}", 'website': f"https://place-{index}.example/"}
+        for index in range(3)
+    ]
+
+
+def test_parquet_writes_a_row_group_per_batch():
+    chunks = list(export_results(iter(results(2 * BATCH_SIZE + 5)), 'parquet', ['name', 'rating', 'phone']))
+
+    # Every row group is handed out as soon as it is written
+    assert sum(1 for chunk in chunks if chunk) >= 3
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == ['name', 'rating', 'phone']
+    assert table.num_rows == 2 * BATCH_SIZE + 5
+    assert table.column('rating')[0].as_py() == "4.5"
+    assert table.column('phone')[0].as_py() is None
+
+
+def test_dedupe_keeps_the_first_of_each_place():
+    newer = [dict(result, jobId='newer') for result in results(2)]
+    older = [dict(result, jobId='older', name=result['name'].upper()) for result in results(3)]
+
+    kept = list(dedupe_places(newer + older))
+
+    assert [(result['name'], result['jobId']) for result in kept] == [
+        ("Place 0", 'newer'), ("Place 1", 'newer'), ("PLACE 2", 'older'),
+    ]
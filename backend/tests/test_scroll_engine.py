@@ -0,0 +1,66 @@
+"""Stop conditions of the adaptive results feed scroller"""
+from scraping.scroll_engine import FEED_STATE_SCRIPT, FeedScroller
+
+
+class FakeFeed:
+    """Results feed that loads a page of listings per scroll.
+
+    pages lists the size of each page; a page of None makes that scroll
+    load nothing. The end marker shows once every page is loaded, unless
+    the feed has no end.
+    """
+    def __init__(self, pages, first_page=5, has_end=True):
+        self.pages = list(pages)
+        self.count = first_page
+        self.has_end = has_end
+        self.scrolls = 0
+
+    def find_elements(self, by, value):
+        return [f"listing-{index}" for index in range(self.count)]
+
+    def execute_script(self, script, *args):
+        if script == FEED_STATE_SCRIPT:
+            return [self.count, self.has_end and not self.pages]
+        self.scrolls += 1
+        if self.pages:
+            self.count += self.pages.pop(0) or 0
+
+
+def scroller(feed):
+    return FeedScroller(feed, initial_timeout=0.01, max_timeout=0.04, max_stalls=3, poll_frequency=0.005)
+
+
+def test_scrolling_stops_at_the_end_marker():
+    feed = FakeFeed([5, 5, 3])
+    feed_scroller = scroller(feed)
+
+    businesses = feed_scroller.scroll()
+
+    assert len(businesses) == 18
+    assert feed.scrolls == 3
+    stats = feed_scroller.stats()
+    assert (stats['scrolls'], stats['stalls'], stats['reachedEnd']) == (3, 0, True)
+
+
+def test_scrolling_gives_up_after_max_stalls():
+    feed = FakeFeed([5], has_end=False)
+    feed_scroller = scroller(feed)
+
+    businesses = feed_scroller.scroll()
+
+    assert len(businesses) == 10
+    # One scroll that loaded listings, then max_stalls + 1 that didn't
+    assert feed.scrolls == 1 + 4
+    assert feed_scroller.stalls == 4
+    assert not feed_scroller.reached_end
+
+
+def test_a_stall_backs_off_and_keeps_scrolling():
+    feed = FakeFeed([None, None, 5])
+    feed_scroller = scroller(feed)
+
+    businesses = feed_scroller.scroll()
+
+    assert len(businesses) == 10
+    assert feed_scroller.stalls == 2
+    assert feed_scroller.reached_end
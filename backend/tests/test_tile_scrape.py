@@ -0,0 +1,80 @@
+"""Tile searches that Maps answers with a single place"""
+from selenium.common.exceptions import TimeoutException
+
+from scraping.area_tiles import Tile
+from scraping.checkpoint import JobCheckpoint
+from scraping.scraper import GoogleMapsScraper
+
+PLACE_URL = "https://www.google.com/maps/place/Hotel+Avenida/@38.71,-9.14,17z/data=!4m6!3m5!1s0xd19347e:0x3b2c!8m2"
+
+
+class RedirectingDriver:
+    """Driver whose every search opens the same place"""
+    current_url = None
+
+    def get(self, url):
+        self.current_url = PLACE_URL
+
+
+class TimeoutWait:
+    def until(self, condition):
+        raise TimeoutException()
+
+
+class FakeJobManager:
+    def update_job_fields(self, job_id, fields, results=None, append=None):
+        pass
+
+
+def tile_scraper(events):
+    checkpoint = JobCheckpoint('job', FakeJobManager(), interval=3600, batch=1000)
+    scraper = GoogleMapsScraper(
+        RedirectingDriver(), checkpoint=checkpoint, extraction_mode='fields',
+        on_event=lambda event, data: events.append(event)
+    )
+    scraper._extract_details = lambda driver, wait, type_filter: {'name': "Hotel Avenida", 'type': type_filter}
+    return scraper
+
+
+def test_single_place_tile_is_checkpointed_and_claimed_once():
+    events = []
+    scraper = tile_scraper(events)
+    seen = set()
+
+    def new_place_urls(hrefs):
+        urls = [href for href in hrefs if href not in seen]
+        seen.update(urls)
+        return urls
+
+    tile = Tile("0:0", 38.71, -9.14, 15)
+    first = scraper._scrape_tile(scraper.driver, TimeoutWait(), 'hotels', tile, new_place_urls)
+    second = scraper._scrape_tile(scraper.driver, TimeoutWait(), 'hotels', tile, new_place_urls)
+
+    assert first == [{'name': "Hotel Avenida", 'type': 'hotels'}]
+    assert second == []
+    assert scraper.places_extracted == 1
+    assert scraper.checkpoint.places_for([PLACE_URL]) == {PLACE_URL: first[0]}
+    assert events.count('result') == 1
+
+
+def test_tiles_are_searched_once_and_their_places_merged():
+    events = []
+    scraper = tile_scraper(events)
+    scraper.tiled = True
+    scraper.max_tiles = 9
+    scraper.locate = lambda location: (38.71, -9.14)
+    searched = []
+
+    def scrape_tile(driver, wait, type_filter, tile, new_place_urls):
+        searched.append(tile.id)
+        # Neighbouring tiles overlap: every tile also finds the central place
+        return [{'name': f"Place {tile.id}", 'address': ""}, {'name': "Central", 'address': ""}]
+
+    scraper._scrape_tile = scrape_tile
+
+    results = scraper.scrape("Lisbon", 3, 'hotels')
+
+    assert sorted(searched) == sorted(set(searched))
+    assert len(scraper.done_tiles) == len(searched)
+    assert [result['name'] for result in results].count("Central") == 1
+    assert len(results) == len(searched) + 1
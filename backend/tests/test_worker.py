@@ -0,0 +1,53 @@
+"""Queue workers running leased jobs"""
+
+from worker import QueueWorker
+
+
+class FakeQueue:
+    def __init__(self, heartbeat_state):
+        self.heartbeat_state = heartbeat_state
+        self.finished = []
+
+    def heartbeat(self, job_id, worker_id):
+        return self.heartbeat_state
+
+    def finish(self, job_id, worker_id=None, state='done'):
+        self.finished.append((job_id, state))
+
+
+class FakeJobManager:
+    def get_job(self, job_id, include_results=True):
+        return {'id': job_id, 'status': 'completed'}
+
+
+class FakeService:
+    """Runs until the job is cancelled, like a scraper between listings"""
+    def __init__(self):
+        self.job_manager = FakeJobManager()
+        self.lease_lost = None
+
+    def run_scraping_job(self, job_id, cancel_event, *args, lease_lost=None):
+        self.lease_lost = lease_lost
+        assert cancel_event.wait(5)
+
+
+def test_lost_lease_stops_the_job_without_finishing_it():
+    job_queue = FakeQueue('lost')
+    service = FakeService()
+    worker = QueueWorker(job_queue, service, 'worker-0', heartbeat_interval=0.01)
+
+    worker.run_job('job', [], 2)
+
+    assert service.lease_lost.is_set()
+    assert job_queue.finished == []
+
+
+def test_cancel_request_finishes_the_job():
+    job_queue = FakeQueue('cancel')
+    service = FakeService()
+    worker = QueueWorker(job_queue, service, 'worker-0', heartbeat_interval=0.01)
+
+    worker.run_job('job', [], 1)
+
+    assert not service.lease_lost.is_set()
+    assert job_queue.finished == [('job', 'done')]
@@ -0,0 +1,132 @@
+"""Scraping worker: leases jobs from the shared queue and runs them.
+
+Start the API with EXECUTION_MODE=worker and run one or more of these
+per host (all pointing at the same JOB_DB_PATH and QUEUE_DB_PATH):
+
+    python worker.py --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+from config import Config
+from scraping.job_manager import JobManager
+from services.job_queue import SqliteJobQueue
+from services.scraping_service import ScrapingService
+
+# Job statuses mapped to the queue state a finished job is left in
+QUEUE_STATES = {'cancelled': 'cancelled', 'failed': 'failed'}
+
+class QueueWorker:
+    """Runs leased jobs one at a time and heartbeats while they run"""
+    def __init__(self, job_queue, scraping_service, worker_id,
+                 poll_interval=2.0, heartbeat_interval=15):
+        self.job_queue = job_queue
+        self.scraping_service = scraping_service
+        self.job_manager = scraping_service.job_manager
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stopping = threading.Event()
+
+    def run_forever(self):
+        print(f"Worker {self.worker_id} started")
+        while not self.stopping.is_set():
+            self.fail_expired_jobs()
+            leased = self.job_queue.lease(self.worker_id)
+            if leased is None:
+                self.stopping.wait(self.poll_interval)
+                continue
+            self.run_job(*leased)
+
+    def run_job(self, job_id, args, attempt):
+        print(f"Worker {self.worker_id} running job {job_id} (attempt {attempt})")
+        cancel_event = threading.Event()
+        lease_lost = threading.Event()
+        finished = threading.Event()
+
+        def heartbeat():
+            while not finished.wait(self.heartbeat_interval):
+                state = self.job_queue.heartbeat(job_id, self.worker_id)
+                if state == 'cancel':
+                    cancel_event.set()
+                elif state == 'lost':
+                    # The queue handed the job to another worker: stop at
+                    # the next listing and leave the job to it
+                    print(f"Worker {self.worker_id} lost the lease on job {job_id}")
+                    lease_lost.set()
+                    cancel_event.set()
+                    return
+
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+        try:
+            self.scraping_service.run_scraping_job(job_id, cancel_event, *args, lease_lost=lease_lost)
+        finally:
+            finished.set()
+            heartbeat_thread.join()
+
+        if lease_lost.is_set():
+            return
+        job = self.job_manager.get_job(job_id, include_results=False)
+        status = job['status'] if job else 'failed'
+        self.job_queue.finish(job_id, self.worker_id, QUEUE_STATES.get(status, 'done'))
+
+    def fail_expired_jobs(self):
+        """Give up on jobs whose workers died on every attempt"""
+        for job_id in self.job_queue.expired_jobs():
+            print(f"Job {job_id} ran out of attempts")
+            self.job_manager.update_job_status(job_id, 'failed')
+            self.job_queue.finish(job_id, state='failed')
+
+
+def run_worker(worker_id):
+    """Entry point of a single worker process"""
+    job_manager = JobManager(Config.get_jobs_dir())
+    job_queue = SqliteJobQueue(
+        Config.QUEUE_DB_PATH,
+        lease_seconds=Config.WORKER_LEASE_SECONDS,
+        max_attempts=Config.WORKER_MAX_ATTEMPTS
+    )
+    worker = QueueWorker(
+        job_queue,
+        ScrapingService(job_manager),
+        worker_id,
+        heartbeat_interval=Config.WORKER_HEARTBEAT_SECONDS
+    )
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.scraping_service.driver_pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scraping workers")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes to start")
+    parser.add_argument('--name', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="worker name prefix, unique per host")
+    options = parser.parse_args()
+
+    if options.processes == 1:
+        run_worker(f"{options.name}-0")
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(f"{options.name}-{i}",))
+        for i in range(options.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { ScrapingJob, ScrapingRequest } from './models/types';
+import { JobEvent, JobEventName, ResultsPage, ResultsQuery, ScrapingJob, ScrapingRequest, ScrapingResult } from './models/types';
 
 // Create axios instance with default config
 const axiosInstance = axios.create({
@@ -36,7 +36,8 @@ export const api = {
 
   getJobs: async (): Promise<ScrapingJob[]> => {
     try {
-      const response = await axiosInstance.get('/jobs');
+      // Summaries only: the job list never needs the results themselves
+      const response = await axiosInstance.get('/jobs', { params: { summary: true } });
       return response.data;
     } catch (error) {
       throw error instanceof Error ? error : new Error('Failed to fetch jobs');
@@ -50,5 +51,58 @@ export const api = {
     } catch (error) {
       throw error instanceof Error ? error : new Error('Failed to fetch job details');
     }
+  },
+
+  cancelJob: async (id: string): Promise<{ id: string; status: string }> => {
+    try {
+      const response = await axiosInstance.post(`/jobs/${id}/cancel`);
+      return response.data;
+    } catch (error) {
+      throw error instanceof Error ? error : new Error('Failed to cancel job');
+    }
+  },
+
+  getJobResults: async <T = ScrapingResult>(id: string, query: ResultsQuery): Promise<ResultsPage<T>> => {
+    try {
+      const response = await axiosInstance.get(`/jobs/${id}/results`, {
+        params: {
+          page: query.page,
+          page_size: query.pageSize,
+          q: query.q || undefined,
+          type: query.type,
+          has_website: query.hasWebsite,
+          has_email: query.hasEmail,
+          min_rating: query.minRating,
+          sort: query.sort,
+          order: query.order
+        }
+      });
+      return response.data;
+    } catch (error) {
+      throw error instanceof Error ? error : new Error('Failed to fetch job results');
+    }
+  },
+
+  // Download URL of a job's results, streamed by the server as a file
+  getExportUrl: (id: string, format: 'csv' | 'jsonl' | 'parquet' = 'csv'): string => {
+    return `${axiosInstance.defaults.baseURL}/jobs/${id}/export?format=${format}`;
+  },
+
+  // Subscribe to a job's Server-Sent Events progress stream, returns an unsubscribe function
+  subscribeToJob: (id: string, onEvent: (event: JobEvent) => void): (() => void) => {
+    const source = new EventSource(`${axiosInstance.defaults.baseURL}/jobs/${id}/events`);
+    const names: JobEventName[] = ['snapshot', 'status', 'phase', 'counts', 'tile', 'result', 'emails', 'done', 'failed', 'cancelled'];
+
+    names.forEach(name => {
+      source.addEventListener(name, (e) => {
+        onEvent(JSON.parse((e as MessageEvent).data));
+        // The stream ends after a terminal event, don't let EventSource reconnect
+        if (name === 'done' || name === 'failed' || name === 'cancelled') {
+          source.close();
+        }
+      });
+    });
+
+    return () => source.close();
   }
 };
\ No newline at end of file
@@ -1,9 +1,9 @@
-import { useQuery } from 'react-query';
+import { useQuery, useQueryClient } from 'react-query';
 import { format } from 'date-fns';
-import { Loader2, AlertCircle, CheckCircle, Clock, MapPin, ChevronLeft, ChevronRight } from 'lucide-react';
+import { Loader2, AlertCircle, CheckCircle, Clock, MapPin, ChevronLeft, ChevronRight, XCircle, Ban } from 'lucide-react';
 import { api } from '../api';
 import { ScrapingJob } from '../models/types';
-import { useState } from 'react';
+import React, { useState } from 'react';
 
 interface ResultsTableProps {
   onJobSelect: (jobId: string) => void;
@@ -19,10 +19,21 @@ export function ResultsTable({ onJobSelect }: ResultsTableProps) {
     retryDelay: 1000 // Wait 1 second before retrying
   });
 
+  const queryClient = useQueryClient();
+
   const handleRowClick = (job: ScrapingJob) => {
     onJobSelect(job.id);
   };
 
+  const handleCancel = async (event: React.MouseEvent, job: ScrapingJob) => {
+    event.stopPropagation(); // Don't select the job when cancelling it
+    try {
+      await api.cancelJob(job.id);
+    } finally {
+      queryClient.invalidateQueries('jobs');
+    }
+  };
+
   if (isLoading) {
     return (
       <div className="flex justify-center items-center h-64">
@@ -68,6 +79,7 @@ export function ResultsTable({ onJobSelect }: ResultsTableProps) {
             <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 dark:text-gray-300 uppercase tracking-wider">Type</th>
             <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 dark:text-gray-300 uppercase tracking-wider">Created</th>
             <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 dark:text-gray-300 uppercase tracking-wider">Results</th>
+            <th className="px-6 py-3"></th>
           </tr>
         </thead>
         <tbody className="bg-white dark:bg-gray-800 divide-y divide-gray-200 dark:divide-gray-700">
@@ -92,7 +104,19 @@ export function ResultsTable({ onJobSelect }: ResultsTableProps) {
                 {format(new Date(job.createdAt), 'MMM d, yyyy HH:mm')}
               </td>
               <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900 dark:text-gray-200">
-                {job.results ? `${job.results.length} items` : '-'}
+                {job.resultCount !== undefined ? `${job.resultCount} items` : '-'}
+              </td>
+              <td className="px-6 py-4 whitespace-nowrap text-right">
+                {(job.status === 'queued' || job.status === 'running') && (
+                  <button
+                    onClick={(e) => handleCancel(e, job)}
+                    className="inline-flex items-center text-sm text-red-600 hover:text-red-800 dark:text-red-400 dark:hover:text-red-300"
+                    aria-label="Cancel job"
+                  >
+                    <XCircle className="h-4 w-4 mr-1" />
+                    Cancel
+                  </button>
+                )}
               </td>
             </tr>
           ))}
@@ -156,6 +180,10 @@ function StatusBadge({ status }: { status: ScrapingJob['status'] }) {
       icon: Clock, 
       className: 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200' 
     },
+    queued: { 
+      icon: Clock, 
+      className: 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200' 
+    },
     running: { 
       icon: Loader2, 
       className: 'bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-200' 
@@ -167,6 +195,10 @@ function StatusBadge({ status }: { status: ScrapingJob['status'] }) {
     failed: { 
       icon: AlertCircle, 
       className: 'bg-red-100 text-red-800 dark:bg-red-900 dark:text-red-200' 
+    },
+    cancelled: { 
+      icon: Ban, 
+      className: 'bg-gray-100 text-gray-800 dark:bg-gray-700 dark:text-gray-200' 
     }
   };
 
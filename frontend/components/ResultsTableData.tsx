@@ -2,6 +2,7 @@ import React from 'react';
 import { useState, useEffect } from 'react';
 import { Search, ArrowUpDown, ChevronLeft, ChevronRight, X, AlertCircle, Download, Mail } from 'lucide-react';
 import HotelDetailView from './ResultDetailView';
+import { api } from '../api';
 
 // Define the type for hotel data
 interface Hotel {
@@ -21,7 +22,10 @@ interface ResultsTableDataProps {
 
 export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) => {
   const [data, setData] = useState<Hotel[]>([]);
+  const [total, setTotal] = useState(0);
+  const [totalPages, setTotalPages] = useState(0);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [sortConfig, setSortConfig] = useState<{
@@ -36,48 +40,100 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
   // Detail view state
   const [selectedHotel, setSelectedHotel] = useState<Hotel | null>(null);
 
+  // Live progress of a running job, streamed from the backend
+  const [progress, setProgress] = useState<{ phase?: string; counts?: Record<string, number> } | null>(null);
+  const [liveResults, setLiveResults] = useState<Hotel[]>([]);
+  const [refreshKey, setRefreshKey] = useState(0);
+
   useEffect(() => {
-    const fetchData = async () => {
-      // Reset data and error when job changes
-      setData([]);
-      setError(null);
-      
-      // If no job is selected, don't try to fetch data
-      if (!jobId) {
-        return;
+    setProgress(null);
+    setLiveResults([]);
+
+    if (!jobId) {
+      return;
+    }
+
+    return api.subscribeToJob(jobId, (message) => {
+      switch (message.event) {
+        case 'phase':
+          setProgress(p => ({ ...p, phase: message.data.phase }));
+          break;
+        case 'counts':
+          setProgress(p => ({ ...p, counts: { ...p?.counts, ...message.data } }));
+          break;
+        case 'result':
+          setLiveResults(results => [...results, message.data.result]);
+          break;
+        case 'status':
+          // Results are stored once extraction completes
+          if (message.data.status === 'completed') {
+            setRefreshKey(k => k + 1);
+          }
+          break;
+        case 'done':
+        case 'failed':
+        case 'cancelled':
+          setProgress(null);
+          setRefreshKey(k => k + 1);
+          break;
       }
-      
+    });
+  }, [jobId]);
+
+  // Don't hit the backend on every keystroke
+  useEffect(() => {
+    const timeout = setTimeout(() => setDebouncedSearch(searchTerm), 300);
+    return () => clearTimeout(timeout);
+  }, [searchTerm]);
+
+  useEffect(() => {
+    // Reset data and error when job changes
+    setData([]);
+    setTotal(0);
+    setTotalPages(0);
+    setError(null);
+    setLoading(!!jobId);
+    // Reset to first page when job changes
+    setCurrentPage(1);
+  }, [jobId]);
+
+  useEffect(() => {
+    // If no job is selected, don't try to fetch data
+    if (!jobId) {
+      return;
+    }
+
+    let cancelled = false;
+    const fetchData = async () => {
       try {
-        setLoading(true);
-        // Fetch data from the specific job file
-        const response = await fetch(`/backend/jobs/${jobId}.json`);
-        
-        if (!response.ok) {
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        }
-        
-        const jsonData = await response.json();
-        
-        // Set data from the results array if it exists
-        if (jsonData && jsonData.results && Array.isArray(jsonData.results)) {
-          setData(jsonData.results);
-        } else {
-          setData([]);
-          setError('No results found in the job data');
-        }
+        // Filtering, sorting and pagination happen on the backend
+        const page = await api.getJobResults<Hotel>(jobId, {
+          page: currentPage,
+          pageSize: itemsPerPage,
+          q: debouncedSearch,
+          sort: sortConfig?.key,
+          order: sortConfig?.direction
+        });
+        if (cancelled) return;
+        setData(page.results);
+        setTotal(page.total);
+        setTotalPages(page.totalPages);
+        setError(null);
       } catch (err) {
+        if (cancelled) return;
         console.error('Error fetching data:', err);
         setError('Failed to load job data. Please try again later.');
         setData([]);
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchData();
-    // Reset to first page when job changes
-    setCurrentPage(1);
-  }, [jobId]);
+    return () => {
+      cancelled = true;
+    };
+  }, [jobId, currentPage, itemsPerPage, debouncedSearch, sortConfig, refreshKey]);
 
   // Handle sorting
   const requestSort = (key: keyof Hotel) => {
@@ -88,55 +144,15 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
     setSortConfig({ key, direction });
   };
 
-  // Apply sorting and filtering to the data
-  const sortedData = React.useMemo(() => {
-    // Create a copy of the data
-    let sortableData = [...data];
-    
-    // Apply search filter
-    if (searchTerm) {
-      sortableData = sortableData.filter(item =>
-        Object.values(item).some(
-          value => value && value.toString().toLowerCase().includes(searchTerm.toLowerCase())
-        )
-      );
-    }
-    
-    // Apply sorting
-    if (sortConfig !== null) {
-      sortableData.sort((a, b) => {
-        const aValue = a[sortConfig.key] || '';
-        const bValue = b[sortConfig.key] || '';
-        
-        // Convert values for comparison - handle numeric sorting for ratings and reviews
-        let comparison = 0;
-        if (sortConfig.key === 'rating' || sortConfig.key === 'reviews') {
-          // Convert comma-separated numbers to decimal for comparison
-          const aNum = parseFloat(String(aValue).replace(',', '.'));
-          const bNum = parseFloat(String(bValue).replace(',', '.'));
-          comparison = aNum - bNum;
-        } else {
-          // String comparison
-          if (aValue < bValue) {
-            comparison = -1;
-          }
-          if (aValue > bValue) {
-            comparison = 1;
-          }
-        }
-        
-        return sortConfig.direction === 'desc' ? comparison * -1 : comparison;
-      });
-    }
-    
-    return sortableData;
-  }, [data, searchTerm, sortConfig]);
-
   // Calculate pagination values
-  const totalPages = Math.ceil(sortedData.length / itemsPerPage);
   const indexOfLastItem = currentPage * itemsPerPage;
   const indexOfFirstItem = indexOfLastItem - itemsPerPage;
-  const currentItems = sortedData.slice(indexOfFirstItem, indexOfLastItem);
+
+  // Until the job's results are stored, show the ones streamed so far
+  const showingLive = total === 0 && !debouncedSearch && liveResults.length > 0;
+  const currentItems = showingLive ? liveResults.slice(indexOfFirstItem, indexOfLastItem) : data;
+  const shownTotal = showingLive ? liveResults.length : total;
+  const shownPages = showingLive ? Math.ceil(liveResults.length / itemsPerPage) : totalPages;
 
   // Pagination control handlers
   const paginate = (pageNumber: number) => {
@@ -146,7 +162,7 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
   // Reset to first page when search changes
   useEffect(() => {
     setCurrentPage(1);
-  }, [searchTerm]);
+  }, [debouncedSearch]);
 
   // Handler for opening hotel details
   const handleRowClick = (hotel: Hotel) => {
@@ -183,47 +199,10 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
       });
   };
 
-  // CSV Export function
+  // The server streams the export, so large jobs never have to fit in the browser
   const exportToCSV = () => {
-    if (sortedData.length === 0) return;
-    
-    // Define CSV headers - updated to include emails
-    const headers = ['Name', 'Address', 'Rating', 'Reviews', 'Type', 'Phone', 'Website', 'Emails'];
-    
-    // Convert data to CSV format
-    const csvData = sortedData.map(hotel => [
-      `"${hotel.name.replace(/"/g, '""')}"`, // Escape quotes in CSV
-      `"${hotel.address.replace(/"/g, '""')}"`,
-      hotel.rating || 'N/A',
-      hotel.reviews || 'N/A',
-      hotel.type,
-      hotel.phone || 'N/A',
-      hotel.website || 'N/A',
-      `"${hotel.emails?.replace(/"/g, '""') || 'N/A'}"` // Added emails field
-    ]);
-    
-    // Combine headers and data
-    const csvContent = [
-      headers.join(','),
-      ...csvData.map(row => row.join(','))
-    ].join('\n');
-    
-    // Create blob and download link
-    const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement('a');
-    
-    // Set file name with job ID and timestamp
-    const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
-    const fileName = `hotel-data-${jobId}-${timestamp}.csv`;
-    
-    link.setAttribute('href', url);
-    link.setAttribute('download', fileName);
-    link.style.visibility = 'hidden';
-    
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
+    if (total === 0) return;
+    window.location.href = api.getExportUrl(jobId as string, 'csv');
   };
 
   // Show a message if no job is selected
@@ -258,7 +237,7 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
   }
 
   // Empty state handler
-  if (data.length === 0) {
+  if (shownTotal === 0 && !debouncedSearch && !progress) {
     return (
       <div className="bg-white dark:bg-gray-800 shadow sm:rounded-lg p-12">
         <div className="text-center">
@@ -315,16 +294,26 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
           <button
             onClick={exportToCSV}
             className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md shadow-sm text-white bg-blue-600 hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-blue-500 disabled:opacity-50 disabled:cursor-not-allowed"
-            disabled={sortedData.length === 0}
+            disabled={total === 0}
           >
             <Download className="mr-2 h-4 w-4" />
             Export to CSV
           </button>
         </div>
         
+        {/* Live progress of a running job */}
+        {progress && (
+          <div className="px-4 py-2 text-sm text-blue-600 dark:text-blue-400 border-b border-gray-200 dark:border-gray-700">
+            {progress.phase ? `Phase: ${progress.phase}` : 'Running'}
+            {progress.counts?.tilesTotal !== undefined && ` · ${progress.counts.tilesDone ?? 0}/${progress.counts.tilesTotal} tiles`}
+            {progress.counts?.results !== undefined && ` · ${progress.counts.results} places extracted`}
+            {progress.counts?.domainsCrawled !== undefined && ` · ${progress.counts.domainsCrawled} websites crawled`}
+          </div>
+        )}
+
         {/* Results count */}
         <div className="px-4 py-2 text-sm text-gray-500 dark:text-gray-400">
-          Showing {indexOfFirstItem + 1}-{Math.min(indexOfLastItem, sortedData.length)} of {sortedData.length} results
+          Showing {shownTotal === 0 ? 0 : indexOfFirstItem + 1}-{Math.min(indexOfLastItem, shownTotal)} of {shownTotal} results
         </div>
 
         {/* Table */}
@@ -460,7 +449,7 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
                   </td>
                 </tr>
               ))}
-              {sortedData.length === 0 && (
+              {shownTotal === 0 && (
                 <tr>
                   <td colSpan={8} className="px-6 py-4 text-center text-sm text-gray-500 dark:text-gray-400">
                     No results found for your search
@@ -474,7 +463,7 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
         {/* Updated pagination based on ResultsTable.tsx */}
         <div className="px-6 py-3 bg-gray-50 dark:bg-gray-700 border-t border-gray-200 dark:border-gray-700 flex items-center justify-between">
           <div className="text-sm text-gray-500 dark:text-gray-400">
-            Showing {indexOfFirstItem + 1}-{Math.min(indexOfLastItem, sortedData.length)} of {sortedData.length} results
+            Showing {shownTotal === 0 ? 0 : indexOfFirstItem + 1}-{Math.min(indexOfLastItem, shownTotal)} of {shownTotal} results
           </div>
           <div className="flex items-center space-x-2">
             <button
@@ -490,7 +479,7 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
               <ChevronLeft className="h-5 w-5" />
             </button>
             
-            {Array.from({ length: totalPages }, (_, i) => (
+            {Array.from({ length: shownPages }, (_, i) => (
               <button
                 key={i + 1}
                 onClick={() => paginate(i + 1)}
@@ -505,10 +494,10 @@ export const ResultsTableData: React.FC<ResultsTableDataProps> = ({ jobId }) =>
             ))}
             
             <button
-              onClick={() => paginate(Math.min(currentPage + 1, totalPages))}
-              disabled={currentPage === totalPages || totalPages === 0}
+              onClick={() => paginate(Math.min(currentPage + 1, shownPages))}
+              disabled={currentPage === shownPages || shownPages === 0}
               className={`p-1 rounded-md ${
-                currentPage === totalPages || totalPages === 0
+                currentPage === shownPages || shownPages === 0
                   ? 'text-gray-300 dark:text-gray-600 cursor-not-allowed'
                   : 'text-gray-500 dark:text-gray-400 hover:bg-gray-200 dark:hover:bg-gray-600'
               }`}
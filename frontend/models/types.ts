@@ -2,11 +2,13 @@ export interface ScrapingJob {
   id: string;
   location: string;
   radius: number;
-  status: 'pending' | 'running' | 'completed' | 'failed';
+  status: 'pending' | 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
   type: 'hotels' | 'restaurants' | 'both';
   createdAt: string;
   completedAt?: string;
   results?: ScrapingResult[];
+  resultCount?: number;
+  emailCount?: number;
 }
 
 export interface ScrapingResult {
@@ -17,6 +19,28 @@ export interface ScrapingResult {
   type: string;
   phone?: string;
   website?: string;
+  emails?: string;
+}
+
+export interface ResultsQuery {
+  page: number;
+  pageSize: number;
+  q?: string;
+  type?: string;
+  hasWebsite?: boolean;
+  hasEmail?: boolean;
+  minRating?: number;
+  sort?: string;
+  order?: 'asc' | 'desc';
+}
+
+export interface ResultsPage<T = ScrapingResult> {
+  jobId: string;
+  page: number;
+  pageSize: number;
+  total: number;
+  totalPages: number;
+  results: T[];
 }
 
 // types.ts
@@ -24,8 +48,18 @@ export interface ScrapingRequest {
   location: string;
   radius: number;
   type: 'hotels' | 'restaurants' | 'both';
+  incremental?: boolean;
+  tiled?: boolean;
   coordinates?: {
     lat: number;
     lng: number;
   };
-}
\ No newline at end of file
+}
+export type JobEventName = 'snapshot' | 'status' | 'phase' | 'counts' | 'tile' | 'result' | 'emails' | 'done' | 'failed' | 'cancelled';
+
+export interface JobEvent {
+  event: JobEventName;
+  jobId: string;
+  time?: string;
+  data: any;
+}